@@ -0,0 +1,217 @@
+"""Bake many projects at once from a CSV or JSONL file of contexts, one project per row.
+
+A ``cookiecutter`` call per project reads cookiecutter.json, compiles every template file and runs each hook in a
+new interpreter. Here a pool of worker processes reads cookiecutter.json once, shares the compiled templates among
+the projects it bakes through an in-memory Jinja bytecode cache, and runs the hooks in-process.
+Bake time of each project and throughput are reported.
+
+Usage:
+    python bulk_bake.py contexts.csv [--jobs N] [--output-dir DIR]
+    python bulk_bake.py --benchmark 200 [--baseline]
+
+CSV files have a header row of cookiecutter.json option names, JSONL files a JSON object per line; missing options
+take their default value. ``--benchmark N`` bakes N generated projects, ``--baseline`` bakes them with a
+``cookiecutter`` call each too, for comparison.
+"""
+import argparse
+import copy
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from cookiecutter.environment import StrictEnvironment
+from cookiecutter.generate import apply_overwrites_to_context, generate_context, generate_files
+from cookiecutter.prompt import prompt_for_config
+from cookiecutter.utils import work_in
+from jinja2 import BytecodeCache, FileSystemLoader
+
+TEMPLATE_DIR = Path(__file__).resolve().parent
+HOOKS_DIR = TEMPLATE_DIR / 'hooks'
+
+
+class BakeResult(NamedTuple):
+    context: Dict[str, str]
+    project_dir: Optional[str]
+    elapsed: float
+    error: Optional[str]
+
+
+class MemoryBytecodeCache(BytecodeCache):
+    """Compiled templates of the worker process, shared by the Jinja environments of its projects."""
+
+    def __init__(self):
+        self._buckets = {}
+
+    def load_bytecode(self, bucket):
+        _code = self._buckets.get(bucket.key)
+        if _code is not None and _code[0] == bucket.checksum:
+            bucket.code = _code[1]
+
+    def dump_bytecode(self, bucket):
+        self._buckets[bucket.key] = (bucket.checksum, bucket.code)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+# worker process state, set by _init_worker
+_TEMPLATE_CONTEXT = {}
+_BYTECODE_CACHE = MemoryBytecodeCache()
+_OUTPUT_DIR = Path('.')
+
+
+def _init_worker(output_dir: Path) -> None:
+    global _TEMPLATE_CONTEXT, _OUTPUT_DIR  # pylint: disable=W0603
+    _TEMPLATE_CONTEXT = generate_context(context_file=str(TEMPLATE_DIR / 'cookiecutter.json'))
+    _OUTPUT_DIR = output_dir
+
+
+def _project_context(extra_context: Dict[str, str]) -> dict:
+    """Full context of a project, as ``cookiecutter --no-input`` builds it."""
+    _context = copy.deepcopy(_TEMPLATE_CONTEXT)
+    apply_overwrites_to_context(_context['cookiecutter'], extra_context)
+    _context['_cookiecutter'] = {_k: _v for _k, _v in _context['cookiecutter'].items() if not _k.startswith('_')}
+    _context['cookiecutter'].update(prompt_for_config(_context, no_input=True))
+    _context['cookiecutter'].update({
+        '_template': str(TEMPLATE_DIR),
+        '_output_dir': str(_OUTPUT_DIR.resolve()),
+        '_repo_dir': str(TEMPLATE_DIR),
+        '_checkout': None,
+    })
+    # every environment generate_files creates loads the already compiled templates
+    _context['cookiecutter']['_jinja2_env_vars'] = dict(_context['cookiecutter'].get('_jinja2_env_vars', {}),
+                                                        bytecode_cache=_BYTECODE_CACHE)
+    return _context
+
+
+def _run_hook(name: str, context: dict, cwd: str) -> None:
+    """Render a hook script and run it into this process, from cwd.
+
+    Raises:
+        RuntimeError: the hook exits with a non-zero code.
+    """
+    _env = StrictEnvironment(context=context, keep_trailing_newline=True, bytecode_cache=_BYTECODE_CACHE,
+                             loader=FileSystemLoader(str(HOOKS_DIR)))
+    _path = HOOKS_DIR / f"{name}.py"
+    _source = _env.get_template(_path.name).render(**context)
+    with work_in(cwd):
+        _code = compile(_source, str(_path), 'exec')
+        try:
+            exec(_code, {'__name__': '__main__', '__file__': str(_path)})  # pylint: disable=W0122
+        except SystemExit as _e:
+            if _e.code not in (None, 0):
+                raise RuntimeError(f"{name} exited with code {_e.code}") from _e
+
+
+def bake(extra_context: Dict[str, str]) -> BakeResult:
+    """Bake a project into the worker output folder.
+
+    Args:
+        extra_context: options different from their cookiecutter.json default.
+
+    Returns:
+        bake outcome.
+    """
+    _start = time.perf_counter()
+    try:
+        _context = _project_context(extra_context)
+        _run_hook('pre_gen_project', _context, cwd=str(_OUTPUT_DIR))
+        _project_dir = generate_files(repo_dir=str(TEMPLATE_DIR), context=_context, output_dir=str(_OUTPUT_DIR),
+                                      accept_hooks=False)
+        _run_hook('post_gen_project', _context, cwd=_project_dir)
+    except Exception as _e:  # pylint: disable=W0703
+        return BakeResult(extra_context, None, time.perf_counter() - _start, f"{type(_e).__name__}: {_e}")
+    return BakeResult(extra_context, _project_dir, time.perf_counter() - _start, None)
+
+
+def bake_all(contexts: List[Dict[str, str]], output_dir: Path, jobs: Optional[int] = None) -> List[BakeResult]:
+    """Bake one project per context, in a process pool.
+
+    Args:
+        contexts: cookiecutter extra contexts, their project_slug must differ.
+        output_dir: parent folder of the projects.
+        jobs: worker processes, default cpu count.
+
+    Returns:
+        bake outcomes, in contexts order.
+    """
+    # workers change directory to run the hooks
+    output_dir = output_dir.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _jobs = jobs or os.cpu_count() or 1
+    # chunks big enough to amortise inter-process messages, small enough to balance the workers
+    _chunksize = max(1, len(contexts) // (_jobs * 4))
+    with ProcessPoolExecutor(max_workers=_jobs, initializer=_init_worker, initargs=(output_dir,)) as _pool:
+        return list(_pool.map(bake, contexts, chunksize=_chunksize))
+
+
+def read_contexts(path: Path) -> List[Dict[str, str]]:
+    """Read the contexts file, CSV or JSONL by extension.
+
+    Args:
+        path: ``.csv`` file with header row, or ``.jsonl`` file.
+
+    Returns:
+        contexts, one per row.
+    """
+    with open(path, newline='', encoding='utf-8') as _fp:
+        if path.suffix.lower() == '.csv':
+            # empty cells take the default value
+            return [{_k: _v for _k, _v in _row.items() if _v} for _row in csv.DictReader(_fp)]
+        return [json.loads(_line) for _line in _fp if _line.strip()]
+
+
+def _baseline(contexts: List[Dict[str, str]], output_dir: Path) -> float:
+    """Seconds to bake the contexts with a cookiecutter call each."""
+    from cookiecutter.main import cookiecutter  # pylint: disable=C0415
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _start = time.perf_counter()
+    for _context in contexts:
+        cookiecutter(str(TEMPLATE_DIR), no_input=True, extra_context=_context, output_dir=str(output_dir))
+    return time.perf_counter() - _start
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _source = _parser.add_mutually_exclusive_group(required=True)
+    _source.add_argument('contexts', nargs='?', type=Path, help="CSV or JSONL file of contexts")
+    _source.add_argument('--benchmark', type=int, metavar='N', help="bake N generated projects")
+    _parser.add_argument('--baseline', action='store_true', help="benchmark a cookiecutter call per project too")
+    _parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help="worker processes")
+    _parser.add_argument('--output-dir', '-o', type=Path, help="projects folder, default a temp dir")
+    _args = _parser.parse_args(argv)
+
+    _output_dir = _args.output_dir or Path(tempfile.mkdtemp(prefix='bulk_bake.'))
+    if _args.benchmark:
+        _contexts = [{'project_name': f"Service {_i:04d}"} for _i in range(_args.benchmark)]
+    else:
+        _contexts = read_contexts(_args.contexts)
+
+    _start = time.perf_counter()
+    _results = bake_all(_contexts, _output_dir / 'bulk', _args.jobs)
+    _wall = time.perf_counter() - _start
+
+    for _r in _results:
+        _name = os.path.basename(_r.project_dir) if _r.project_dir else json.dumps(_r.context)
+        print(f"{_r.elapsed:7.3f}s  {'FAILED' if _r.error else 'ok':6}  {_name}")
+        if _r.error:
+            print(f"{'':17}{_r.error}")
+    _failed = sum(1 for _r in _results if _r.error)
+    print(f"{len(_results)} projects, {_failed} failed: {_wall:.2f}s wall time, "
+          f"{len(_results) / _wall:.1f} projects/s, {_args.jobs} jobs, projects in {_output_dir / 'bulk'}")
+
+    if _args.baseline:
+        _seconds = _baseline(_contexts, _output_dir / 'baseline')
+        print(f"baseline: {_seconds:.2f}s, {len(_contexts) / _seconds:.1f} projects/s with a cookiecutter call each")
+    return 1 if _failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Root conftest: pytest puts this folder on sys.path, the tests import the root scripts (bulk_bake)."""
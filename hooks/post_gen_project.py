@@ -1,11 +1,38 @@
 #!/usr/bin/env python
+"""Finalise the generated project: documentation tree, git repository and pre-commit hooks.
+
+Environment variables:
+    PYPACKAGE_HOOK_VERBOSE: print the time spent by each step when set.
+    PYPACKAGE_WHEELHOUSE: wheel cache folder of pre-commit and its dependencies, filled at the first bake, default
+        ``~/.cache/cookiecutter-pypackage/wheels``. Later bakes install from it without reaching the index.
+"""
+import json
 import os
 import subprocess
 import sys
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 PROJECT_DIRECTORY = os.path.realpath(os.path.curdir)
 
+PRE_COMMIT_VERSION = "2.12.0"
+WHEELHOUSE = os.environ.get("PYPACKAGE_WHEELHOUSE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "cookiecutter-pypackage", "wheels"))
+VERBOSE = bool(os.environ.get("PYPACKAGE_HOOK_VERBOSE"))
+
+
+@contextmanager
+def step(name):
+    """Time a hook step, printed in verbose mode."""
+    _start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if VERBOSE:
+            print(f"post_gen_project: {name} {time.perf_counter() - _start:.3f}s")
+
 
 def remove_file(filepath):
     try:
@@ -30,63 +57,124 @@ def rename_folder(folder_name, dest_name):
 
 
 def execute(list_args, supress_exception=False, cwd=None):
-    cur_dir = os.getcwd()
+    # cwd argument, not chdir: steps run in threads
+    proc = subprocess.run(list_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+    if proc.returncode != 0 and not supress_exception:
+        raise Exception(proc)
+    return proc
 
-    try:
-        if cwd:
-            os.chdir(cwd)
 
-        proc = subprocess.run(list_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if proc.returncode != 0 and not supress_exception:
-            raise Exception(proc)
+def init_git():
+    # workaround for issue #1: main branch, without changing the user git configuration
+    if not os.path.exists(os.path.join(PROJECT_DIRECTORY, ".git")):
+        with step("git init"):
+            execute(["git", "init", "--quiet"], cwd=PROJECT_DIRECTORY)
+            execute(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=PROJECT_DIRECTORY)
+
+
+def record_template():
+    """Add the template commit to .cookiecutter.json, the base of the template changes update_project.py merges."""
+    # rendered as JSON string, a valid Python literal whatever the path contains (backslashes, quotes)
+    _template_dir = {{ cookiecutter._repo_dir | default(cookiecutter._template) | tojson }}
+    if not os.path.isdir(_template_dir):
+        return
+    _proc = execute(["git", "rev-parse", "HEAD"], supress_exception=True, cwd=_template_dir)
+    if _proc.returncode != 0:
+        return
+    _path = os.path.join(PROJECT_DIRECTORY, ".cookiecutter.json")
+    with open(_path, encoding="utf-8") as _fp:
+        _context = json.load(_fp)
+    _context["_commit"] = _proc.stdout.decode().strip()
+    with open(_path, mode="w", encoding="utf-8") as _fp:
+        json.dump(_context, _fp, indent=4)
+        _fp.write("\n")
+
+
+def prune_docs():
+    with step("documentation tree"):
+        if 'mkdocstr' in '{{ cookiecutter.doc_generator|lower }}':
+            # remove sphinx
+            for remove_me in ['AUTHORS.rst']:
+                remove_file(remove_me)
+            remove_folder('sphinx_docs')
+            rename_folder('mkdocstring_docs', 'docs')
         else:
-            return proc
-    finally:
-        os.chdir(cur_dir)
+            # remove mkdocstring
+            for remove_me in ['mkdocs.yml']:
+                remove_file(remove_me)
+            remove_folder('mkdocstring_docs')
+            rename_folder('sphinx_docs', 'docs')
 
 
-def init_git():
-    # workaround for issue #1
-    if not os.path.exists(os.path.join(PROJECT_DIRECTORY, ".git")):
-        execute(["git", "config", "--global", "init.defaultBranch", "main"], cwd=PROJECT_DIRECTORY)
-        execute(["git", "init"], cwd=PROJECT_DIRECTORY)
+def pre_commit_installed():
+    try:
+        from importlib.metadata import PackageNotFoundError, version  # pylint: disable=C0415
+    except ImportError:  # python < 3.8
+        return False
+    try:
+        return version("pre-commit") == PRE_COMMIT_VERSION
+    except PackageNotFoundError:
+        return False
+
+
+def install_pre_commit():
+    """Install pre-commit from the wheelhouse, downloading it there first if it's missing."""
+    if pre_commit_installed():
+        return
+    _requirement = f"pre-commit=={PRE_COMMIT_VERSION}"
+    _wheel_prefix = f"pre_commit-{PRE_COMMIT_VERSION}-"
+    try:
+        _cached = any(_f.startswith(_wheel_prefix) for _f in os.listdir(WHEELHOUSE))
+    except FileNotFoundError:
+        _cached = False
+    if not _cached:
+        with step("pre-commit download"):
+            execute([sys.executable, "-m", "pip", "wheel", "--quiet", "--wheel-dir", WHEELHOUSE, _requirement])
+    with step("pre-commit install"):
+        execute([sys.executable, "-m", "pip", "install", "--quiet", "--no-index", "--find-links", WHEELHOUSE,
+                 _requirement])
 
 
 def install_pre_commit_hooks():
-    execute([sys.executable, "-m", "pip", "install", "pre-commit==2.12.0"], cwd=PROJECT_DIRECTORY)
-    execute([sys.executable, "-m", "pre_commit", "install"], cwd=PROJECT_DIRECTORY)
+    with step("pre-commit hooks"):
+        execute([sys.executable, "-m", "pre_commit", "install"], cwd=PROJECT_DIRECTORY)
 
 
 if __name__ == '__main__':
+    _start = time.perf_counter()
+    _install_hooks = '{{ cookiecutter.install_precommit_hooks }}' == 'y'
 
-    if 'mkdocstr' in '{{ cookiecutter.doc_generator|lower }}':
-        # remove sphinx
-        for remove_me in ['AUTHORS.rst']:
-            remove_file(remove_me)
-        remove_folder('sphinx_docs')
-        rename_folder('mkdocstring_docs', 'docs')
-    else:
-        # remove mkdocstring
-        for remove_me in ['mkdocs.yml']:
-            remove_file(remove_me)
-        remove_folder('mkdocstring_docs')
-        rename_folder('sphinx_docs', 'docs')
-
-    if 'no' in '{{ cookiecutter.command_line_interface|lower }}':
-        cli_file = os.path.join('{{ cookiecutter.pkg_name }}', 'cli.py')
-        remove_file(cli_file)
-
-    if 'Not open source' == '{{ cookiecutter.open_source_license }}':
-        remove_file('LICENSE')
+    # git and pip do not touch the documentation tree: they run while it's pruned
+    with ThreadPoolExecutor(max_workers=2) as _pool:
+        _git = _pool.submit(init_git)
+        _pre_commit = _pool.submit(install_pre_commit) if _install_hooks else None
+
+        prune_docs()
+
+        if 'no' in '{{ cookiecutter.command_line_interface|lower }}':
+            cli_file = os.path.join('{{ cookiecutter.pkg_name }}', 'cli.py')
+            remove_file(cli_file)
+
+        if 'Not open source' == '{{ cookiecutter.open_source_license }}':
+            remove_file('LICENSE')
+
+        with step("template commit"):
+            record_template()
 
     try:
-        init_git()
+        _git.result()
     except Exception as e:
         print(e)
 
-    if '{{ cookiecutter.install_precommit_hooks }}' == 'y':
+    if _install_hooks:
         try:
+            _pre_commit.result()
+            # hooks are installed into .git
+            _git.result()
             install_pre_commit_hooks()
         except Exception as e:
             print(str(e))
             print("Failed to install pre-commit hooks. Please run `pre-commit install` by your self. For more on pre-commit, please refer to https://pre-commit.com")
+
+    if VERBOSE:
+        print(f"post_gen_project: total {time.perf_counter() - _start:.3f}s")
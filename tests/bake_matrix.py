@@ -0,0 +1,123 @@
+"""Bake the template with every combination of the cookiecutter.json choice options, concurrently.
+
+Each combination is baked by a worker process into its own folder, bake time of every combination is reported,
+slowest first.
+
+Usage: python tests/bake_matrix.py [--jobs N] [--output-dir DIR] [option=value ...]
+
+option=value arguments pin an option, narrowing the matrix.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+TEMPLATE_DIR = Path(__file__).resolve().parents[1]
+
+
+class BakeResult(NamedTuple):
+    context: Dict[str, str]
+    output_dir: Path
+    elapsed: float
+    error: Optional[str]
+
+
+def combinations(pinned: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+    """Extra contexts of the choice options matrix.
+
+    Args:
+        pinned: {option: value} map of options to keep fixed.
+
+    Returns:
+        one extra context per combination.
+    """
+    _options = json.loads((TEMPLATE_DIR / 'cookiecutter.json').read_text())
+    _choices = {_k: _v for _k, _v in _options.items() if isinstance(_v, list) and not _k.startswith('_')}
+    _choices.update({_k: [_v] for _k, _v in (pinned or {}).items()})
+    return [dict(zip(_choices, _values)) for _values in itertools.product(*_choices.values())]
+
+
+def bake(context: Dict[str, str], output_dir: Path) -> BakeResult:
+    """Bake the template, without prompts.
+
+    Args:
+        context: cookiecutter extra context.
+        output_dir: folder of the generated project, and of its cookiecutter replay file.
+
+    Returns:
+        bake outcome.
+    """
+    from cookiecutter.main import cookiecutter  # pylint: disable=C0415
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # own replay folder: concurrent bakes would rewrite the same ~/.cookiecutter_replay file
+    _config = output_dir / '.cookiecutterrc'
+    _config.write_text(f"replay_dir: {json.dumps(str(output_dir / '.replay'))}\n")
+
+    _start = time.perf_counter()
+    try:
+        cookiecutter(str(TEMPLATE_DIR), no_input=True, extra_context=context, output_dir=str(output_dir),
+                     config_file=str(_config))
+    except Exception as _e:  # pylint: disable=W0703
+        return BakeResult(context, output_dir, time.perf_counter() - _start, f"{type(_e).__name__}: {_e}")
+    return BakeResult(context, output_dir, time.perf_counter() - _start, None)
+
+
+def run_matrix(contexts: List[Dict[str, str]], output_dir: Path, jobs: Optional[int] = None) -> List[BakeResult]:
+    """Bake the template once per context, in a process pool.
+
+    Args:
+        contexts: cookiecutter extra contexts.
+        output_dir: parent folder, each bake gets its own numbered sub-folder.
+        jobs: worker processes, default cpu count.
+
+    Returns:
+        bake outcomes, in contexts order.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as _pool:
+        _futures = [_pool.submit(bake, _c, output_dir / f"{_i:04d}") for _i, _c in enumerate(contexts)]
+        return [_f.result() for _f in _futures]
+
+
+def _pin(value: str) -> tuple:
+    _option, _sep, _value = value.partition('=')
+    if not _sep:
+        raise argparse.ArgumentTypeError(f"{value}: expected option=value")
+    return _option, _value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _parser.add_argument('pinned', nargs='*', type=_pin, metavar='option=value', help="option kept fixed")
+    _parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help="worker processes")
+    _parser.add_argument('--output-dir', '-o', type=Path, help="baked projects folder, default a temp dir")
+    _args = _parser.parse_args(argv)
+
+    _output_dir = _args.output_dir or Path(tempfile.mkdtemp(prefix='bake_matrix.'))
+    _contexts = combinations(dict(_args.pinned))
+    # only the varying options identify a combination
+    _varying = [_k for _k in _contexts[0] if len({_c[_k] for _c in _contexts}) > 1]
+
+    _start = time.perf_counter()
+    _results = run_matrix(_contexts, _output_dir, _args.jobs)
+    _wall = time.perf_counter() - _start
+
+    for _r in sorted(_results, key=lambda _r: _r.elapsed, reverse=True):
+        _label = ", ".join(f"{_k}={_r.context[_k]}" for _k in _varying)
+        print(f"{_r.elapsed:7.2f}s  {'FAILED' if _r.error else 'ok':6}  {_r.output_dir.name}  {_label}")
+        if _r.error:
+            print(f"{'':17}{_r.error}")
+    _failed = sum(1 for _r in _results if _r.error)
+    print(f"{len(_results)} combinations, {_failed} failed: {_wall:.1f}s wall time, "
+          f"{sum(_r.elapsed for _r in _results):.1f}s bake time, {_args.jobs} jobs, projects in {_output_dir}")
+    return 1 if _failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Shared fixtures of the template tests."""
+import json
+from pathlib import Path
+
+import pytest
+
+# first choice of list options, as cookiecutter --no-input
+_DEFAULTS = {
+    _k: _v[0] if isinstance(_v, list) else _v
+    for _k, _v in json.loads((Path(__file__).resolve().parents[1] / 'cookiecutter.json').read_text()).items()
+}
+
+
+@pytest.fixture(scope="session")
+def bake(cookies_session):
+    """Bake the template once per extra_context, for the whole test session.
+
+    Every bake has its own folder under the session base temp dir: with pytest-xdist each worker has its own
+    session, base temp dir and cache, so workers never share a project.
+    Baked projects are shared by the tests using the same context: tests must not modify them.
+
+    Returns:
+        function taking extra_context items as keyword arguments and returning the pytest-cookies Result.
+    """
+    _baked = {}
+
+    def _bake(**extra_context):
+        # options equal to their default make the same project
+        _key = tuple(sorted((_k, _v) for _k, _v in extra_context.items() if _DEFAULTS.get(_k) != _v))
+        if _key not in _baked:
+            _baked[_key] = cookies_session.bake(extra_context=extra_context)
+        return _baked[_key]
+
+    return _bake
@@ -1,13 +1,18 @@
 import datetime
+import json
 import os
+import shutil
 import shlex
 import subprocess
 import sys
-from contextlib import contextmanager
+from pathlib import Path
 from typing import List
 
 import pytest
-from cookiecutter.utils import rmtree
+
+from bake_matrix import combinations, run_matrix
+from bulk_bake import bake_all, read_contexts
+from update_project import TEMPLATE_DIR, update
 
 # logging.basicConfig(level=logging.DEBUG)
 
@@ -24,77 +29,40 @@ def build_commands(commands):
     return cmds
 
 
-@contextmanager
-def inside_dir(dirpath):
-    """
-    Execute code from inside the given directory
-    :param dirpath: String, path of the directory the command is being run.
-    """
-    old_path = os.getcwd()
-    try:
-        os.chdir(dirpath)
-        yield
-    finally:
-        os.chdir(old_path)
-
-
-@contextmanager
-def bake_in_temp_dir(cookies, *args, **kwargs):
-    """
-    Delete the temporal directory that is created when executing the tests
-    :param cookies: pytest_cookies.Cookies,
-        cookie to be baked and its temporal files will be removed
-    """
-    result = cookies.bake(*args, **kwargs)
-    try:
-        yield result
-    finally:
-        rmtree(str(result.project))
-
-
 def run_inside_dir(commands, dirpath):
     """
     Run a command from inside a given directory, returning the exit status
     :param commands: Commands that will be executed
     :param dirpath: String, path of the directory the command is being run.
     """
-    with inside_dir(dirpath):
-        for command in commands:
-            subprocess.check_call(shlex.split(command))
+    for command in commands:
+        subprocess.run(shlex.split(command), cwd=dirpath, check=True)
 
 
 def check_output_inside_dir(command, dirpath):
     """Run a command from inside a given directory, returning the command output"""
-    with inside_dir(dirpath):
-        return subprocess.check_output(shlex.split(command))
+    return subprocess.run(shlex.split(command), cwd=dirpath, check=True, capture_output=True).stdout
+
 
 def execute(command: List[str], dirpath: str, timeout=30, supress_warning=True):
     """Run command inside given directory and returns output
 
     if there's stderr, then it may raise exception according to supress_warning
     """
-    with inside_dir(dirpath):
-        proc = subprocess.Popen(
-            command,
-            stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE
-        )
-
-    out, err = proc.communicate(timeout=timeout)
-    out = out.decode('utf-8')
-    err = err.decode('utf-8')
-
-    if err and not supress_warning:
-        raise RuntimeError(err)
+    proc = subprocess.run(command, cwd=dirpath, capture_output=True, text=True, timeout=timeout)
+
+    if proc.stderr and not supress_warning:
+        raise RuntimeError(proc.stderr)
     else:
-        print(err)
-        return out
+        print(proc.stderr)
+        return proc.stdout
+
 
-def test_year_compute_in_license_file(cookies):
-    with bake_in_temp_dir(cookies) as result:
-        license_file_path = result.project.join('LICENSE')
-        now = datetime.datetime.now()
-        assert str(now.year) in license_file_path.read()
+def test_year_compute_in_license_file(bake):
+    result = bake()
+    license_file_path = result.project.join('LICENSE')
+    now = datetime.datetime.now()
+    assert str(now.year) in license_file_path.read()
 
 
 def project_info(result):
@@ -105,39 +73,36 @@ def project_info(result):
     return project_path, project_slug, project_dir
 
 
-def test_bake_with_defaults(cookies):
-    with bake_in_temp_dir(cookies) as result:
-        assert result.project.isdir()
-        assert result.exit_code == 0
-        assert result.exception is None
-
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert _DEPENDENCY_FILE in found_toplevel_files
-        assert 'python_boilerplate' in found_toplevel_files
-        assert 'setup.cfg' in found_toplevel_files
-        assert 'tests' in found_toplevel_files
-
-        mkdocs_yml = os.path.join(result._project_dir, "mkdocs.yml")
-        with open(mkdocs_yml, "r") as f:
-            lines = f.readlines()
-            assert '  - Home: index.md\n' in lines
-
-
-def test_bake_without_author_file(cookies):
-    with bake_in_temp_dir(
-        cookies,
-        extra_context={'create_author_file': 'n'}
-    ) as result:
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert 'AUTHORS.md' not in found_toplevel_files
-        doc_files = [f.basename for f in result.project.join('docs').listdir()]
-        assert 'authors.md' not in doc_files
-
-        # make sure '-authors: authors.md' not appeared in mkdocs.yml
-        mkdocs_yml = os.path.join(result._project_dir, "mkdocs.yml")
-        with open(mkdocs_yml, "r") as f:
-            lines = f.readlines()
-            assert '  - authors: authors.md\n' not in lines
+def test_bake_with_defaults(bake):
+    result = bake()
+    assert result.project.isdir()
+    assert result.exit_code == 0
+    assert result.exception is None
+
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert _DEPENDENCY_FILE in found_toplevel_files
+    assert 'python_boilerplate' in found_toplevel_files
+    assert 'setup.cfg' in found_toplevel_files
+    assert 'tests' in found_toplevel_files
+
+    mkdocs_yml = os.path.join(result._project_dir, "mkdocs.yml")
+    with open(mkdocs_yml, "r") as f:
+        lines = f.readlines()
+        assert '  - Home: index.md\n' in lines
+
+
+def test_bake_without_author_file(bake):
+    result = bake(create_author_file='n')
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert 'AUTHORS.md' not in found_toplevel_files
+    doc_files = [f.basename for f in result.project.join('docs').listdir()]
+    assert 'authors.md' not in doc_files
+
+    # make sure '-authors: authors.md' not appeared in mkdocs.yml
+    mkdocs_yml = os.path.join(result._project_dir, "mkdocs.yml")
+    with open(mkdocs_yml, "r") as f:
+        lines = f.readlines()
+        assert '  - authors: authors.md\n' not in lines
 
 @pytest.mark.parametrize("license_info", [
     ('MIT', 'MIT '),
@@ -147,26 +112,20 @@ def test_bake_without_author_file(cookies):
     ('Apache-2.0', 'Licensed under the Apache License, Version 2.0'),
     ('GPL-3.0-only', 'GNU GENERAL PUBLIC LICENSE'),
 ])
-def test_bake_selecting_license(cookies, license_info):
+def test_bake_selecting_license(bake, license_info):
     license, target_string = license_info
-    with bake_in_temp_dir(
-        cookies,
-        extra_context={'open_source_license': license}
-    ) as result:
-        assert target_string in result.project.join('LICENSE').read()
-        assert license in result.project.join(_DEPENDENCY_FILE).read()
-
-
-def test_bake_not_open_source(cookies):
-    with bake_in_temp_dir(
-        cookies,
-        extra_context={'open_source_license': 'Not open source'}
-    ) as result:
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert _DEPENDENCY_FILE in found_toplevel_files
-        assert 'LICENSE' not in found_toplevel_files
-        assert 'License' not in result.project.join('README.md').read()
-        assert 'license' not in result.project.join(_DEPENDENCY_FILE).read()
+    result = bake(open_source_license=license)
+    assert target_string in result.project.join('LICENSE').read()
+    assert license in result.project.join(_DEPENDENCY_FILE).read()
+
+
+def test_bake_not_open_source(bake):
+    result = bake(open_source_license='Not open source')
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert _DEPENDENCY_FILE in found_toplevel_files
+    assert 'LICENSE' not in found_toplevel_files
+    assert 'License' not in result.project.join('README.md').read()
+    assert 'license' not in result.project.join(_DEPENDENCY_FILE).read()
 
 
 # def test_not_using_pytest(cookies):
@@ -183,13 +142,13 @@ def test_bake_not_open_source(cookies):
 #         assert "import pytest" not in ''.join(lines)
 
 
-def test_docstrings_style(cookies):
-    with bake_in_temp_dir(cookies, extra_context={'docstrings_style': 'google'}) as result:
-        assert result.project.isdir()
-        # Test lint rule contains google style
-        flake8_conf_file_apth = result.project.join("setup.cfg")
-        lines = flake8_conf_file_apth.readlines()
-        assert "docstring-convention = google" in ''.join(lines)
+def test_docstrings_style(bake):
+    result = bake(docstrings_style='google')
+    assert result.project.isdir()
+    # Test lint rule contains google style
+    flake8_conf_file_apth = result.project.join("setup.cfg")
+    lines = flake8_conf_file_apth.readlines()
+    assert "docstring-convention = google" in ''.join(lines)
 
 
 # def test_project_with_hyphen_in_module_name(cookies):
@@ -217,9 +176,9 @@ def test_docstrings_style(cookies):
     ({'command_line_interface': "No command-line interface"}, False),
     ({'command_line_interface': 'click'}, True),
 ])
-def test_bake_with_no_console_script(cookies, args):
+def test_bake_with_no_console_script(bake, args):
     context, is_present = args
-    result = cookies.bake(extra_context=context)
+    result = bake(**context)
     project_path, project_slug, project_dir = project_info(result)
     found_project_files = os.listdir(project_dir)
     assert ("cli.py" in found_project_files) == is_present
@@ -229,9 +188,9 @@ def test_bake_with_no_console_script(cookies, args):
         assert ('[tool.poetry.scripts]' in pyproject_file.read()) == is_present
 
 
-def test_bake_with_console_script_cli(cookies):
+def test_bake_with_console_script_cli(bake):
     context = {'command_line_interface': 'click'}
-    result = cookies.bake(extra_context=context)
+    result = bake(**context)
     project_path, project_slug, project_dir = project_info(result)
     module_path = os.path.join(project_dir, 'cli.py')
 
@@ -241,3 +200,80 @@ def test_bake_with_console_script_cli(cookies):
     out = execute([sys.executable, module_path, "--help"], project_dir)
 
     assert 'Show this message and exit.' in out
+
+
+def test_bake_matrix(tmp_path):
+    """Combinations of choice options are baked concurrently, each into its own folder."""
+    contexts = combinations({'open_source_license': 'MIT', 'docstrings_style': 'google'})
+    assert len(contexts) == 4
+
+    results = run_matrix(contexts, tmp_path, jobs=2)
+    assert [_r.context for _r in results] == contexts
+    assert all(_r.error is None and _r.elapsed > 0 for _r in results)
+    assert all((_r.output_dir / 'python-boilerplate' / _DEPENDENCY_FILE).is_file() for _r in results)
+
+
+def test_bake_git_repository(bake):
+    result = bake()
+    assert result.project.join('.git', 'HEAD').read().strip() == 'ref: refs/heads/main'
+
+
+def test_bulk_bake(tmp_path):
+    contexts_csv = tmp_path / 'contexts.csv'
+    contexts_csv.write_text('project_name,pkg_name,doc_generator\n'
+                            'Service A,,\n'
+                            'Service B,,mkdocstring\n'
+                            'Service C,service-c,\n')
+    contexts = read_contexts(contexts_csv)
+    assert contexts[0] == {'project_name': 'Service A'}
+
+    ok_a, ok_b, invalid = bake_all(contexts, tmp_path / 'out', jobs=2)
+    assert ok_a.error is None and ok_b.error is None
+    # hooks ran: documentation tree and git repository
+    assert (tmp_path / 'out' / 'service-a' / 'docs' / 'source').is_dir()
+    assert (tmp_path / 'out' / 'service-b' / 'mkdocs.yml').is_file()
+    assert (tmp_path / 'out' / 'service-b' / '.git').is_dir()
+    # pre_gen_project rejects the package name
+    assert invalid.project_dir is None and 'pre_gen_project' in invalid.error
+
+
+def test_update_project(tmp_path, monkeypatch):
+    for var in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME', 'GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(var, 'test')
+    template = tmp_path / 'template'
+    shutil.copytree(TEMPLATE_DIR / '{{cookiecutter.project_slug}}', template / '{{cookiecutter.project_slug}}')
+    shutil.copytree(TEMPLATE_DIR / 'hooks', template / 'hooks')
+    shutil.copy(TEMPLATE_DIR / 'cookiecutter.json', template)
+
+    def commit(message):
+        subprocess.run(['git', 'add', '-A'], cwd=template, check=True)
+        subprocess.run(['git', 'commit', '-q', '-m', message], cwd=template, check=True)
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=template, check=True, capture_output=True,
+                              text=True).stdout.strip()
+
+    subprocess.run(['git', 'init', '-q'], cwd=template, check=True)
+    base = commit('base')
+    from cookiecutter.main import cookiecutter
+    project = Path(cookiecutter(str(template), no_input=True, output_dir=str(tmp_path), default_config=True))
+    assert json.loads((project / '.cookiecutter.json').read_text())['_commit'] == base
+    assert update(project, template_dir=template) == []
+
+    # project and template change different lines of the same file; the template changes other files too
+    readme = project / 'README.md'
+    readme.write_text('project line\n' + readme.read_text())
+    template_readme = template / '{{cookiecutter.project_slug}}' / 'README.md'
+    template_readme.write_text(template_readme.read_text() + '\ntemplate line\n')
+    sources = template / '{{cookiecutter.project_slug}}'
+    (sources / 'sphinx_docs' / 'new.md').write_text('# {{ cookiecutter.project_name }}\n')
+    (sources / 'noxfile.py').unlink()
+    ref = commit('template fixes')
+
+    assert update(project, dry_run=True, template_dir=template) == [
+        ('README.md', 'merged'), ('docs/new.md', 'added'), ('noxfile.py', 'removed')]
+    assert json.loads((project / '.cookiecutter.json').read_text())['_commit'] == base
+
+    update(project, template_dir=template)
+    assert readme.read_text().startswith('project line\n') and readme.read_text().endswith('\ntemplate line\n')
+    assert (project / 'docs' / 'new.md').read_text() == '# Python Boilerplate\n'
+    assert not (project / 'noxfile.py').exists()
+    assert json.loads((project / '.cookiecutter.json').read_text())['_commit'] == ref
@@ -0,0 +1,195 @@
+"""Update a generated project with the template changes made since it was baked.
+
+The project ``.cookiecutter.json`` holds its bake options and the template commit it was baked from. Nothing happens
+if no template source changed since that commit; otherwise the template is rendered with the project options at
+that commit (base) and at the target one, and every file whose rendering changed is merged three-way into the
+project: files the project did not modify are replaced, the others are merged by ``git merge-file``, leaving
+conflict markers where both sides changed the same lines. ``.cookiecutter.json`` is moved to the target commit.
+
+Usage:
+    python update_project.py PROJECT_DIR [--ref REF] [--base COMMIT] [--dry-run] [--template TEMPLATE_DIR]
+
+Review the result with ``git diff`` into the project, conflicts make the exit code 1.
+"""
+import argparse
+import filecmp
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+TEMPLATE_DIR = Path(__file__).resolve().parent
+CONTEXT_FILE = '.cookiecutter.json'
+
+# template sources: a change elsewhere (docs, tests of the template) does not affect the generated projects
+_TEMPLATE_SOURCES = ('{{cookiecutter.project_slug}}', 'cookiecutter.json', 'hooks')
+
+
+class Change(NamedTuple):
+    path: str
+    action: str
+
+
+def _git(*args: str, cwd: Path = TEMPLATE_DIR) -> str:
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def changed_sources(base: str, ref: str, template_dir: Path = TEMPLATE_DIR) -> List[str]:
+    """Template sources changed between two commits.
+
+    Args:
+        base: commit the project was baked from.
+        ref: target commit.
+        template_dir: template git repository.
+
+    Returns:
+        changed paths, relative to the template root.
+    """
+    return _git('diff', '--name-only', base, ref, '--', *_TEMPLATE_SOURCES, cwd=template_dir).splitlines()
+
+
+def render(commit: str, context: Dict[str, str], output_dir: Path, template_dir: Path = TEMPLATE_DIR) -> Path:
+    """Bake the template at a commit.
+
+    Args:
+        commit: template commit.
+        context: project options.
+        output_dir: folder of the rendered project.
+        template_dir: template git repository.
+
+    Returns:
+        rendered project folder.
+    """
+    from cookiecutter.main import cookiecutter  # pylint: disable=C0415
+
+    _source = output_dir / 'template'
+    _archive = subprocess.run(['git', 'archive', '--format=tar', commit, *_TEMPLATE_SOURCES], cwd=template_dir,
+                              check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(_archive)) as _tar:
+        _tar.extractall(_source)  # nosec B202: archive of the template repository
+    # the project is already set up, hooks only shape the file tree
+    _context = dict(context, install_precommit_hooks='n')
+    return Path(cookiecutter(str(_source), no_input=True, extra_context=_context, output_dir=str(output_dir),
+                             default_config=True))
+
+
+def _files(root: Path) -> Dict[str, Path]:
+    return {_p.relative_to(root).as_posix(): _p for _p in root.rglob('*')
+            if _p.is_file() and '.git' not in _p.relative_to(root).parts}
+
+
+def _same(left: Optional[Path], right: Optional[Path]) -> bool:
+    if left is None or right is None:
+        return left is right
+    return filecmp.cmp(left, right, shallow=False)
+
+
+def _merge(project_file: Path, base: Optional[Path], new: Path, labels: List[str]) -> bool:
+    """Merge base..new changes into project_file, in place.
+
+    Returns:
+        False on conflicts; binary files are not merged, the project version is kept.
+    """
+    with tempfile.NamedTemporaryFile(suffix='.base') as _empty:
+        _proc = subprocess.run(['git', 'merge-file', '-L', labels[0], '-L', labels[1], '-L', labels[2],
+                                str(project_file), str(base or _empty.name), str(new)], capture_output=True)
+    return _proc.returncode == 0
+
+
+def update(project_dir: Path, ref: str = 'HEAD', base: Optional[str] = None, dry_run: bool = False,
+           template_dir: Path = TEMPLATE_DIR) -> List[Change]:
+    """Merge the template changes since the project bake into the project.
+
+    Args:
+        project_dir: generated project.
+        ref: template target commit.
+        base: template commit the project was baked from, default the one of .cookiecutter.json.
+        dry_run: report the changes without touching the project.
+        template_dir: template git repository.
+
+    Returns:
+        changed files and action: added, updated, merged, conflict, removed, or kept when the project deleted or
+        modified a file the template changed or removed.
+
+    Raises:
+        ValueError: the bake commit is unknown.
+    """
+    _context_file = project_dir / CONTEXT_FILE
+    _stored = json.loads(_context_file.read_text(encoding='utf-8'))
+    _base = base or _stored.get('_commit')
+    if not _base:
+        raise ValueError(f"{_context_file} does not record the template commit, pass it as base")
+    _ref = _git('rev-parse', ref, cwd=template_dir).strip()
+    _changes = []
+    if changed_sources(_base, _ref, template_dir):
+        _changes = _merge_renders(project_dir, _stored, _base, _ref, dry_run, template_dir)
+
+    if not dry_run:
+        _stored['_commit'] = _ref
+        _context_file.write_text(json.dumps(_stored, indent=4) + '\n', encoding='utf-8')
+    return _changes
+
+
+def _merge_renders(project_dir: Path, stored: dict, base: str, ref: str, dry_run: bool,
+                   template_dir: Path) -> List[Change]:
+    _context = {_k: _v for _k, _v in stored.items() if not _k.startswith('_')}
+    _changes = []
+    with tempfile.TemporaryDirectory(prefix='update_project.') as _tmp:
+        _old = _files(render(base, _context, Path(_tmp) / 'base', template_dir))
+        _new = _files(render(ref, _context, Path(_tmp) / 'new', template_dir))
+        _labels = [project_dir.name, f"template {base[:12]}", f"template {ref[:12]}"]
+
+        for _path in sorted((set(_old) | set(_new)) - {CONTEXT_FILE}):
+            _base_file, _new_file = _old.get(_path), _new.get(_path)
+            if _same(_base_file, _new_file):
+                continue
+            _target = project_dir / _path
+            _current = _target if _target.is_file() else None
+            if _current is not None and _same(_current, _new_file):
+                continue
+
+            if _new_file is None:
+                _action = 'removed' if _same(_current, _base_file) else 'kept'
+                if _action == 'removed' and not dry_run:
+                    _target.unlink()
+            elif _current is None:
+                _action = 'added' if _base_file is None else 'kept'
+            elif _same(_current, _base_file):
+                _action = 'updated'
+            else:
+                _action = 'merged'
+                if not dry_run:
+                    _action = 'merged' if _merge(_target, _base_file, _new_file, _labels) else 'conflict'
+            if _action in ('added', 'updated') and not dry_run:
+                _target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(_new_file, _target)
+            _changes.append(Change(_path, _action))
+
+    return _changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _parser.add_argument('project_dir', type=Path, help="generated project")
+    _parser.add_argument('--ref', default='HEAD', help="template target commit, default HEAD")
+    _parser.add_argument('--base', help="template commit of the bake, default the one of .cookiecutter.json")
+    _parser.add_argument('--dry-run', '-n', action='store_true', help="report the changes only")
+    _parser.add_argument('--template', type=Path, default=TEMPLATE_DIR,
+                         help="template git repository, default this one")
+    _args = _parser.parse_args(argv)
+
+    _changes = update(_args.project_dir, _args.ref, _args.base, _args.dry_run, _args.template)
+    for _change in _changes:
+        print(f"{_change.action:9} {_change.path}")
+    if not _changes:
+        print("project is up to date")
+    return 1 if any(_c.action == 'conflict' for _c in _changes) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
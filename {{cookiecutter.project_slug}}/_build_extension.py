@@ -3,11 +3,26 @@
 """Module to build C/C++ extension with Poetry."""
 
 import configparser
+import hashlib
+import importlib.util
+import json
 import os
 import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from filecmp import cmp
+from functools import lru_cache
 from glob import glob
 from os.path import join, relpath, splitext
+from pathlib import Path
 
+from setuptools.command.build_clib import build_clib
+from setuptools.command.build_ext import build_ext
 from setuptools.command.develop import develop
 from setuptools.extension import Extension
 
@@ -50,7 +65,8 @@ _LIBS = [
         {
             "libs": ['libs/<C_C++_sourcecode_folder>'],
             # Building library part
-            "lib_cflags": ["-O2", "-std=c99", "-Wall", "-fpic", "-Wextra", f"-march={_arch}", "-DADD_EXPORTS"],
+            # optimization and -march flags come from the build profile, see _PROFILES
+            "lib_cflags": ["-std=c99", "-Wall", "-fpic", "-Wextra", "-DADD_EXPORTS"],
             "lib_lflags": ["-shared", _lflags],
             # Python extension part
             # always define PY_SSIZE_T_CLEAN , see https://docs.python.org/3/extending/extending.html
@@ -62,6 +78,332 @@ _LIBS = [
     )
 ]
 
+# build profiles, flags are appended to the library and extension ones: last flag wins over python's CFLAGS
+#   (e.g. -O3 -DNDEBUG). Profile is selected by BUILD_EXT_PROFILE env var, else by build_profile key of
+#   [tool.{{ cookiecutter.pkg_name }}] table into pyproject.toml, else release.
+_PROFILES = {
+    'debug': {'cflags': ['-O0', '-g3', '-UNDEBUG'], 'lflags': []},
+    'release': {'cflags': ['-O2', '-DNDEBUG'], 'lflags': []},
+    'release-lto': {'cflags': ['-O3', '-DNDEBUG', '-flto=auto'], 'lflags': ['-O3', '-flto=auto']},
+    # release-lto plus profile data: instrumented build when BUILD_EXT_PGO_PHASE=generate, see pgo nox session
+    'pgo': {'cflags': ['-O3', '-DNDEBUG', '-flto=auto'], 'lflags': ['-O3', '-flto=auto']},
+}
+_DEFAULT_PROFILE = 'release'
+# instruction set of every profile: baseline (_arch, portable wheels), x86-64-v3 (AVX2 era CPUs) or native
+#   (the build machine), selected by BUILD_EXT_TUNE env var, else by build_tune key of pyproject.toml table.
+# Baseline x86-64 builds on linux, pgo profile excluded, compile functions marked BUILD_EXT_HOT once per target
+#   (AVX2 and default), the dynamic loader picks the best one at runtime:
+#   BUILD_EXT_HOT double dot(const double *a, const double *b, int size) { ... }
+_TUNES = ('baseline', 'x86-64-v3', 'native')
+_HOT_MACRO = 'BUILD_EXT_HOT'
+_PGO_DIR = Path(os.environ.get('BUILD_EXT_PGO_DIR', join('.cache', 'build_extension', 'pgo'))).absolute()
+
+
+def _tool_config() -> dict:
+    try:
+        with open('pyproject.toml', mode='rb') as _fp:
+            return tomllib.load(_fp).get('tool', {}).get('{{ cookiecutter.pkg_name }}', {})
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def _tree_digest(folder: Path) -> str:
+    _hash = hashlib.sha256()
+    for _file in sorted(folder.rglob('*')) if folder.is_dir() else []:
+        if _file.is_file():
+            _hash.update(_file.name.encode())
+            _hash.update(_file.read_bytes())
+    return _hash.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def build_flags() -> dict:
+    """Compile flags, link flags and macros of the selected build profile and tune.
+
+    Returns:
+        dict with profile, tune, cflags, lflags and macros keys.
+
+    Raises:
+        ValueError: unknown profile or tune.
+    """
+    _config = _tool_config()
+    _profile = os.environ.get('BUILD_EXT_PROFILE') or _config.get('build_profile') or _DEFAULT_PROFILE
+    _tune = os.environ.get('BUILD_EXT_TUNE') or _config.get('build_tune') or 'baseline'
+    if _profile not in _PROFILES:
+        raise ValueError(f"unknown build profile {_profile}, choose one of {', '.join(_PROFILES)}")
+    if _tune not in _TUNES:
+        raise ValueError(f"unknown build tune {_tune}, choose one of {', '.join(_TUNES)}")
+    if _tune == 'x86-64-v3' and _arch != 'x86-64':
+        raise ValueError(f"build tune {_tune} needs a x86-64 machine, not {platform.machine()}")
+
+    _cflags = [*_PROFILES[_profile]['cflags'], f"-march={_arch if _tune == 'baseline' else _tune}"]
+    _lflags = list(_PROFILES[_profile]['lflags'])
+    # instrumented ifunc resolvers run before profiling runtime is ready and crash: no dispatch into pgo builds
+    _dispatch = _tune == 'baseline' and _arch == 'x86-64' and 'linux' in _platform and _profile != 'pgo'
+    _macros = [(_HOT_MACRO, '__attribute__((target_clones("avx2","default")))' if _dispatch else '')]
+
+    if _profile == 'pgo':
+        if os.environ.get('BUILD_EXT_PGO_PHASE') == 'generate':
+            _pgo = [f"-fprofile-generate={_PGO_DIR}", '-fprofile-update=atomic']
+        elif any(_PGO_DIR.rglob('*.gcda')):
+            _pgo = [f"-fprofile-use={_PGO_DIR}", '-fprofile-correction', '-Wno-missing-profile']
+        else:
+            print(f"WARNING: no profile data into {_PGO_DIR}, pgo profile builds as release-lto")
+            _pgo = []
+        _cflags.extend(_pgo)
+        _lflags.extend(_pgo)
+
+    return {'profile': _profile, 'tune': _tune, 'cflags': _cflags, 'lflags': _lflags, 'macros': _macros}
+
+
+def _flags_changed(command) -> bool:
+    """Tell if build flags changed since the previous run of command, recording the current ones.
+
+    setuptools only compares mtime of sources and outputs: a profile switch must force the rebuild.
+    """
+    _flags = dict(build_flags())
+    if any(_f.startswith('-fprofile-use') for _f in _flags['cflags']):
+        _flags['profile_data'] = _tree_digest(_PGO_DIR)
+    _current = json.dumps(_flags, sort_keys=True)
+    _stamp = Path(command.build_temp) / f".{command.get_command_name()}_flags.json"
+    try:
+        _changed = _stamp.read_text() != _current
+    except OSError:
+        _changed = True
+    _stamp.parent.mkdir(parents=True, exist_ok=True)
+    _stamp.write_text(_current)
+    return _changed
+
+
+# opt-in compilation of pure-Python modules of the package listed into accelerate key of pyproject.toml table
+#   (e.g. accelerate = ["models", "pipeline"]) with accelerator key, mypyc (default) or cython, overridden by
+#   BUILD_EXT_ACCELERATOR env var, "none" disables it. Sources stay into the package: they are imported when an
+#   extension is missing, see {{ cookiecutter.pkg_name }}/acceleration.py
+_ACCELERATORS = ('mypyc', 'cython', 'none')
+
+
+def accelerated_extensions() -> list:
+    """Extensions compiling the modules listed into accelerate key of pyproject.toml table.
+
+    Returns:
+        optional extensions: a failed compilation leaves the pure-Python module in place.
+
+    Raises:
+        ValueError: unknown accelerator.
+    """
+    _config = _tool_config()
+    _modules = _config.get('accelerate') or []
+    _accelerator = os.environ.get('BUILD_EXT_ACCELERATOR') or _config.get('accelerator') or 'mypyc'
+    if _accelerator not in _ACCELERATORS:
+        raise ValueError(f"unknown accelerator {_accelerator}, choose one of {', '.join(_ACCELERATORS)}")
+    if not _modules or _accelerator == 'none':
+        return []
+
+    _sources = [_unix_form(join('{{ cookiecutter.pkg_name }}', *_m.split('.'))) + '.py' for _m in _modules]
+    print(f"ACCELERATE: {', '.join(_modules)} with {_accelerator}")
+    try:
+        if _accelerator == 'mypyc':
+            from mypyc.build import mypycify  # pylint: disable=C0415
+
+            _extensions = mypycify(_sources, opt_level='3')
+        else:
+            from Cython.Build import cythonize  # pylint: disable=C0415
+
+            _extensions = cythonize(_sources, build_dir=join('build', 'cython'), nthreads=_JOBS, quiet=True,
+                                    compiler_directives={'language_level': '3', 'binding': True})
+    except ImportError as _error:
+        # accelerator is not into build-system requires: stay pure-Python
+        print(f"WARNING: {_accelerator} not available ({_error}), modules stay pure-Python")
+        return []
+    except SystemExit:
+        # mypyc exits when type checking fails, errors are already printed
+        print(f"WARNING: {_accelerator} failed, modules stay pure-Python")
+        return []
+
+    for _extension in _extensions:
+        _extension.optional = True
+        _extension.accelerated = True
+    return _extensions
+
+
+@lru_cache(maxsize=None)
+def _native_target(compiler_executable: str) -> str:
+    """Target options enabled by -march=native: objects built on different CPUs must not share cache entries."""
+    try:
+        return subprocess.run([compiler_executable, '-march=native', '-Q', '--help=target'],
+                              capture_output=True, text=True, check=False).stdout
+    except OSError:
+        return platform.processor()
+
+
+# parallel jobs used to compile translation units and extensions, all cores by default
+_JOBS = int(os.environ.get('BUILD_EXT_JOBS', 0)) or os.cpu_count() or 1
+# content addressed object files cache (ccache-like), shared by every build of this project;
+#   BUILD_EXT_NO_CACHE=1 disables it
+_OBJECT_CACHE_DIR = Path(os.environ.get('BUILD_EXT_CACHE_DIR', join('.cache', 'build_extension')))
+_OBJECT_CACHE_ENABLED = not os.environ.get('BUILD_EXT_NO_CACHE')
+_HEADER_PATTERNS = ('*.h', '*.hh', '*.hpp', '*.hxx', '*.inc')
+
+
+def _headers(folder: str) -> list:
+    return sorted(_h for _pattern in _HEADER_PATTERNS for _h in glob(join(folder, '**', _pattern), recursive=True))
+
+
+@lru_cache(maxsize=None)
+def _headers_digest(folder: str) -> str:
+    _hash = hashlib.sha256()
+    for _header in _headers(folder):
+        _hash.update(_header.encode())
+        with open(_header, mode='rb') as _fp:
+            _hash.update(_fp.read())
+    return _hash.hexdigest()
+
+
+def _object_key(compiler, src: str, cc_args: list, extra_postargs: list, pp_opts: list) -> str:
+    """Cache key of the object built from src: compiler command line, source and project headers content."""
+    _hash = hashlib.sha256()
+    for _part in (compiler.compiler_so, cc_args, extra_postargs, pp_opts):
+        _hash.update(repr(_part).encode())
+    with open(src, mode='rb') as _fp:
+        _hash.update(_fp.read())
+    _args = [*cc_args, *extra_postargs]
+    if any(_a.startswith('-fprofile-use') for _a in _args):
+        _hash.update(_tree_digest(_PGO_DIR).encode())
+    if '-march=native' in _args:
+        _hash.update(_native_target(compiler.compiler_so[0]).encode())
+    # headers out of the project (python, system) are identified by their path only, into pp_opts
+    _folders = {os.path.dirname(src) or '.'}
+    _folders.update(_opt[2:] for _opt in pp_opts if _opt.startswith('-I') and not os.path.isabs(_opt[2:]))
+    for _folder in sorted(_folders):
+        _hash.update(_headers_digest(_folder).encode())
+    return _hash.hexdigest()
+
+
+def _restore_object(cached: Path, obj: str) -> None:
+    """Copy cached object into place, unless obj already has the same content.
+
+    Keeping an up-to-date object untouched keeps its mtime: linker is not run again if no object changed.
+    """
+    if os.path.isfile(obj) and cmp(cached, obj, shallow=False):
+        return
+    os.makedirs(os.path.dirname(obj) or '.', exist_ok=True)
+    shutil.copyfile(cached, obj)
+
+
+def _store_object(obj: str, cached: Path) -> None:
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    _fd, _tmp = tempfile.mkstemp(dir=cached.parent, prefix=f".{cached.name}.")
+    os.close(_fd)
+    shutil.copyfile(obj, _tmp)
+    os.replace(_tmp, cached)
+
+
+def _parallel_cached_compiler(compiler) -> None:
+    """Make compiler build translation units in parallel, through the object cache.
+
+    Only compilers implementing ``_compile`` (unix, mingw32, cygwin) are changed, MSVC is left as it is.
+    """
+    if compiler.compiler_type not in ('unix', 'mingw32', 'cygwin'):
+        return
+    _compile_one = compiler._compile  # pylint: disable=W0212
+
+    def _compile(obj, src, ext, cc_args, extra_postargs, pp_opts):
+        if not _OBJECT_CACHE_ENABLED:
+            _compile_one(obj, src, ext, cc_args, extra_postargs, pp_opts)
+            return
+        _cached = _OBJECT_CACHE_DIR / f"{_object_key(compiler, src, cc_args, extra_postargs, pp_opts)}{splitext(obj)[1]}"
+        if _cached.is_file():
+            _restore_object(_cached, obj)
+            return
+        _compile_one(obj, src, ext, cc_args, extra_postargs, pp_opts)
+        _store_object(obj, _cached)
+
+    def _compile_all(sources, output_dir=None, macros=None, include_dirs=None, debug=0, extra_preargs=None,
+                     extra_postargs=None, depends=None):
+        # same as CCompiler.compile, with a pool of workers: each _compile call spawns the compiler process
+        macros, objects, extra_postargs, pp_opts, build = compiler._setup_compile(  # pylint: disable=W0212
+            output_dir, macros, include_dirs, sources, depends, extra_postargs
+        )
+        cc_args = compiler._get_cc_args(pp_opts, debug, extra_preargs)  # pylint: disable=W0212
+        _todo = [(_obj, *build[_obj]) for _obj in objects if _obj in build]
+        with ThreadPoolExecutor(max_workers=min(_JOBS, len(_todo)) or 1) as _pool:
+            # list() re-raises the first CompileError
+            list(_pool.map(lambda _item: _compile(*_item, cc_args, extra_postargs, pp_opts), _todo))
+        return objects
+
+    compiler._compile = _compile  # pylint: disable=W0212
+    compiler.compile = _compile_all
+
+
+class CachedBuildClib(build_clib):
+    """build_clib compiling in parallel, through the object cache."""
+
+    def run(self):
+        if _flags_changed(self):
+            # build_clib compiles only when a source is newer than its object, force is not checked:
+            #   objects built with other flags must go, the object cache restores them if already built
+            for _obj in [*Path(self.build_temp).rglob('*.o'), *Path(self.build_temp).rglob('*.obj')]:
+                _obj.unlink()
+            self.force = True
+        super().run()
+
+    def build_libraries(self, libraries):
+        _parallel_cached_compiler(self.compiler)
+        if any(_f.startswith('-flto') for _f in build_flags()['cflags']) and shutil.which('gcc-ar'):
+            # archive index of LTO objects needs the linker plugin
+            self.compiler.set_executable('archiver', ['gcc-ar', '-cr'])
+        super().build_libraries(libraries)
+
+
+class CachedBuildExt(build_ext):
+    """build_ext building extensions in parallel, through the object cache."""
+
+    def finalize_options(self):
+        if not self.parallel:
+            self.parallel = _JOBS
+        super().finalize_options()
+
+    def run(self):
+        if _flags_changed(self):
+            self.force = True
+        super().run()
+
+    def build_extensions(self):
+        _parallel_cached_compiler(self.compiler)
+        super().build_extensions()
+
+        # accelerated modules may depend on each other (mypyc shared library): all or none of them
+        _accelerated = [_e for _e in self.extensions if getattr(_e, 'accelerated', False)]
+        _built = [self.get_ext_fullpath(_e.name) for _e in _accelerated]
+        if not all(os.path.isfile(_path) for _path in _built):
+            self.warn("accelerated modules not built, they stay pure-Python")
+            for _path in _built:
+                if os.path.isfile(_path):
+                    os.remove(_path)
+
+    def build_extension(self, ext):
+        # objects alone decide if linking is needed: relink when a static library of ext changed too
+        _ext_path = self.get_ext_fullpath(ext.name)
+        if self.distribution.has_c_libraries() and os.path.isfile(_ext_path):
+            _clib_dir = self.get_finalized_command('build_clib').build_clib
+            _archives = [self.compiler.library_filename(_lib, output_dir=_clib_dir) for _lib in ext.libraries or []]
+            if any(os.path.getmtime(_a) > os.path.getmtime(_ext_path) for _a in _archives if os.path.isfile(_a)):
+                os.remove(_ext_path)
+        super().build_extension(ext)
+
+
+def write_metadata() -> None:
+    """Emit ``{{ cookiecutter.pkg_name }}/_metadata.py``, the project metadata as literal constants.
+
+    The writer is loaded from its file: the package being built is not imported.
+    """
+    _spec = importlib.util.spec_from_file_location(
+        '_metadata_writer', join('{{ cookiecutter.pkg_name }}', 'metadata.py'))
+    _writer = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_writer)
+    if _writer.write():
+        print(f"METADATA: {_writer.METADATA_MODULE} written")
+
 
 class CustomDevelop(develop):
     """Custom install procedure.
@@ -80,9 +422,11 @@ class CustomDevelop(develop):
     """
 
     def run(self) -> None:  # type: ignore
+        write_metadata()
         # build archives (.lib) these are declared in the `libraries` kwarg of
         # setup(). Extensions may depend on these, so we have to build the libs
-        # them first.
+        # them first. Unchanged translation units come from the object cache,
+        # the archive is relinked only when one of its objects changed.
         self.run_command("build_clib")
         super().run()
 
@@ -134,6 +478,9 @@ def build(setup_kwargs):
     """
 
     _add_compiler_to_setup_cfg(_c_compiler)
+    write_metadata()
+    _flags = build_flags()
+    print(f"BUILD PROFILE: {_flags['profile']}, TUNE: {_flags['tune']}")
 
     setup_kwargs.update(
         {
@@ -151,6 +498,15 @@ def build(setup_kwargs):
                             for path in glob(join(root, '*.c'))
                             # if '<something to exclude from build>' not in path
                         ],
+                        # headers are dependencies of every object: a change triggers compilation
+                        "obj_deps": {
+                            "": [
+                                _unix_form(path)
+                                for _, _source_libs in _LIBS
+                                for _source_folder in _source_libs['libs']
+                                for path in _headers(_source_folder)
+                            ]
+                        },
                         # flags and dependencies of this library
                         # "include_dirs": ...
                         # "libraries": ...
@@ -159,7 +515,9 @@ def build(setup_kwargs):
                             for pylib, _source_libs in _LIBS
                             for itm in _source_libs['lib_cflags']
                             # if pylib == '<py_extension_name>'
-                        ],
+                        ]
+                        + _flags['cflags'],
+                        "macros": _flags['macros'],
                         "lflags": [
                             itm
                             for pylib, _source_libs in _LIBS
@@ -173,18 +531,140 @@ def build(setup_kwargs):
                 Extension(
                     splitext(relpath(_unix_form(path), start='.').replace(os.sep, '.'))[0],
                     sources=[_unix_form(path)],
-                    define_macros=_source_libs['extension_define_macros'],
+                    depends=[
+                        _unix_form(_header) for _folder in _source_libs['libs'] for _header in _headers(_folder)
+                    ],
+                    define_macros=_source_libs['extension_define_macros'] + _flags['macros'],
                     include_dirs=_source_libs['libs'],
                     language=_source_libs["extension_language"],
-                    extra_compile_args=_source_libs["extension_extra_compile_args"],
-                    extra_link_args=_source_libs["extension_extra_link_args"],
+                    extra_compile_args=_source_libs["extension_extra_compile_args"] + _flags['cflags'],
+                    extra_link_args=_source_libs["extension_extra_link_args"] + _flags['lflags'],
                 )
                 for _py_lib, _source_libs in _LIBS
                 for root, _, _ in os.walk(os.sep.join([_py_lib]))
                 for path in glob(join(root, '*.c'))
-            ],
+            ]
+            + accelerated_extensions(),
             # hook into the build process to build our external sources before
             # we build and install the package.
-            "cmdclass": {"develop": CustomDevelop},
+            "cmdclass": {"develop": CustomDevelop, "build_clib": CachedBuildClib, "build_ext": CachedBuildExt},
         }
     )
+    # build_ext links every declared library into every extension, accelerated modules included:
+    #   a library without sources must not be declared
+    setup_kwargs["libraries"] = [_lib for _lib in setup_kwargs["libraries"] if _lib[1]["sources"]]
+
+
+# benchmark of the build steps run by `poetry install` (build_clib + build_ext of the develop command) on a
+#   generated sample library, with the selected build profile: python _build_extension.py [units]
+_BENCH_UNIT = """#include "bench.h"
+
+BUILD_EXT_HOT double bench_unit_@N@(const double *values, int size) {
+    double acc = 0.0;
+    for (int i = 0; i < size; ++i) {
+        for (int j = 0; j < @K@ % 7 + 3; ++j) {
+            acc += values[i] * (j + 1) / (values[(i + j) % size] + 1.0);
+        }
+    }
+    return acc;
+}
+"""
+_BENCH_FUNCTIONS = 40
+_BENCH_EXTENSION = """#include <Python.h>
+#include "bench.h"
+
+static PyObject *run(PyObject *self, PyObject *args) {
+    double values[4] = {1.0, 2.0, 3.0, 4.0};
+    return PyFloat_FromDouble(bench_unit_0_0(values, 4));
+}
+
+static PyMethodDef methods[] = {
+    {"run", run, METH_NOARGS, NULL},
+    {NULL, NULL, 0, NULL},
+};
+static struct PyModuleDef module = {PyModuleDef_HEAD_INIT, "bench_ext", NULL, -1, methods};
+
+PyMODINIT_FUNC PyInit_bench_ext(void) { return PyModule_Create(&module); }
+"""
+_BENCH_SETUP = """import sys
+from glob import glob
+
+sys.path.insert(0, @HERE@)
+from setuptools import Extension, setup
+
+_build = __import__(@MODULE@)
+_flags = _build.build_flags()
+
+setup(
+    name="bench_ext",
+    version="0.0.0",
+    libraries=[("bench", {"sources": sorted(glob("libs/bench/*.c")), "cflags": ["-std=c99", *_flags["cflags"]],
+                          "macros": _flags["macros"], "obj_deps": {"": ["libs/bench/bench.h"]}})],
+    ext_modules=[Extension("bench_ext", sources=["bench_ext.c"], include_dirs=["libs/bench"],
+                           libraries=["bench"], depends=["libs/bench/bench.h"], define_macros=_flags["macros"],
+                           extra_compile_args=_flags["cflags"], extra_link_args=_flags["lflags"])],
+    cmdclass={"build_clib": _build.CachedBuildClib, "build_ext": _build.CachedBuildExt},
+)
+"""
+
+
+def _bench_unit(unit: int) -> str:
+    return "\n".join(_BENCH_UNIT.replace("@N@", f"{unit}_{_i}").replace("@K@", str(unit + _i))
+                     for _i in range(_BENCH_FUNCTIONS))
+
+
+def _bench_sources(folder: Path, units: int) -> None:
+    _lib = folder / 'libs' / 'bench'
+    _lib.mkdir(parents=True)
+    _prototypes = [f"double bench_unit_{_u}_{_i}(const double *values, int size);"
+                   for _u in range(units) for _i in range(_BENCH_FUNCTIONS)]
+    (_lib / 'bench.h').write_text("\n".join(["#pragma once", *_prototypes, ""]))
+    for _u in range(units):
+        (_lib / f"unit_{_u}.c").write_text(_bench_unit(_u))
+    (folder / 'bench_ext.c').write_text(_BENCH_EXTENSION)
+    (folder / 'setup.py').write_text(_BENCH_SETUP.replace('@HERE@', repr(os.path.dirname(os.path.abspath(__file__))))
+                                     .replace('@MODULE@', repr(Path(__file__).stem)))
+
+
+def _bench_build(folder: Path, **env: str) -> float:
+    _start = time.perf_counter()
+    subprocess.run([sys.executable, 'setup.py', '-q', 'build_clib', 'build_ext', '--inplace'],
+                   cwd=folder, env=os.environ | {'BUILD_EXT_CACHE_DIR': str(folder / 'cache')} | env,
+                   check=True, capture_output=True)
+    return time.perf_counter() - _start
+
+
+def _bench_clean(folder: Path) -> None:
+    shutil.rmtree(folder / 'build', ignore_errors=True)
+    for _ext in glob(str(folder / 'bench_ext*.so')) + glob(str(folder / 'bench_ext*.pyd')):
+        os.remove(_ext)
+
+
+def benchmark(units: int = 24) -> dict:
+    """Time cold and warm builds of a sample extension linking a static library of ``units`` C files.
+
+    Args:
+        units: number of translation units of the sample library.
+
+    Returns:
+        elapsed seconds of each scenario.
+    """
+    _timings = {}
+    with tempfile.TemporaryDirectory() as _tmp:
+        _folder = Path(_tmp)
+        _bench_sources(_folder, units)
+        _timings['cold, serial, no cache (previous behaviour)'] = _bench_build(
+            _folder, BUILD_EXT_JOBS='1', BUILD_EXT_NO_CACHE='1')
+        _bench_clean(_folder)
+        _timings[f'cold, {_JOBS} jobs, empty cache'] = _bench_build(_folder)
+        _bench_clean(_folder)
+        _timings['warm: clean build folder, cached objects'] = _bench_build(_folder)
+        _timings['no change: nothing compiled nor linked'] = _bench_build(_folder)
+        (_folder / 'libs' / 'bench' / 'unit_0.c').write_text(_bench_unit(0) + "\n/* changed */\n")
+        _timings['one unit changed: 1 compile, relink'] = _bench_build(_folder)
+    return _timings
+
+
+if __name__ == '__main__':
+    for _scenario, _elapsed in benchmark(*map(int, sys.argv[1:2])).items():
+        print(f"{_elapsed:8.2f}s  {_scenario}")
@@ -0,0 +1,6 @@
+"""Benchmarks of {{ cookiecutter.project_name }}, not shipped with the package.
+
+* ``test_hot_paths``: pytest-benchmark suite run by ``nox -s bench``;
+* ``compare``: regression check of a run against the baseline;
+* ``acceleration``: compiled against pure-Python modules.
+"""
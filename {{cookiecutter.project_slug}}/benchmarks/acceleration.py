@@ -0,0 +1,81 @@
+"""Compiled against pure-Python implementation of the accelerated modules.
+
+Each module workload is timed into fresh interpreters, once with the compiled extension and once with
+``{{ cookiecutter.pkg_name|upper }}_PURE_PYTHON`` set, to decide module by module if compiling is worth it:
+
+    python -m benchmarks.acceleration [module ...]
+
+Modules default to the compiled ones, see ``{{ cookiecutter.pkg_name }}.acceleration``.
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+from {{ cookiecutter.pkg_name }}.acceleration import (
+    IMPLEMENTATION_COMPILED,
+    IMPLEMENTATION_PYTHON,
+    PURE_PYTHON_ENV_VAR,
+    check,
+    compiled_modules,
+)
+
+# timed workload of each module, as timeit (setup, statement); modules without one time their own import
+WORKLOADS: Dict[str, Tuple[str, str]] = {
+    "{{ cookiecutter.pkg_name }}.models": (
+        "from {{ cookiecutter.pkg_name }}.models import PyprojectModel",
+        "PyprojectModel()",
+    ),
+    "{{ cookiecutter.pkg_name }}.pipeline": (
+        "from {{ cookiecutter.pkg_name }} import get_project; "
+        "from {{ cookiecutter.pkg_name }}.pipeline import gather_data",
+        "get_project.cache_clear(); gather_data('pipeline_env_vars.sh')",
+    ),
+}
+_TIMER = """import json, timeit
+_timer = timeit.Timer({statement!r}, setup={setup!r})
+_number, _ = _timer.autorange()
+print(json.dumps(min(_timer.repeat(repeat=5, number=_number)) / _number))
+"""
+
+
+def _time_workload(name: str, pure_python: bool) -> float:
+    _setup, _statement = WORKLOADS.get(
+        name, ("import importlib, sys", f"sys.modules.pop({name!r}, None); importlib.import_module({name!r})")
+    )
+    _env = {_k: _v for _k, _v in os.environ.items() if _k not in (PURE_PYTHON_ENV_VAR, 'CI')}
+    # measure the model building, not the on-disk cache reading
+    _env["{{ cookiecutter.pkg_name|upper }}_NO_CACHE"] = "1"
+    if pure_python:
+        _env[PURE_PYTHON_ENV_VAR] = "1"
+    _proc = subprocess.run([sys.executable, "-c", _TIMER.format(setup=_setup, statement=_statement)],
+                           env=_env, capture_output=True, text=True, check=True)
+    return json.loads(_proc.stdout)
+
+
+def benchmark(modules: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Time the workload of each module with compiled and pure-Python implementations.
+
+    Args:
+        modules: full module names, compiled modules by default.
+
+    Returns:
+        {module name: {implementation: seconds per workload run}} map.
+    """
+    return {
+        _name: {
+            IMPLEMENTATION_COMPILED: _time_workload(_name, pure_python=False),
+            IMPLEMENTATION_PYTHON: _time_workload(_name, pure_python=True),
+        }
+        for _name in (modules or compiled_modules())
+    }
+
+
+if __name__ == '__main__':
+    for _module, _implementation in check().items():
+        print(f"{_module}: {_implementation}")
+    for _module, _timings in benchmark(sys.argv[1:]).items():
+        _speedup = _timings[IMPLEMENTATION_PYTHON] / _timings[IMPLEMENTATION_COMPILED]
+        print(f"{_module}: compiled {_timings[IMPLEMENTATION_COMPILED] * 1e6:.1f} us, "
+              f"python {_timings[IMPLEMENTATION_PYTHON] * 1e6:.1f} us, speedup {_speedup:.2f}x")
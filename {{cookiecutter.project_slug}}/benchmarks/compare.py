@@ -0,0 +1,92 @@
+"""Compare pytest-benchmark JSON results against a baseline.
+
+    python -m benchmarks.compare benchmarks/baseline.json .benchmarks/<commit>.json [--threshold 10]
+
+Exit status is 1 when a benchmark is slower than its baseline by more than threshold percent.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+DEFAULT_THRESHOLD = 10.0
+DEFAULT_STAT = "median"
+
+
+class Comparison(NamedTuple):
+    """Baseline and current value of a benchmark statistic."""
+
+    name: str
+    baseline: Optional[float]
+    current: float
+    threshold: float
+
+    @property
+    def change(self) -> Optional[float]:
+        """Percent change against the baseline, None for new benchmarks."""
+        return None if not self.baseline else (self.current - self.baseline) / self.baseline * 100
+
+    @property
+    def regressed(self) -> bool:
+        """Tell if the benchmark is slower than the baseline by more than threshold."""
+        return self.change is not None and self.change > self.threshold
+
+
+def load_stats(path: Path, stat: str = DEFAULT_STAT) -> Dict[str, float]:
+    """Read a statistic of every benchmark from a pytest-benchmark JSON file.
+
+    Args:
+        path: pytest-benchmark ``--benchmark-json`` file.
+        stat: statistic name, e.g. min, mean, median.
+
+    Returns:
+        {benchmark name: statistic value} map.
+    """
+    _data = json.loads(Path(path).read_text(encoding='utf-8'))
+    return {_b['name']: _b['stats'][stat] for _b in _data['benchmarks']}
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """Compare current statistics against baseline ones.
+
+    Args:
+        baseline: {benchmark name: value} of the baseline.
+        current: {benchmark name: value} of the run to check.
+        threshold: allowed slowdown, in percent of the baseline value.
+
+    Returns:
+        one comparison per current benchmark.
+    """
+    return [Comparison(_name, baseline.get(_name), _value, threshold) for _name, _value in current.items()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Print the comparison table.
+
+    Args:
+        argv: command line arguments.
+
+    Returns:
+        exit status, 1 on regression.
+    """
+    _parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _parser.add_argument('baseline', type=Path)
+    _parser.add_argument('current', type=Path)
+    _parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, percent")
+    _parser.add_argument('--stat', default=DEFAULT_STAT, help="compared statistic")
+    _args = _parser.parse_args(argv)
+
+    _comparisons = compare(load_stats(_args.baseline, _args.stat), load_stats(_args.current, _args.stat),
+                           _args.threshold)
+    for _c in _comparisons:
+        if _c.change is None:
+            print(f"{_c.name:40} {_c.current * 1e3:10.3f} ms  new")
+            continue
+        _status = "REGRESSION" if _c.regressed else "ok"
+        print(f"{_c.name:40} {_c.current * 1e3:10.3f} ms  {_c.change:+7.1f}% vs {_c.baseline * 1e3:.3f} ms  {_status}")
+    return 1 if any(_c.regressed for _c in _comparisons) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
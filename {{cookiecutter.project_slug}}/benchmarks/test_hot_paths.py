@@ -0,0 +1,62 @@
+"""Benchmarks of {{ cookiecutter.project_name }} hot paths, run by ``nox -s bench``."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from {{ cookiecutter.pkg_name }} import get_project
+from {{ cookiecutter.pkg_name }}.model_cache import CACHE_DIR_ENV_VAR
+from {{ cookiecutter.pkg_name }}.models import PyprojectModel
+from {{ cookiecutter.pkg_name }}.pipeline import gather_data
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# start-up benchmarks spawn an interpreter per round
+_PROCESS_ROUNDS = 20
+
+
+@pytest.fixture(autouse=True)
+def _project_env(monkeypatch, tmp_path):
+    # pyproject.toml and .env are read from the current folder
+    monkeypatch.chdir(_PROJECT_ROOT)
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path))
+    # gather_data writes the env file into CI only
+    monkeypatch.delenv("CI", raising=False)
+
+
+def _spawn(*args: str) -> None:
+    subprocess.run([sys.executable, *args], cwd=_PROJECT_ROOT, check=True, capture_output=True)
+
+
+def test_interpreter_startup(benchmark):
+    """Reference for the other start-up benchmarks: bare interpreter."""
+    benchmark.pedantic(_spawn, args=("-c", "pass"), rounds=_PROCESS_ROUNDS, warmup_rounds=1)
+
+
+def test_package_import(benchmark):
+    """Interpreter start-up and package import."""
+    benchmark.pedantic(_spawn, args=("-c", "import {{ cookiecutter.pkg_name }}"), rounds=_PROCESS_ROUNDS,
+                       warmup_rounds=1)
+
+
+def test_project_model(benchmark):
+    """PyprojectModel construction: pyproject.toml parsing and validation, without the on-disk cache."""
+    benchmark(PyprojectModel)
+
+
+def test_gather_data(benchmark, tmp_path):
+    """CI variables gathering, project model loaded from the on-disk cache."""
+
+    def _gather():
+        get_project.cache_clear()
+        return gather_data(str(tmp_path / "pipeline_env_vars.sh"))
+
+    benchmark(_gather)
+{%- if cookiecutter.command_line_interface|lower == 'click' %}
+
+
+def test_cli_startup(benchmark):
+    """Interpreter start-up and console script run."""
+    benchmark.pedantic(_spawn, args=("-m", "{{ cookiecutter.pkg_name }}.cli_tools.cli"), rounds=_PROCESS_ROUNDS,
+                       warmup_rounds=1)
+{%- endif %}
@@ -1,16 +1,26 @@
 import fileinput
+import json
 import nox
+import os
+import shlex
+import shutil
+import subprocess
 from rtoml import load
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from hashlib import sha256
 from pathlib import Path
-from python_active_versions.python_active_versions import get_active_python_versions
-from typing import List
-from re import sub
+from typing import Dict, List, Optional, Tuple
+from re import fullmatch, sub
 
-from {{ cookiecutter.pkg_name }} import _project
+from {{ cookiecutter.pkg_name }} import get_project
 from {{ cookiecutter.pkg_name }}.bundle import get_bundle_dir
-from {{ cookiecutter.pkg_name }}.models import EnvVars
+from {{ cookiecutter.pkg_name }}.metadata import METADATA_MODULE, write as write_metadata
+from {{ cookiecutter.pkg_name }}.models import EnvVars, image_timestamp
 from {{ cookiecutter.pkg_name }}.pipeline import gather_data
 
 
@@ -18,20 +28,226 @@ def _get_active_version(_active_versions: List[dict]) -> List[str]:
     return [_av['version'] for _av in _active_versions]
 
 
-_python_versions = _get_active_version(get_active_python_versions())
+# python versions of test session: NOX_PYTHON_VERSIONS env var (comma separated), else active versions from
+#   python.org cached for NOX_PYTHON_VERSIONS_TTL seconds, else the interpreters installed into PATH;
+#   listing sessions never reaches python.org
+_VERSIONS_CACHE = Path(os.environ.get('NOX_PYTHON_VERSIONS_CACHE', Path('.nox') / '.python_versions.json'))
+_VERSIONS_TTL = int(os.environ.get('NOX_PYTHON_VERSIONS_TTL', 24 * 60 * 60))
+_VERSIONS_TIMEOUT = 10
+_CURRENT_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(_p) for _p in version.split('.'))
+
+
+def _installed_python_versions() -> List[str]:
+    """Python versions of the pythonX.Y interpreters found into PATH."""
+    _found = {_CURRENT_VERSION}
+    for _dir in os.environ.get('PATH', '').split(os.pathsep):
+        try:
+            with os.scandir(_dir or '.') as _entries:
+                for _entry in _entries:
+                    _match = fullmatch(r'python(3\.\d+)(\.exe)?', _entry.name)
+                    if _match:
+                        _found.add(_match.group(1))
+        except OSError:
+            continue
+    return sorted(_found, key=_version_key)
+
+
+def _fetch_active_python_versions() -> Optional[List[str]]:
+    """Active versions from python.org, None when offline or too slow to answer."""
+    _result: List[List[str]] = []
+
+    def _fetch():
+        try:
+            from python_active_versions.python_active_versions import get_active_python_versions
+
+            _result.append(_get_active_version(get_active_python_versions()))
+        except Exception:  # noqa: BLE001  # any network or parsing error means offline
+            pass
+
+    # daemon thread: a hanging connection must not keep nox alive
+    _thread = threading.Thread(target=_fetch, daemon=True)
+    _thread.start()
+    _thread.join(_VERSIONS_TIMEOUT)
+    return _result[0] if _result else None
+
+
+def _read_versions_cache() -> Tuple[Optional[List[str]], float]:
+    """Cached versions and their timestamp, (None, 0) when the cache is missing or malformed."""
+    try:
+        _cached = json.loads(_VERSIONS_CACHE.read_text())
+    except (OSError, ValueError):
+        return None, 0
+    _versions = _cached.get('versions') if isinstance(_cached, dict) else None
+    _timestamp = _cached.get('timestamp') if isinstance(_cached, dict) else None
+    if not (_versions and isinstance(_versions, list) and all(isinstance(_v, str) for _v in _versions)
+            and isinstance(_timestamp, (int, float))):
+        return None, 0
+    return _versions, _timestamp
+
+
+def _python_version_matrix(fetch: bool = True) -> List[str]:
+    """Python versions of test session, active ones are looked up on python.org only if fetch is set."""
+    if os.environ.get('NOX_PYTHON_VERSIONS'):
+        return [_v.strip() for _v in os.environ['NOX_PYTHON_VERSIONS'].split(',') if _v.strip()]
+
+    _cached, _timestamp = _read_versions_cache()
+    if _cached and time.time() - _timestamp < _VERSIONS_TTL:
+        return _cached
+
+    _versions = _fetch_active_python_versions() if fetch else None
+    if _versions:
+        _VERSIONS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _VERSIONS_CACHE.write_text(json.dumps({'timestamp': time.time(), 'versions': _versions}))
+        return _versions
+    if _cached:
+        # stale is better than nothing on an air-gapped builder
+        return _cached
+    return _installed_python_versions()
+
+
+def _test_session_selected(argv: List[str]) -> bool:
+    """Tell from nox command line if test session, or gate one running it, could be executed or listed."""
+    _selectors = {'-s', '--session', '--sessions', '-e'}
+    _names: List[str] = []
+    _selected = _selecting = False
+    for _a in argv:
+        if _a == '--':
+            break
+        if _a.startswith(('--session=', '--sessions=')):
+            _selected, _selecting = True, False
+            _names.extend(_a.split('=', 1)[1].split(','))
+        elif _a in _selectors:
+            _selected = _selecting = True
+        elif _a.startswith('-'):
+            _selecting = False
+        elif _selecting:
+            # -s a b, -s a,b
+            _names.extend(_a.split(','))
+    if not _selected:
+        # every session, or keyword/tag based selection
+        return True
+    return any(_n.strip().startswith(('test', 'gate')) for _n in _names)
+
+
+def _listing(argv: List[str]) -> bool:
+    """Tell from nox command line if sessions are only listed."""
+    _options = argv[:argv.index('--')] if '--' in argv else argv
+    return any(_a in ('-l', '--list', '--list-sessions') for _a in _options)
+
+
+# the version lookup runs only when test session is selected, otherwise current python is a placeholder
+_python_versions = (_python_version_matrix(fetch=not _listing(sys.argv[1:])) if _test_session_selected(sys.argv[1:])
+                    else [_CURRENT_VERSION])
+
+
+# sessions driven by poetry run without a nox virtualenv (python=False): they all share the poetry environment,
+#   synced once; test sessions only get their own virtualenv, one per python version
+# stamp files recording the inputs of the last lock/sync/install, to skip them when nothing changed
+_STAMPS_DIR = Path('.nox') / '.stamps'
+# built sdist and wheel, one folder per source digest
+_WHEEL_CACHE_DIR = Path('.nox') / '.wheel_cache'
+# package build inputs, the C extension ones included (missing ones are skipped)
+_PACKAGE_SOURCES = ['{{ cookiecutter.pkg_name }}', 'pyproject.toml', 'poetry.lock', 'README.md', 'LICENSE',
+                    '_build_extension.py', 'setup.cfg', 'libs']
+
+
+def _digest(*parts) -> str:
+    """Hash of files content (Path items, walked if folders) and strings."""
+    _hash = sha256()
+    for _part in parts:
+        _files = sorted(_part.rglob('*')) if isinstance(_part, Path) and _part.is_dir() else [_part]
+        for _f in _files:
+            if isinstance(_f, Path):
+                if not _f.is_file() or '__pycache__' in _f.parts:
+                    continue
+                _hash.update(_f.as_posix().encode())
+                _hash.update(_f.read_bytes())
+            else:
+                _hash.update(str(_f).encode())
+    return _hash.hexdigest()
+
+
+def _stamped(name: str, digest: str) -> bool:
+    _stamp = _STAMPS_DIR / name
+    return _stamp.is_file() and _stamp.read_text() == digest
+
+
+def _stamp(name: str, digest: str) -> None:
+    _STAMPS_DIR.mkdir(parents=True, exist_ok=True)
+    (_STAMPS_DIR / name).write_text(digest)
+
+
+def _poetry_env(session) -> str:
+    """Path of the virtualenv used by poetry commands: the active one, if any, else the project one."""
+    _active = session.env.get('VIRTUAL_ENV') or os.environ.get('VIRTUAL_ENV')
+    if _active:
+        return _active
+    return session.run("poetry", "env", "info", "--path", external=True, silent=True,
+                       success_codes=[0, 1]).strip()
+
+
+def _env_marker(env: str) -> str:
+    """Identity of a virtualenv: its path and the time its pyvenv.cfg was written, changed when it's recreated."""
+    try:
+        return f"{env}@{(Path(env) / 'pyvenv.cfg').stat().st_mtime_ns}"
+    except OSError:
+        return f"{env}@missing"
+
+
+def _interpreter_tag(session) -> str:
+    """Cache tag and platform of poetry environment interpreter, wheels built by an extension are bound to them."""
+    return session.run("poetry", "run", "python", "-c",
+                       "import sys, sysconfig; print(sys.implementation.cache_tag, sysconfig.get_platform())",
+                       external=True, silent=True).strip()
 
 
 def dev_commands(session):
+    """Lock and sync poetry environment, only when pyproject.toml, poetry.lock or the environment changed."""
+    _lock_digest = _digest(Path('pyproject.toml'))
+    if not _stamped('lock', _lock_digest):
+        session.run("poetry", "lock", external=True)
+        _stamp('lock', _lock_digest)
+
+    _env = _poetry_env(session)
+    _sync_digest = _digest(Path('pyproject.toml'), Path('poetry.lock'), _env_marker(_env))
+    _sync_stamp = f"sync-{sha256(_env.encode()).hexdigest()[:16]}"
+    if _stamped(_sync_stamp, _sync_digest):
+        session.log(f"poetry environment {_env} up to date, sync skipped")
+        return
+
     session.run("poetry", "run", "python", "--version", external=True)
     session.run("python", "--version", external=True)
-    session.run("poetry", "lock", external=True)
     session.run("poetry", "sync", "-v", "--with", "devel", "--no-root", external=True)
     session.run("poetry", "run", "nox", "--version", external=True)
     session.run("poetry", "run", "pip", "--version", external=True)
     session.run("poetry", "run", "pip", "list", "--format=freeze", external=True)
+    _stamp(_sync_stamp, _sync_digest)
+
 
+def _write_metadata(session):
+    """Regenerate the static metadata module from pyproject.toml."""
+    if write_metadata():
+        session.log(f"{METADATA_MODULE} regenerated")
 
-@nox.session(name="format")
+
+def _install(session):
+    """Install the package into poetry environment, once per environment and package sources."""
+    _write_metadata(session)
+    _env = _poetry_env(session)
+    _install_digest = _digest(*[Path(_s) for _s in _PACKAGE_SOURCES], _env_marker(_env))
+    _install_stamp = f"install-{sha256(_env.encode()).hexdigest()[:16]}"
+    if _stamped(_install_stamp, _install_digest):
+        session.log(f"package already installed into {_env}")
+        return
+    session.run("poetry", "install", external=True)
+    _stamp(_install_stamp, _install_digest)
+
+
+@nox.session(name="format", python=False)
 def format_code(session):
     """Format the code"""
     dev_commands(session)
@@ -41,86 +257,115 @@ def format_code(session):
                 external=True)
 
 
-@nox.session(name="license")
+# REUSE annotation: groups of files sharing the same `reuse annotate` options
+_REUSE_GROUPS: Dict[str, List[str]] = {
+    # comment style recognized by reuse from the file extension
+    'extension': [],
+    'dot-license': ['--force-dot-license'],
+    'python-style': ['--style', 'python'],
+}
+_REUSE_MANIFEST = Path('.nox') / '.reuse_manifest.json'
+_REUSE_CHUNK_SIZE = int(os.environ.get('NOX_REUSE_CHUNK_SIZE', 100))
+_REUSE_PRUNED_DIRS = {'.git', '.nox', '.tox', '.venv', '.cache', '.mypy_cache', '.ruff_cache', '.pytest_cache',
+                      '__pycache__', '_generated', 'LICENSES', 'build', 'dist', 'trivy_cache'}
+_REUSE_PYTHON_STYLE = {'.editorconfig', '.gitignore', '.yamllint', '.pre-commit-config.yaml', 'hadolint.yaml',
+                       'trivy.yaml', 'Dockerfile'}
+_REUSE_DOT_LICENSE_SUFFIXES = {'.rst', '.md', '.lock', '.cfg', '.sqlite'}
+_REUSE_SOURCE_DIRS = {'{{ cookiecutter.pkg_name }}', 'tests', 'docs', 'benchmarks'}
+
+
+def _reuse_group(path: Path) -> Optional[str]:
+    """Annotation group of path (relative to project root), None when it's not annotated."""
+    _top = path.parts[0] if len(path.parts) > 1 else ''
+    if not _top and path.name in _REUSE_PYTHON_STYLE:
+        return 'python-style'
+    if path.suffix == '.py' and (not _top or _top in _REUSE_SOURCE_DIRS):
+        return 'extension'
+    if _top == '.github' and path.suffix in ('.yml', '.yaml'):
+        return 'extension'
+    if path.as_posix() in ('docs/Makefile', 'docs/make.bat', 'pyproject.toml'):
+        return 'extension'
+    if path.suffix == '.json' and _top in _REUSE_SOURCE_DIRS:
+        return 'dot-license'
+    if path.suffix in _REUSE_DOT_LICENSE_SUFFIXES or path.name == 'py.typed':
+        return 'dot-license'
+    return None
+
+
+def _reuse_files() -> Dict[str, List[Path]]:
+    """Files to annotate by group, from a single walk of the project tree."""
+    _groups: Dict[str, List[Path]] = {_g: [] for _g in _REUSE_GROUPS}
+    for _root, _dirs, _files in os.walk('.'):
+        _dirs[:] = sorted(_d for _d in _dirs
+                          if _d not in _REUSE_PRUNED_DIRS and not _d.startswith(('venv', 'html_coverage')))
+        for _name in sorted(_files):
+            _path = Path(_root, _name)
+            _group = _reuse_group(_path)
+            if _group:
+                _groups[_group].append(_path)
+    return _groups
+
+
+def _file_sha256(path: Path) -> str:
+    return sha256(path.read_bytes()).hexdigest()
+
+
+@nox.session(name="license", python=False)
 def update_license(session):
-    """License files according to REUSE 3.0"""
+    """License files according to REUSE 3.0
+
+    Only files added or changed since the last run, or annotated in a past year, are passed to reuse: content hash
+    and annotation year of each file are recorded into .nox/.reuse_manifest.json.
+    Run ``nox -s license -- --all`` to annotate every file again.
+    """
     dev_commands(session)
     _year = str(datetime.now().year)
-
-    # files correctly managed by reuse from their extension
-    session.log('files recognized by extension')
-    _py = list(Path().glob('./{{ cookiecutter.pkg_name }}/**/*.py'))
-    _py = list(Path().glob('./*.py'))
-    _py.extend(list(Path().glob('./tests/**/*.py')))
-    _py.extend(list(Path().glob('./docs/**/*.py')))
-    _py.extend(list(Path().glob('./.github/**/*.yml')))
-    _py.extend(Path().glob('./.github/**/*.yaml'))
-    _py.extend(list(Path().glob('./docs/Makefile')))
-    _py.extend(list(Path().glob('./docs/make.bat')))
-    _py.extend(list(Path().glob('./pyproject.toml')))
-    if _py:
-        session.run("poetry",
-                    "run",
-                    "reuse",
-                    "annotate",
-                    "--license={{ cookiecutter.open_source_license }}",
-                    "--copyright={{ cookiecutter.full_name.replace('\"', '\\\"') }}",
-                    f"--year={_year}",
-                    "--merge-copyrights",
-                    *_py,
-                    external=True)
-
-    # dot-file license
-    session.log('dot-file license')
-    _dot = list(Path().glob('./{{ cookiecutter.pkg_name }}/**/*.json'))
-    _dot.extend(list(Path().glob('./tests/**/*.json')))
-    _dot.extend(list(Path().glob('./docs/**/*.json')))
-    _dot.extend(list(Path().glob('./**/*.rst')))
-    _dot.extend(list(Path().glob('./**/*.md')))
-    _dot.extend(list(Path().glob('./**/*.lock')))
-    _dot.extend(list(Path().glob('./**/*.cfg')))
-    _dot.extend(list(Path().glob('./**/py.typed')))
-    _dot.extend(list(Path().glob('./**/*.sqlite')))
-    _v_not_nox = [x for x in _dot if not x.parts[0].startswith(".nox")]
-    _v_not_gen = [x for x in _v_not_nox if '_generated' not in x.parts]
-    if _v_not_gen:
-        session.run("poetry",
-                    "run",
-                    "reuse",
-                    "annotate",
-                    "--license={{ cookiecutter.open_source_license }}",
-                    "--copyright={{ cookiecutter.full_name.replace('\"', '\\\"') }}",
-                    f"--year={_year}",
-                    "--merge-copyrights",
-                    "--force-dot-license",
-                    *_v_not_gen,
-                    external=True)
-
-    # dot-files - forced python style
-    session.log('forced python style')
-    _dot_files = list(Path().glob('./.editorconfig'))
-    _dot_files.extend(list(Path().glob('./.gitignore')))
-    _dot_files.extend(list(Path().glob('./.yamllint')))
-    _dot_files.extend(list(Path().glob('./.pre-commit-config.yaml')))
-    _dot_files.extend(list(Path().glob('./hadolint.yaml')))
-    _dot_files.extend(list(Path().glob('./trivy.yaml')))
-    _dot_files.extend(list(Path().glob('./Dockerfile')))
-    if _dot_files:
-        session.run("poetry",
-                    "run",
-                    "reuse",
-                    "annotate",
-                    "--license={{ cookiecutter.open_source_license }}",
-                    "--copyright={{ cookiecutter.full_name.replace('\"', '\\\"') }}",
-                    f"--year={_year}",
-                    "--merge-copyrights",
-                    "--style",
-                    "python",
-                    *_dot_files,
-                    external=True)
-
-    # download license
-    session.run("poetry", "run", "reuse", "download", "--all", external=True)
+    _options = ["--license={{ cookiecutter.open_source_license }}",
+                "--copyright={{ cookiecutter.full_name.replace('\"', '\\\"') }}",
+                f"--year={_year}",
+                "--merge-copyrights"]
+    # a change of license or copyright holder makes every recorded annotation outdated
+    _key = sha256('\n'.join(_options).encode()).hexdigest()
+
+    try:
+        _manifest = {} if '--all' in session.posargs else json.loads(_REUSE_MANIFEST.read_text())
+    except (OSError, ValueError):
+        _manifest = {}
+    if _manifest.get('key') != _key:
+        _manifest = {'key': _key, 'files': {}}
+    _recorded = _manifest['files']
+
+    _commands: Dict[str, Tuple[List[str], Optional[Dict[str, str]]]] = {}
+    _chunks: Dict[str, List[Path]] = {}
+    for _group, _files in _reuse_files().items():
+        _changed = [_f for _f in _files
+                    if _recorded.get(_f.as_posix()) != {'sha256': _file_sha256(_f), 'year': _year}]
+        session.log(f"{_group}: {len(_changed)} of {len(_files)} files to annotate")
+        for _i in range(0, len(_changed), _REUSE_CHUNK_SIZE):
+            _label = f"{_group}-{_i // _REUSE_CHUNK_SIZE}"
+            _chunks[_label] = _changed[_i:_i + _REUSE_CHUNK_SIZE]
+            _commands[_label] = (["poetry", "run", "reuse", "annotate", *_options, *_REUSE_GROUPS[_group],
+                                  *map(str, _chunks[_label])], None)
+
+    _failed = _run_concurrently(session, _commands, os.cpu_count() or 1) if _commands else []
+
+    # record annotated files with their new content, failed chunks are retried on next run
+    for _label, _files in _chunks.items():
+        if _label in _failed:
+            continue
+        for _f in _files:
+            _recorded[_f.as_posix()] = {'sha256': _file_sha256(_f), 'year': _year}
+    _REUSE_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    _REUSE_MANIFEST.write_text(json.dumps(_manifest, indent=1, sort_keys=True))
+    if _failed:
+        session.error(f"reuse annotate failed: {', '.join(_failed)}")
+
+    # download license, only when missing
+    _license_texts = Path('LICENSES') / '{{ cookiecutter.open_source_license }}.txt'
+    if _license_texts.is_file():
+        session.log(f"{_license_texts} already present, download skipped")
+    else:
+        session.run("poetry", "run", "reuse", "download", "--all", external=True)
 
     # fix license file
     _creation_year = "{% now 'utc', '%Y' %}"
@@ -142,12 +387,12 @@ def update_license(session):
         f.write_text(_text)
 
 
-@nox.session
+@nox.session(python=False)
 def lint(session):
     """Lint the code"""
     build(session)
 
-    session.run("poetry", "install", external=True)
+    _install(session)
     session.run("poetry", "run", "flake8", "{{ cookiecutter.pkg_name }}", "tests", external=True, success_codes=[0, 1])
     {%- if cookiecutter.use_mypy == 'y' %}
     session.run("poetry", "run", "mypy", "--install-types", "{{ cookiecutter.pkg_name }}", "tests", external=True, success_codes=[0, 1])
@@ -164,18 +409,91 @@ def lint(session):
 
 
 def _build(session):
-    session.run("poetry", "build", external=True)
-    session.run("poetry", "run", "twine", "check", "dist/*", external=True)
+    """Build sdist and wheel, reusing the ones built from the same sources."""
+    _write_metadata(session)
+    _cache = _WHEEL_CACHE_DIR / _digest(*[Path(_s) for _s in _PACKAGE_SOURCES], _interpreter_tag(session))
+    if not (_cache.is_dir() and any(_cache.iterdir())):
+        # a build folder per process: concurrent sessions build the same sources, the first rename wins
+        _WHEEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _tmp = Path(tempfile.mkdtemp(prefix=f"{_cache.name[:16]}.", dir=_WHEEL_CACHE_DIR))
+        try:
+            session.run("poetry", "build", "--output", str(_tmp), external=True)
+            session.run("poetry", "run", "twine", "check", f"{_tmp}/*", external=True)
+            try:
+                _tmp.rename(_cache)
+            except OSError:
+                session.log(f"{_cache} built concurrently, keeping that one")
+        finally:
+            shutil.rmtree(_tmp, ignore_errors=True)
+    else:
+        session.log(f"sources unchanged, reusing artifacts from {_cache}")
 
+    Path('dist').mkdir(exist_ok=True)
+    for _artifact in _cache.iterdir():
+        shutil.copy2(_artifact, Path('dist') / _artifact.name)
 
-@nox.session
+
+@nox.session(python=False)
 def build(session):
     """Build package"""
     dev_commands(session)
     _build(session)
 
 
-@nox.session
+# timed runs of the training workload for each build compared by pgo session, best one is kept
+_PGO_ROUNDS = int(os.environ.get('NOX_PGO_ROUNDS', 3))
+
+
+def _timed_workload(session, command: List[str], env: Dict[str, str], rounds: int) -> float:
+    """Best elapsed time of command over rounds runs."""
+    _best = float('inf')
+    for _ in range(rounds):
+        _start = time.perf_counter()
+        session.run(*command, env=env, external=True)
+        _best = min(_best, time.perf_counter() - _start)
+    return _best
+
+
+@nox.session(python=False)
+def pgo(session):
+    """Profile guided optimization of the C extensions, see build profiles into _build_extension.py
+
+    The training workload, the test suite or the command given as posargs, runs on the instrumented build to
+    collect profile data used by the pgo build; the workload is then timed on release-lto and pgo builds.
+    """
+    dev_commands(session)
+    _workload = session.posargs or ["poetry", "run", "pytest", "-q", "-p", "no:cacheprovider", "-o", "addopts=",
+                                    "tests"]
+    shutil.rmtree(os.environ.get('BUILD_EXT_PGO_DIR', Path('.cache') / 'build_extension' / 'pgo'),
+                  ignore_errors=True)
+
+    _release = {'BUILD_EXT_PROFILE': 'release-lto'}
+    session.run("poetry", "install", env=_release, external=True)
+    _release_time = _timed_workload(session, _workload, _release, _PGO_ROUNDS)
+
+    _generate = {'BUILD_EXT_PROFILE': 'pgo', 'BUILD_EXT_PGO_PHASE': 'generate'}
+    session.run("poetry", "install", env=_generate, external=True)
+    session.run(*_workload, env=_generate, external=True)
+
+    _pgo = {'BUILD_EXT_PROFILE': 'pgo'}
+    session.run("poetry", "install", env=_pgo, external=True)
+    _pgo_time = _timed_workload(session, _workload, _pgo, _PGO_ROUNDS)
+
+    session.log(f"release-lto: {_release_time:.3f}s, pgo: {_pgo_time:.3f}s, "
+                f"speedup {_release_time / _pgo_time:.2f}x (best of {_PGO_ROUNDS})")
+
+
+@nox.session(name="format-check", python=False)
+def format_check(session):
+    """Check code format, without changing files"""
+    dev_commands(session)
+    session.run("poetry", "run", "isort", "--check-only", "{{ cookiecutter.pkg_name }}", "tests", "docs", "noxfile.py",
+                external=True)
+    session.run("poetry", "run", "black", "--check", "{{ cookiecutter.pkg_name }}", "tests", "docs", "noxfile.py",
+                external=True)
+
+
+@nox.session(python=False)
 def docs(session):
     """Build docs"""
     dev_commands(session)
@@ -189,44 +507,213 @@ def docs(session):
     {%- endif %}
 
 
-@nox.session(python=_python_versions)
-def test(session):
-    _plat = sys.platform
+def _run_prefixed(label: str, command: List[str], lock: threading.Lock,
+                  env: Optional[Dict[str, str]] = None) -> Tuple[str, int, float]:
+    """Run command into a child process, merging its output lines prefixed by label."""
+    _start = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env) as _proc:
+        for _line in _proc.stdout:
+            with lock:
+                print(f"[{label}] {_line}", end="", flush=True)
+    return label, _proc.returncode, time.perf_counter() - _start
 
-    # print(f"py: {session.python}")
 
-    if _plat == 'win32':
-        _pyth = 'python'
-    else:
-        _pyth = f"python{session.python}"
+def _run_concurrently(session, commands: Dict[str, Tuple[List[str], Optional[Dict[str, str]]]],
+                      jobs: int, success_codes: Tuple[int, ...] = (0,)) -> List[str]:
+    """Run labelled (command, env) items on a pool of child processes, logging a summary.
+
+    Returns:
+        labels of the failed commands, the ones exiting with a code not in success_codes.
+    """
+    _lock = threading.Lock()
+
+    def _run(item):
+        _label, (_command, _env) = item
+        return _run_prefixed(_label, _command, _lock, _env)
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as _pool:
+        _results = list(_pool.map(_run, commands.items()))
+
+    for _label, _code, _elapsed in _results:
+        session.log(f"{_label}: {'OK' if _code in success_codes else f'FAILED ({_code})'} in {_elapsed:.1f}s")
+    return [_label for _label, _code, _ in _results if _code not in success_codes]
+
+
+def _nox_sessions(names: List[str]) -> Dict[str, Tuple[List[str], Optional[Dict[str, str]]]]:
+    return {_n: ([sys.executable, "-m", "nox", "--reuse-existing-virtualenvs", "-s", _n], None) for _n in names}
+
+
+# per-test durations, updated at every test session run and used to balance the shards
+_DURATIONS_FILE = Path('.test_durations.json')
+_SHARDS_DIR = Path('.nox') / '.shards'
+
 
+def _collect_tests(session, test_files: List[str]) -> List[str]:
+    _out = session.run("poetry", "run", "pytest", "--collect-only", "-q", "--no-cov", *test_files,
+                       external=True, silent=True)
+    return [_line.strip() for _line in _out.splitlines() if '::' in _line]
+
+
+def _shard_tests(test_ids: List[str], durations: Dict[str, float], shards: int) -> List[List[str]]:
+    """Split tests into shards of balanced duration, assigning the longest first to the least loaded shard.
+
+    Tests without a recorded duration count as the average recorded one.
+    """
+    _known = [durations[_t] for _t in test_ids if _t in durations]
+    _default = sum(_known) / len(_known) if _known else 1.0
+    _shards: List[List[str]] = [[] for _ in range(max(min(shards, len(test_ids)), 1))]
+    _loads = [0.0] * len(_shards)
+    for _test in sorted(test_ids, key=lambda _t: durations.get(_t, _default), reverse=True):
+        _idx = _loads.index(min(_loads))
+        _shards[_idx].append(_test)
+        _loads[_idx] += durations.get(_test, _default)
+    return _shards
+
+
+@nox.session(python=_python_versions)
+def test(session):
+    """Run tests split into NOX_TEST_SHARDS (default: cpu count) parallel shards"""
     session.env['COVERAGE_FILE'] = f'.coverage_{session.name}'
     session.env['PYTHONWARNINGS'] = 'ignore'
-
-    session.run("poetry", "env", "use", _pyth, external=True)
+    # poetry installs into the active virtualenv: each python version gets its own nox one,
+    #   so test sessions don't share (and race on) the project poetry environment
+    session.env['VIRTUAL_ENV'] = session.virtualenv.location
 
     build(session)
-    session.run("poetry", "install", external=True)
+    _install(session)
 
     if session.posargs:
         # explicitly pass test file to nox -> nox -- test.py
         test_files = session.posargs
     else:
         # call nox without arguments
-        test_files = list(Path().glob('./tests/**/*.py'))
+        test_files = [str(_f) for _f in Path().glob('./tests/**/*.py')]
+
+    _test_ids = _collect_tests(session, test_files)
+    if not _test_ids:
+        session.skip("no tests collected")
+
+    try:
+        _durations = json.loads(_DURATIONS_FILE.read_text())
+    except (OSError, ValueError):
+        _durations = {}
+    _shards = _shard_tests(_test_ids, _durations, int(os.environ.get('NOX_TEST_SHARDS', os.cpu_count() or 1)))
+    session.log(f"{len(_test_ids)} tests split into {len(_shards)} shards")
+
+    _SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    # child processes environment, as session.run would build it: None values unset variables
+    _env = {_k: _v for _k, _v in (os.environ | session.env).items() if _v is not None}
+    _env['PATH'] = os.pathsep.join([*(session.bin_paths or []), _env.get('PATH', '')])
+    _commands = {}
+    _coverage_files = []
+    _durations_files = []
+    for _idx, _shard in enumerate(_shards):
+        _label = f"{session.name}#{_idx}"
+        _args_file = _SHARDS_DIR / f"{session.name}-{_idx}.args"
+        _args_file.write_text('\n'.join(_shard))
+        _coverage_files.append(f'.coverage_{session.name}.{_idx}')
+        _durations_files.append(_SHARDS_DIR / f"{session.name}-{_idx}.json")
+        Path(_coverage_files[-1]).unlink(missing_ok=True)
+        _durations_files[-1].unlink(missing_ok=True)
+        _commands[_label] = (
+            # coverage reports are generated once, from combined data
+            ["poetry", "run", "pytest", f"@{_args_file}", "--cov-report="],
+            _env | {'COVERAGE_FILE': _coverage_files[-1], 'PYTEST_DURATIONS_FILE': str(_durations_files[-1])},
+        )
+    _failed = _run_concurrently(session, _commands, len(_commands))
+
+    # keep durations of the collected tests only, refreshed with the ones just measured
+    _durations = {_t: _d for _t, _d in _durations.items() if _t in _test_ids}
+    for _file in _durations_files:
+        if _file.is_file():
+            _durations.update(json.loads(_file.read_text()))
+    _DURATIONS_FILE.write_text(json.dumps(_durations, indent=2, sort_keys=True))
+
+    _coverage_files = [_f for _f in _coverage_files if Path(_f).is_file()]
+    if _coverage_files:
+        session.run("poetry", "run", "coverage", "combine", *_coverage_files, external=True)
+        session.run("poetry", "run", "coverage", "html", "-d", f"html_coverage_{session.name}", external=True)
+        session.run("poetry", "run", "coverage", "xml", "-o", f"xml_coverage_{session.name}.xml", external=True)
+
+    if _failed:
+        session.error(f"failed test shards: {', '.join(_failed)}")
+
+
+@nox.session(python=False)
+def tests(session):
+    """Run test session of every python version concurrently"""
+    dev_commands(session)
+    _build(session)
 
-    session.run(
-        'poetry',
-        'run',
-        'pytest',
-        *test_files,
-        f"--cov-report=html:html_coverage_{session.name}",
-        f"--cov-report=xml:xml_coverage_{session.name}.xml",
-        external=True
-    )
+    _failed = _run_concurrently(session, _nox_sessions([f"test-{_v}" for _v in _python_versions]),
+                                len(_python_versions))
+    if _failed:
+        session.error(f"failed sessions: {', '.join(_failed)}")
 
 
-@nox.session
+# independent sessions run concurrently by gate session, together with every test python version
+_GATE_SESSIONS = ["lint", "docs", "format-check"]
+
+
+@nox.session(python=False)
+def gate(session):
+    """Run lint, docs, format check and tests concurrently, on a warmed poetry environment"""
+    # lock, sync, install and build once: sessions run afterwards find them up to date
+    dev_commands(session)
+    _build(session)
+    _install(session)
+
+    _sessions = session.posargs or _GATE_SESSIONS + [f"test-{_v}" for _v in _python_versions]
+    _failed = _run_concurrently(session, _nox_sessions(_sessions),
+                                int(os.environ.get('NOX_GATE_JOBS', os.cpu_count() or 1)))
+    if _failed:
+        session.error(f"failed sessions: {', '.join(_failed)}")
+
+
+# benchmark results, one pytest-benchmark JSON per commit, and the baseline they are compared against
+_BENCH_RESULTS_DIR = Path('.benchmarks')
+_BENCH_BASELINE = Path('benchmarks') / 'baseline.json'
+# allowed slowdown against the baseline, percent of the median
+_BENCH_THRESHOLD = float(os.environ.get('NOX_BENCH_THRESHOLD', 10))
+
+
+def _commit_id() -> str:
+    """Short hash of HEAD, suffixed by -dirty when tracked files changed."""
+    try:
+        _commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                 check=True).stdout.strip()
+        _dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'no-commit'
+    return f"{_commit}-dirty" if _dirty else _commit
+
+
+@nox.session(python=False)
+def bench(session):
+    """Run benchmarks, compare them against benchmarks/baseline.json
+
+    Results are saved into .benchmarks/<commit>.json; the session fails when a benchmark is slower than the
+    baseline by more than NOX_BENCH_THRESHOLD percent (default: 10).
+    Run ``nox -s bench -- --save-baseline`` to replace the baseline with the current results.
+    """
+    dev_commands(session)
+    _install(session)
+
+    _results = _BENCH_RESULTS_DIR / f"{_commit_id()}.json"
+    _results.parent.mkdir(parents=True, exist_ok=True)
+    session.run("poetry", "run", "pytest", "benchmarks", "-o", "addopts=", "-p", "no:cacheprovider",
+                "--benchmark-only", f"--benchmark-json={_results}", external=True)
+
+    if '--save-baseline' in session.posargs or not _BENCH_BASELINE.is_file():
+        shutil.copyfile(_results, _BENCH_BASELINE)
+        session.log(f"{_BENCH_BASELINE} saved from {_results}, commit it")
+        return
+    session.run("poetry", "run", "python", "-m", "benchmarks.compare", str(_BENCH_BASELINE), str(_results),
+                f"--threshold={_BENCH_THRESHOLD}", external=True)
+
+
+@nox.session(python=False)
 def release(session):
     """Run release task"""
     git_branch = session.run("poetry", "run", "git", "rev-parse", "--abbrev-ref", "HEAD", external=True, silent=True).strip()
@@ -243,194 +730,337 @@ def release(session):
     # session.run("poetry", "publish", "-r", "...", external=True)
 
 
-@nox.session(name='container')
-def container_build(session):
-    git_hash = session.run(
-        "poetry", "run", "git", "rev-parse", "HEAD",
-        external=True, silent=True
-    )
+# container runner command, e.g. "python tests/container_stub.py" to exercise container_build without podman
+_CONTAINER_RUNNER = os.environ.get('NOX_CONTAINER_RUNNER', 'podman')
+# build context files copied by the Dockerfile (C extension ones included): the image is tagged with their digest,
+#   an unchanged tree is not built again
+_CONTAINER_SOURCES = ['Dockerfile', '.dockerignore', 'pyproject.toml', 'poetry.lock', 'README.md',
+                      '{{ cookiecutter.pkg_name }}', '_build_extension.py', 'setup.cfg', 'libs']
+# build args changing at every commit: recorded into labels, not part of the image content digest
+_CONTAINER_VOLATILE_ARGS = {'IMAGE_TIMESTAMP', 'IMAGE_GIT_HASH'}
+
+
+def _container_runner(session) -> List[str]:
+    _runner = shlex.split(_CONTAINER_RUNNER)
+    if not shutil.which(_runner[0]):
+        session.error(f"{_runner[0]} not found, set NOX_CONTAINER_RUNNER (e.g. to a stub runner)")
+    return _runner
+
 
-    os.environ['GIT_COMMIT'] = git_hash.strip()
-    _v = EnvVars(**os.environ)
+def _git_head() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _source_date_epoch() -> int:
+    """SOURCE_DATE_EPOCH env var, else time of HEAD commit, else newest modification time of the image sources."""
+    if os.environ.get('SOURCE_DATE_EPOCH'):
+        return int(os.environ['SOURCE_DATE_EPOCH'])
+    try:
+        return int(subprocess.run(['git', 'log', '-1', '--format=%ct'], capture_output=True, text=True,
+                                  check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        pass
+    _files = [_f for _s in _CONTAINER_SOURCES for _f in ([Path(_s)] + sorted(Path(_s).rglob('*')))
+              if _f.is_file() and '__pycache__' not in _f.parts]
+    return int(max((_f.stat().st_mtime for _f in _files), default=0))
+
+
+def _image_exists(runner: List[str], tag: str) -> bool:
+    return subprocess.run([*runner, "image", "exists", tag], capture_output=True, check=False).returncode == 0
+
+
+def _image_size(session, runner: List[str], tag: str) -> int:
+    """Size in bytes of a local image."""
+    _inspect = session.run(*runner, "image", "inspect", tag, external=True, silent=True)
+    return int(json.loads(_inspect)[0]['Size'])
+
+
+@nox.session(name='container', python=False)
+def container_build(session):
+    """Build the container image, skipped when the image of the same sources already exists.
+
+    Build is reproducible: image and label timestamps come from SOURCE_DATE_EPOCH, HEAD commit time by default.
+    """
+    _runner = _container_runner(session)
+    if not Path('poetry.lock').is_file():
+        # the image dependencies are installed from the lock file, a freshly generated project has none
+        session.run("poetry", "lock", external=True)
+    _epoch = _source_date_epoch()
+    os.environ['SOURCE_DATE_EPOCH'] = str(_epoch)
+
+    _project = get_project()
+    os.environ['GIT_COMMIT'] = _git_head()
+    _v = EnvVars.whitelisted(_project.tool_settings)
     _project.env_vars = _v
+    _project.IMAGE_TIMESTAMP = image_timestamp()
 
     _pyproject_data = gather_data("useless-in-local-build")
 
     _podman_args = [f'--build-arg={k}={v}' for k, v in _pyproject_data.items()]
+    _tag = f"{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}"
+    _stable_args = sorted((_k, str(_v)) for _k, _v in _pyproject_data.items() if _k not in _CONTAINER_VOLATILE_ARGS)
+    _content_tag = f"{_project.IMAGE_NAME}:src-" + _digest(*[Path(_s) for _s in _CONTAINER_SOURCES],
+                                                           json.dumps(_stable_args))[:16]
+
+    if _image_exists(_runner, _content_tag):
+        session.run(*_runner, "tag", _content_tag, _tag, external=True)
+        session.log(f"sources unchanged, build skipped: {_tag} is {_content_tag}")
+        return
 
+    _start = time.perf_counter()
     session.run(
-        "podman",
+        *_runner,
         "build",
         "-t",
-        f"{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}",
+        _tag,
+        "-t",
+        _content_tag,
         *_podman_args,
         # <build-args-here>
-        "--no-cache",
+        f"--timestamp={_epoch}",
         "--format",
         "docker",
         ".",
         external=True,
     )
+    _elapsed = time.perf_counter() - _start
+    session.log(f"{_tag} built in {_elapsed:.1f}s, size {_image_size(session, _runner, _tag) / 2 ** 20:.1f} MiB")
+
+
+# container scans: the image is built once, exported into a docker archive and scanned concurrently by every tool.
+#   Tools run from their own image, trivy and grype databases are cached into trivy_cache and grype_cache folders.
+#   NOX_SCAN_OFFLINE: no database update nor network, tool images and databases must be already there
+_SCAN_DIR = Path('.nox') / '.scan'
+_SCAN_OFFLINE = bool(os.environ.get('NOX_SCAN_OFFLINE'))
+_SCAN_JOBS = int(os.environ.get('NOX_SCAN_JOBS', 0)) or os.cpu_count() or 1
+_TRIVY_IMAGE = "aquasec/trivy:0.60.0"
+_GRYPE_IMAGE = "anchore/grype:v0.89.0"
+_SYFT_IMAGE = "anchore/syft:v1.20.0"
+_DIVE_IMAGE = "wagoodman/dive:latest"
+_HADOLINT_IMAGE = "ghcr.io/hadolint/hadolint"
+# scanners exit with 1 on findings, that's not a session failure
+_SCAN_SUCCESS_CODES = (0, 1)
+
+
+def _export_image(session, runner: List[str]) -> Path:
+    """Save the project image into a docker archive, once per image id."""
+    _project = get_project()
+    _tag = f"localhost/{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}"
+    _id = json.loads(session.run(*runner, "image", "inspect", _tag, external=True, silent=True))[0]['Id']
+    _archive = _SCAN_DIR / f"{_id.removeprefix('sha256:')[:16]}.tar"
+    if _archive.is_file():
+        session.log(f"{_tag} already exported into {_archive}")
+        return _archive
+
+    for _old in _SCAN_DIR.glob('*.tar'):
+        _old.unlink()
+    _tmp = _archive.with_suffix('.tmp')
+    session.run(*runner, "save", "--format", "docker-archive", "-o", str(_tmp), _tag, external=True)
+    _tmp.rename(_archive)
+    return _archive
+
+
+def _tool(runner: List[str], image: str, *args: str, volumes: Optional[Dict[Path, str]] = None,
+          env: Optional[Dict[str, str]] = None, entrypoint: Optional[str] = None) -> List[str]:
+    """Command running a scanner container, project folder mounted on /proj and scan folder on /scan."""
+    _volumes = {Path.cwd(): '/proj', _SCAN_DIR.absolute(): '/scan:ro'} | (volumes or {})
+    return [
+        *runner, "run", "--rm",
+        *(["--pull=never", "--network=none"] if _SCAN_OFFLINE else []),
+        *[_a for _host, _mount in _volumes.items() for _a in ("-v", f"{_host.absolute()}:{_mount}")],
+        *[_a for _k, _v in (env or {}).items() for _a in ("-e", f"{_k}={_v}")],
+        *(["--entrypoint", entrypoint] if entrypoint else []),
+        image,
+        *args,
+    ]
 
 
-@nox.session()
+def _trivy_cache() -> Dict[Path, str]:
+    Path('trivy_cache').mkdir(exist_ok=True)
+    return {Path('trivy_cache'): '/root/.cache/'}
+
+
+def _grype_cache() -> Tuple[Dict[Path, str], Dict[str, str]]:
+    Path('grype_cache').mkdir(exist_ok=True)
+    _env = {"GRYPE_DB_CACHE_DIR": "/root/.cache/grype/db"}
+    if _SCAN_OFFLINE:
+        _env |= {"GRYPE_DB_AUTO_UPDATE": "false", "GRYPE_DB_VALIDATE_AGE": "false"}
+    return {Path('grype_cache'): '/root/.cache/grype'}, _env
+
+
+def _warm_up_commands(runner: List[str]) -> Dict[str, Tuple[List[str], Optional[Dict[str, str]]]]:
+    """Database downloads, run before the scans: concurrent scanners must not update the same cache."""
+    _grype_volumes, _grype_env = _grype_cache()
+    return {
+        "trivy-db": (_tool(runner, _TRIVY_IMAGE, "image", "--download-db-only", volumes=_trivy_cache()), None),
+        "grype-db": (_tool(runner, _GRYPE_IMAGE, "db", "update", volumes=_grype_volumes, env=_grype_env), None),
+    }
+
+
+def _scan_commands(runner: List[str], archive: Optional[Path]) -> Dict[str, Tuple[List[str], Optional[Dict[str, str]]]]:
+    """Scanner commands, by label; the ones needing the image only when its archive is given, grype apart."""
+    _commands: Dict[str, Tuple[List[str], Optional[Dict[str, str]]]] = {
+        "hadolint": (_tool(runner, _HADOLINT_IMAGE, "hadolint", "--config", "/proj/hadolint.yaml", "/proj/Dockerfile"),
+                     None),
+    }
+    if archive is None:
+        return _commands
+
+    _image = f"/scan/{archive.name}"
+    # trivy databases are opened exclusively: project and image scans share the cache, so they run one after the other
+    _trivy = "trivy -c /proj/trivy.yaml --skip-db-update --skip-java-db-update" \
+        + (" --offline-scan" if _SCAN_OFFLINE else "")
+    _commands |= {
+        "trivy": (_tool(runner, _TRIVY_IMAGE, "-c", f"{_trivy} fs /proj && {_trivy} image --input {_image}",
+                        volumes=_trivy_cache(), entrypoint="sh"), None),
+        "syft": (_tool(runner, _SYFT_IMAGE, "scan", "--scope", "all-layers",
+                       # enrichment queries remote package registries
+                       *([] if _SCAN_OFFLINE else ["--enrich", "all"]),
+                       "-o", "syft-json=/proj/sbom.syft.json", "-o", "spdx-json=/proj/sbom.spdx.json",
+                       f"docker-archive:{_image}"), None),
+        "dive": (_tool(runner, _DIVE_IMAGE, "--source", "docker-archive", _image, env={"CI": "true"}), None),
+    }
+    return _commands
+
+
+# grype scans the syft SBOM packages missing from the findings index, the ones added or updated since the previous
+#   scan: the index keeps the matches of every scanned package, it is rebuilt when the grype database changes
+_FINDINGS_INDEX = _SCAN_DIR / 'findings.json'
+_SBOM_DELTA = _SCAN_DIR / 'sbom.delta.syft.json'
+_GRYPE_DELTA = _SCAN_DIR / 'grype.delta.json'
+
+
+def _package_key(artifact: dict) -> str:
+    return artifact.get('purl') or f"{artifact.get('type')}:{artifact.get('name')}@{artifact.get('version')}"
+
+
+def _grype_db_digest() -> str:
+    """Digest of grype database files size and modification time."""
+    _db = Path('grype_cache') / 'db'
+    _stats = [(_f.relative_to(_db).as_posix(), _f.stat()) for _f in sorted(_db.rglob('*')) if _f.is_file()]
+    return _digest(*[f"{_name}:{_stat.st_size}:{_stat.st_mtime_ns}" for _name, _stat in _stats])
+
+
+def _load_findings(db_digest: str) -> Dict[str, List[dict]]:
+    """{package key: grype matches} of the scanned packages, empty when the database changed since."""
+    try:
+        _index = json.loads(_FINDINGS_INDEX.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return _index['packages'] if _index.get('db') == db_digest else {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    _tmp = path.with_name(f".{path.name}.tmp")
+    _tmp.write_text(json.dumps(data), encoding='utf-8')
+    _tmp.replace(path)
+
+
+def _grype_incremental(session, runner: List[str], full: bool) -> List[str]:
+    """Scan with grype the new packages of sbom.syft.json, merge their matches into the index and grype.json.
+
+    Returns:
+        ["grype"] if grype failed, else an empty list.
+    """
+    _sbom = json.loads(Path('sbom.syft.json').read_text(encoding='utf-8'))
+    _db_digest = _grype_db_digest()
+    _previous = {} if full else _load_findings(_db_digest)
+    _artifacts = {_package_key(_a): _a for _a in _sbom.get('artifacts', [])}
+    _changed = {_k: _a for _k, _a in _artifacts.items() if _k not in _previous}
+    _index = {_k: _v for _k, _v in _previous.items() if _k in _artifacts}
+    session.log(f"SBOM: {len(_artifacts)} packages, {len(_changed)} to scan, {len(_previous) - len(_index)} removed")
+
+    if _changed:
+        # grype accepts SBOM input: the delta one keeps source, distro and relationships of the kept packages
+        _dropped = {_a.get('id') for _k, _a in _artifacts.items() if _k not in _changed}
+        _write_json(_SBOM_DELTA, _sbom | {
+            'artifacts': list(_changed.values()),
+            'artifactRelationships': [_r for _r in _sbom.get('artifactRelationships', [])
+                                      if _r.get('parent') not in _dropped and _r.get('child') not in _dropped],
+        })
+        _grype_volumes, _grype_env = _grype_cache()
+        _command = _tool(runner, _GRYPE_IMAGE, f"sbom:/proj/{_SBOM_DELTA.as_posix()}", "-o", "json",
+                         "--file", f"/proj/{_GRYPE_DELTA.as_posix()}", volumes=_grype_volumes,
+                         env=_grype_env | {"GRYPE_DB_AUTO_UPDATE": "false"})
+        if _run_concurrently(session, {"grype": (_command, None)}, 1, _SCAN_SUCCESS_CODES):
+            return ["grype"]
+        _index.update({_k: [] for _k in _changed})
+        for _match in json.loads(_GRYPE_DELTA.read_text(encoding='utf-8')).get('matches', []):
+            _index.setdefault(_package_key(_match.get('artifact', {})), []).append(_match)
+        # the database digest is taken again: grype may have just initialized it
+        _write_json(_FINDINGS_INDEX, {'db': _grype_db_digest(), 'packages': _index})
+
+    _matches = [_m for _k in sorted(_index) for _m in _index[_k]]
+    _write_json(Path('grype.json'), {'matches': _matches})
+    session.log(f"grype: {len(_matches)} findings in {len(_index)} packages, {len(_changed)} scanned")
+    return []
+
+
+def _scan(session, scanners: List[str], full: bool = False) -> None:
+    """Run the selected scanners concurrently against the exported image, databases warmed up first.
+
+    grype runs afterwards on the syft SBOM, scanning only packages not found into the index unless full.
+    """
+    _runner = _container_runner(session)
+    _SCAN_DIR.mkdir(parents=True, exist_ok=True)
+    _selected = (set(scanners) - {"grype"}) | ({"syft"} if "grype" in scanners else set())
+    _archive = _export_image(session, _runner) if _selected - {"hadolint"} else None
+    _commands = {_k: _v for _k, _v in _scan_commands(_runner, _archive).items() if _k in _selected}
+
+    if not _SCAN_OFFLINE:
+        _warm_up = {_k: _v for _k, _v in _warm_up_commands(_runner).items() if _k.split('-')[0] in scanners}
+        if _warm_up and _run_concurrently(session, _warm_up, _SCAN_JOBS):
+            session.warn("database update failed, scanning with the cached ones")
+
+    _failed = _run_concurrently(session, _commands, _SCAN_JOBS, _SCAN_SUCCESS_CODES)
+    if "grype" in scanners and "syft" not in _failed:
+        _failed += _grype_incremental(session, _runner, full)
+    if _failed:
+        session.error(f"scanners failed: {', '.join(_failed)}")
+
+
+@nox.session(python=False, requires=["container"])
+def scan(session):
+    """Scan the container image with every tool, concurrently; NOX_SCAN_OFFLINE=1 uses the cached databases.
+
+    ``-- --full`` makes grype scan every package, not only the ones changed since the previous scan.
+    """
+    _scan(session, ["hadolint", "trivy", "grype", "syft", "dive"], full='--full' in session.posargs)
+
+
+@nox.session(python=False, requires=["container"])
 def container_lint(session):
-    hadolint(session)
-
-    trivy(session)
+    _scan(session, ["hadolint", "trivy", "dive"])
 
-    # this works on downloaded images from dockerhub; only way to work on local built images is through tar file
-    # "podman run -v /var/run/docker.sock:/var/run/docker.sock -v ./trivy_cache:/root/.cache/
-    #   -v ./trivy.yaml:/root/trivy.yaml aquasec/trivy:0.53.0 -c /root/trivy.yaml
-    #   image gpongelli/python-active-versions:1.17.2"
 
-    dive(session)
-
-
-
-@nox.session()
+@nox.session(python=False, requires=["container"])
 def dive(session):
-    session.run(
-        "podman",
-        "run",
-        "--rm",
-        "-e",
-        "CI=true",
-        "-v",
-        "/var/run/docker.sock:/var/run/docker.sock",
-        "wagoodman/dive:latest",
-        f"{_pyproject_data['IMAGE_NAME']}:{_pyproject_data['IMAGE_VERSION']}",
-        external=True,
-        success_codes=[0, 1],
-    )
+    _scan(session, ["dive"])
 
 
-@nox.session()
+@nox.session(python=False)
 def hadolint(session):
-    session.run(
-        "podman",
-        "run",
-        "--rm",
-        # "-it",
-        "-v",
-        "Dockerfile:/Dockerfile",
-        "-v",
-        "hadolint.yaml:/hadolint.yaml",
-        "ghcr.io/hadolint/hadolint",
-        "hadolint",
-        "--config",
-        "/hadolint.yaml",
-        "/Dockerfile",
-        external=True,
-        success_codes=[0, 1],
-    )
+    _scan(session, ["hadolint"])
 
 
-@nox.session(requires=["container"])
+@nox.session(python=False, requires=["container"])
 def trivy(session):
-    _trivy_image = "aquasec/trivy:0.60.0"
-
-    # create trivy cache folder if not exist
-    os.makedirs('trivy_cache', exist_ok=True)
-
-    # run trivy on local project
-    session.run(
-        "podman",
-        "run",
-        "-v",
-        "/var/run/docker.sock:/var/run/docker.sock",
-        "-v",
-        ".:/root/proj",
-        "-v",
-        "./trivy_cache:/root/.cache/",
-        "-v",
-        "./trivy.yaml:/root/trivy.yaml",
-        _trivy_image,
-        "-c",
-        "/root/trivy.yaml",
-        "fs",
-        "/root/proj",
-        external=True,
-        success_codes=[0, 1],
-    )
-
-    # run trivy scan
-    session.run(
-        "podman",
-        "run",
-        "--rm",
-        "-v",
-        "/var/run/docker.sock:/var/run/docker.sock",
-        "-v",
-        ".:/root/proj",
-        "-v",
-        "./trivy_cache:/root/.cache/",
-        "-v",
-        "./trivy.yaml:/root/trivy.yaml",
-        _trivy_image,
-        "-c",
-        "/root/trivy.yaml",
-        "image",
-        f"localhost/{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}",
-        external=True,
-        success_codes=[0, 1],
-    )
+    _scan(session, ["trivy"])
 
 
 # https://www.jit.io/resources/appsec-tools/a-guide-to-generating-sbom-with-syft-and-grype
+# https://github.com/anchore/syft , could be useful a local config file ?
 
-@nox.session(requires=["container"])
+@nox.session(python=False, requires=["container"])
 def syft(session):
-    _tool_image = "anchore/syft:v1.20.0"
+    _scan(session, ["syft"])
 
-    # https://github.com/anchore/syft , could be useful a local config file ?
 
-    # run tool on local project
-    session.run(
-        "podman",
-        "run",
-        "--rm",
-        "-v",
-        "/var/run/docker.sock:/var/run/docker.sock",
-        "-v",
-        ".:/tmp/proj",
-        _tool_image,
-        "scan",
-        "--scope",
-        "all-layers",
-        "--enrich",
-        "all",
-        "-o",
-        "syft-json=/tmp/proj/sbom.syft.json",  # out file
-        "-o",
-        "spdx-json=/tmp/proj/sbom.spdx.json",  # out file
-        f"localhost/{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}",
-        external=True,
-        success_codes=[0, 1],
-    )
+# https://github.com/anchore/grype , could be useful a local config file ?
 
-
-@nox.session(requires=["container"])
+@nox.session(python=False, requires=["container"])
 def grype(session):
-    _tool_image = "anchore/grype:v0.89.0"
-
-    # https://github.com/anchore/grype , could be useful a local config file ?
-
-    # run tool on local project
-    session.run(
-        "podman",
-        "run",
-        "--rm",
-        "-v",
-        "/var/run/docker.sock:/var/run/docker.sock",
-        "-v",
-        ".:/tmp/proj",
-        _tool_image,
-        "-o",
-        "json",  # out file
-        "--file",
-        "/tmp/proj/grype.json",  # out file
-        f"localhost/{_project.IMAGE_NAME}:{_project.IMAGE_VERSION}",
-        external=True,
-        success_codes=[0, 1],
-    )
+    _scan(session, ["grype"], full='--full' in session.posargs)
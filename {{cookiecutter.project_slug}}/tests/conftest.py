@@ -0,0 +1,48 @@
+"""Pytest configuration for {{ cookiecutter.pkg_name }} tests."""
+import json
+import os
+from collections import defaultdict
+from typing import DefaultDict
+
+import pytest
+
+# setup + call + teardown duration of every test, see nox test session
+_durations: DefaultDict[str, float] = defaultdict(float)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def model_cache_dir(tmp_path_factory):
+    """Project model cache into a temporary folder, not into the user one, for tests and their subprocesses.
+
+    Arguments:
+        tmp_path_factory: pytest temporary folder factory
+
+    Yields:
+        cache folder
+    """
+    _dir = tmp_path_factory.mktemp("model_cache")
+    with pytest.MonkeyPatch.context() as _patch:
+        _patch.setenv("{{ cookiecutter.pkg_name|upper }}_CACHE_DIR", str(_dir))
+        yield _dir
+
+
+def pytest_runtest_logreport(report):
+    """Accumulate the durations of every test phase.
+
+    Arguments:
+        report: test phase report
+    """
+    _durations[report.nodeid] += report.duration
+
+
+def pytest_sessionfinish(session):
+    """Dump test durations into PYTEST_DURATIONS_FILE, when set, to balance nox test shards.
+
+    Arguments:
+        session: pytest session
+    """
+    del session
+    _out = os.environ.get('PYTEST_DURATIONS_FILE')
+    if _out:
+        with open(_out, mode='w', encoding='utf-8') as _fp:
+            json.dump(_durations, _fp)
@@ -0,0 +1,110 @@
+"""Stand-in for podman, to run the container nox sessions where podman is not installed.
+
+Nothing is built nor scanned: images are records of a JSON state file, ``CONTAINER_STUB_STATE`` env var
+(default ``.nox/container_stub.json``), holding their tags and the arguments of the command that built them.
+``save`` writes the image record as archive, ``run`` records the arguments of the scanner containers; syft and grype
+stand-ins write their reports: the SBOM lists ``CONTAINER_STUB_PACKAGES`` (JSON ``[[name, version], ...]``), grype
+reports one finding per package of the input SBOM.
+
+Usage: ``NOX_CONTAINER_RUNNER="python tests/container_stub.py" nox -s container``
+"""
+import json
+import os
+import sys
+from hashlib import sha256
+from pathlib import Path
+from typing import List
+
+_STATE = Path(os.environ.get('CONTAINER_STUB_STATE', Path('.nox') / 'container_stub.json'))
+# podman exit code of failed commands
+_ERROR = 125
+_PACKAGES = json.loads(os.environ.get('CONTAINER_STUB_PACKAGES', '[["requests", "2.32.3"], ["idna", "3.10"]]'))
+
+
+def _tag(name: str) -> str:
+    """Fully qualified tag, as podman stores local images."""
+    _name = name if '/' in name.split(':')[0] else f"localhost/{name}"
+    return _name if ':' in _name.rsplit('/', 1)[-1] else f"{_name}:latest"
+
+
+def _host_path(argv: List[str], path: str) -> Path:
+    """Host path of a container path, through the -v options."""
+    for _volume in (argv[_i + 1] for _i, _a in enumerate(argv[:-1]) if _a == '-v'):
+        _host, _mount = _volume.split(':')[:2]
+        if path == _mount or path.startswith(f"{_mount}/"):
+            return Path(_host) / path[len(_mount):].lstrip('/')
+    raise ValueError(f"{path} is not mounted")
+
+
+def _syft(argv: List[str]) -> None:
+    _artifacts = [{"id": f"stub-{_i}", "name": _n, "version": _v, "type": "python", "purl": f"pkg:pypi/{_n}@{_v}"}
+                  for _i, (_n, _v) in enumerate(_PACKAGES)]
+    for _output in (argv[_i + 1] for _i, _a in enumerate(argv[:-1]) if _a == '-o'):
+        _format, _, _path = _output.partition('=')
+        _report = {"artifacts": _artifacts, "artifactRelationships": [], "source": {}, "distro": {}} \
+            if _format == 'syft-json' else {"packages": _artifacts}
+        _host_path(argv, _path).write_text(json.dumps(_report), encoding='utf-8')
+
+
+def _grype(argv: List[str]) -> None:
+    _sbom = next(_a.removeprefix('sbom:') for _a in argv if _a.startswith('sbom:'))
+    _artifacts = json.loads(_host_path(argv, _sbom).read_text(encoding='utf-8'))["artifacts"]
+    _matches = [{"vulnerability": {"id": f"STUB-{_a['name']}-{_a['version']}"}, "artifact": _a} for _a in _artifacts]
+    _host_path(argv, argv[argv.index('--file') + 1]).write_text(json.dumps({"matches": _matches}), encoding='utf-8')
+
+
+def main(argv: List[str]) -> int:
+    """Run a podman command.
+
+    Args:
+        argv: podman arguments, ``build``, ``image exists``, ``image inspect``, ``tag``, ``save`` and ``run``
+            are supported.
+
+    Returns:
+        exit code.
+    """
+    try:
+        _state = json.loads(_STATE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        _state = {"images": {}, "builds": []}
+    _images = _state["images"]
+
+    if argv[:1] == ['build']:
+        _tags = [argv[_i + 1] for _i, _a in enumerate(argv[:-1]) if _a in ('-t', '--tag')]
+        _image = {"Id": sha256(json.dumps(argv).encode()).hexdigest(), "Size": 0, "RepoTags": _tags}
+        _images.update({_tag(_t): _image for _t in _tags})
+        _state["builds"].append(argv[1:])
+    elif argv[:2] == ['image', 'exists']:
+        return 0 if _tag(argv[2]) in _images else 1
+    elif argv[:2] == ['image', 'inspect']:
+        if _tag(argv[2]) not in _images:
+            print(f"Error: {argv[2]}: image not known", file=sys.stderr)
+            return _ERROR
+        print(json.dumps([_images[_tag(argv[2])]]))
+        return 0
+    elif argv[:1] == ['tag'] and _tag(argv[1]) in _images:
+        _images[_tag(argv[2])] = _images[_tag(argv[1])]
+    elif argv[:1] == ['save'] and '-o' in argv and _tag(argv[-1]) in _images:
+        Path(argv[argv.index('-o') + 1]).write_text(json.dumps(_images[_tag(argv[-1])]), encoding='utf-8')
+        _state.setdefault("saves", []).append(argv[1:])
+    elif argv[:1] == ['run']:
+        # scanners run concurrently: one record file each, the state file is not shared
+        _run = sha256(json.dumps(argv).encode()).hexdigest()[:16]
+        _STATE.with_name(f"{_STATE.stem}.run.{_run}.json").write_text(json.dumps(argv[1:]), encoding='utf-8')
+        print(f"stub: {' '.join(argv)}")
+        if any(_a.startswith('anchore/syft') for _a in argv):
+            _syft(argv)
+        elif any(_a.startswith('anchore/grype') for _a in argv) and any(_a.startswith('sbom:') for _a in argv):
+            _grype(argv)
+        return 0
+    else:
+        print(f"Error: unsupported command: {' '.join(argv)}", file=sys.stderr)
+        return _ERROR
+
+    _STATE.parent.mkdir(parents=True, exist_ok=True)
+    _STATE.write_text(json.dumps(_state, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
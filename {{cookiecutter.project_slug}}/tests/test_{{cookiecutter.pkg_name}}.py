@@ -1,7 +1,13 @@
 #!/usr/bin/env python
 """Tests for `{{ cookiecutter.pkg_name }}` package."""
 
-import logging 
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
 
 import pytest
 {% if cookiecutter.command_line_interface|lower == 'click' -%}
@@ -12,6 +18,39 @@ from {{ cookiecutter.pkg_name }}.cli_tools import cli
 
 logger = logging.getLogger(__name__)
 
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# package import budget in microseconds, optional debug helpers excluded
+_IMPORT_BUDGET_US = 50_000
+# optional dependencies imported by the package when available
+_OPTIONAL_IMPORTS = ("opentelemetry",)
+# command-line interface import budget in microseconds, for --version and --help
+_CLI_BUDGET_US = 80_000
+
+
+def _import_time(code: str) -> Tuple[Dict[str, Tuple[int, int]], str]:
+    """Run code into a fresh interpreter with ``-X importtime``.
+
+    Arguments:
+        code: python source to execute
+
+    Returns:
+        the {module: (self_us, cumulative_us)} map of imported modules and the captured stdout
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _self, _cumulative, _name = line.removeprefix("import time:").split("|")
+        timings[_name.strip()] = (int(_self), int(_cumulative))
+    return timings, proc.stdout
+
 
 @pytest.fixture
 def response():
@@ -37,6 +76,8 @@ def test_content(response):
 
 def test_command_line_interface():
     """Test the CLI."""
+    from {{ cookiecutter.pkg_name }}.ci_env import EnvFormat
+
     runner = CliRunner()
     result = runner.invoke(cli.main)
     assert result.exit_code == 0
@@ -45,9 +86,622 @@ def test_command_line_interface():
     assert help_result.exit_code == 0
     assert '--help' in help_result.output
     assert 'Show this message and exit.' in help_result.output
+    version_result = runner.invoke(cli.main, ['--version'])
+    assert version_result.exit_code == 0
+    assert '{{ cookiecutter.version }}' in version_result.output
+    assert list(cli.ENV_FORMATS) == list(EnvFormat)
+
+
+@pytest.mark.parametrize("args", [["--version"], ["--help"]])
+def test_cli_startup(args):
+    """``--version`` and ``--help`` must not import pydantic nor the project model, within the start-up budget."""
+    code = "\n".join([
+        "import sys",
+        f"sys.argv = ['{{ cookiecutter.project_slug }}', *{args!r}]",
+        "from {{ cookiecutter.pkg_name }}.cli_tools.cli import main",
+        "try:",
+        "    main()",
+        "except SystemExit:",
+        "    pass",
+    ])
+    timings, _ = _import_time(code)
+    assert not {"pydantic", "pydantic_settings", "{{ cookiecutter.pkg_name }}.models"} & set(timings)
+    _cli_us = timings["{{ cookiecutter.pkg_name }}.cli_tools.cli"][1]
+    logger.info("cli import time: %d us", _cli_us)
+    assert _cli_us < _CLI_BUDGET_US, f"cli import takes {_cli_us} us, budget is {_CLI_BUDGET_US} us"
+
+
+def test_cli_without_static_metadata():
+    """A checkout without the generated ``_metadata`` module falls back on the package metadata helpers."""
+    code = "\n".join([
+        "import sys",
+        "sys.modules['{{ cookiecutter.pkg_name }}._metadata'] = None",
+        "sys.argv = ['{{ cookiecutter.project_slug }}', '--version']",
+        "from {{ cookiecutter.pkg_name }}.cli_tools.cli import main",
+        "main()",
+    ])
+    proc = subprocess.run([sys.executable, "-c", code], cwd=_PROJECT_ROOT, capture_output=True, text=True,
+                          check=False)
+    assert proc.returncode == 0, proc.stderr
+    assert "{{ cookiecutter.version }}" in proc.stdout
+
+
+def test_cli_profile(tmp_path, monkeypatch):
+    """Profile of the subcommand is written as pstats and collapsed stacks, import times are reported."""
+    import pstats
+
+    from {{ cookiecutter.pkg_name }}.cli_tools import profiling
+
+    assert list(cli.PROFILERS) == list(profiling.PROFILERS)
+    monkeypatch.delenv("CI", raising=False)
+    runner = CliRunner()
+    prefix = tmp_path / "ci-env"
+    result = runner.invoke(cli.main, ["--profile-output", str(prefix), "--profile-top", "3", "ci-env", "--no-cache"],
+                           env={cli.PROFILE_ENV_VAR: "1"})
+    assert result.exit_code == 0, result.output
+
+    stats = pstats.Stats(f"{prefix}.pstats")
+    assert any(_name == "gather_data" for _, _, _name in stats.stats)  # type: ignore[attr-defined]
+    collapsed = Path(f"{prefix}.collapsed").read_text().splitlines()
+    assert all(_line.rsplit(" ", 1)[1].isdigit() for _line in collapsed)
+    assert any("gather_data" in _line for _line in collapsed)
+
+    result = runner.invoke(cli.main, ["--import-profile", "--profile-top", "3"])
+    assert result.exit_code == 0, result.output
+    assert "{{ cookiecutter.pkg_name }}.cli_tools.cli: " in result.output
+
+
+def test_cli_github_env_outside_actions(monkeypatch):
+    """github format without filename is a usage error outside GitHub Actions."""
+    monkeypatch.delenv("GITHUB_ENV", raising=False)
+    result = CliRunner().invoke(cli.main, ["ci-env", "--format", "github"])
+    assert result.exit_code == 2
+    assert "GITHUB_ENV" in result.output
 {%- endif %}
 
 
+def test_sampling_profile(tmp_path):
+    """Sampling profiler records the stacks of the profiled block."""
+    import io
+    import time
+
+    from {{ cookiecutter.pkg_name }}.cli_tools.profiling import profile
+
+    def _busy():
+        _end = time.process_time() + 0.1
+        while time.process_time() < _end:
+            pass
+
+    report = io.StringIO()
+    with profile(tmp_path / "busy", "sampling", stream=report):
+        _busy()
+    assert "_busy" in (tmp_path / "busy.collapsed").read_text()
+    assert "_busy" in report.getvalue()
+
+
+def test_import_profile_killed(monkeypatch):
+    """An import profile child killed by a signal is reported by its exit code."""
+    from {{ cookiecutter.pkg_name }}.cli_tools import profiling
+
+    def _killed(args, **kwargs):
+        return subprocess.CompletedProcess(args, -9, stdout="", stderr="import time: self [us] | cumulative | pkg\n")
+
+    monkeypatch.setattr(subprocess, "run", _killed)
+    with pytest.raises(RuntimeError, match="exit code -9"):
+        profiling.import_profile()
+
+
+def test_static_metadata():
+    """``_metadata`` constants must match pyproject.toml: run ``python -m {{ cookiecutter.pkg_name }}.metadata``."""
+    from {{ cookiecutter.pkg_name }} import _metadata, metadata
+
+    _expected = metadata.read(_PROJECT_ROOT / "pyproject.toml")
+    assert {_k: getattr(_metadata, _k) for _k in _expected} == _expected
+
+
+def test_import_is_lazy():
+    """Importing the package must not build the project model nor read pyproject.toml or .env files."""
+    code = "\n".join([
+        "import json, sys",
+        "_opened = []",
+        "sys.addaudithook(lambda ev, args: _opened.append(str(args[0])) if ev == 'open' else None)",
+        "import {{ cookiecutter.pkg_name }}",
+        "_read = [f for f in _opened if f.endswith(('pyproject.toml', '.env'))]",
+        "print(json.dumps([_read, 'pydantic' in sys.modules]))",
+    ])
+    timings, out = _import_time(code)
+    read_files, pydantic_imported = json.loads(out)
+
+    assert not read_files
+    assert not pydantic_imported
+    assert "{{ cookiecutter.pkg_name }}.models" not in timings
+
+    _, cumulative = timings["{{ cookiecutter.pkg_name }}"]
+    optional = sum(timings[_m][1] for _m in _OPTIONAL_IMPORTS if _m in timings)
+    logger.info(f"{{ cookiecutter.pkg_name }} import time: {cumulative - optional} us (+{optional} us optional)")
+    assert cumulative - optional < _IMPORT_BUDGET_US
+
+
+def test_lazy_metadata():
+    """Metadata attributes are resolved on first access, the project model is memoized."""
+    import {{ cookiecutter.pkg_name }}
+
+    assert {{ cookiecutter.pkg_name }}.get_project() is {{ cookiecutter.pkg_name }}.get_project()
+    assert {{ cookiecutter.pkg_name }}.__version__ == "{{ cookiecutter.version }}"
+    assert {{ cookiecutter.pkg_name }}.__project_name__ == "{{ cookiecutter.project_slug }}"
+    assert "__version__" in dir({{ cookiecutter.pkg_name }})
+    with pytest.raises(AttributeError):
+        getattr({{ cookiecutter.pkg_name }}, "__not_a_metadata__")
+
+
+def test_metadata_fallback(monkeypatch):
+    """Metadata come from ``_metadata`` without building the model, from the model when no static source exists."""
+    import importlib.metadata
+
+    import {{ cookiecutter.pkg_name }}
+
+    def _no_model():
+        raise AssertionError("project model built")
+
+    monkeypatch.setattr({{ cookiecutter.pkg_name }}, "get_project", _no_model)
+    {{ cookiecutter.pkg_name }}._static_metadata.cache_clear()
+    assert {{ cookiecutter.pkg_name }}.__version__ == "{{ cookiecutter.version }}"
+    monkeypatch.undo()
+
+    def _not_installed(name):
+        raise importlib.metadata.PackageNotFoundError(name)
+
+    # as if the module was not generated
+    monkeypatch.setitem(sys.modules, "{{ cookiecutter.pkg_name }}._metadata", None)
+    monkeypatch.delattr({{ cookiecutter.pkg_name }}, "_metadata", raising=False)
+    monkeypatch.setattr(importlib.metadata, "metadata", _not_installed)
+    {{ cookiecutter.pkg_name }}._static_metadata.cache_clear()
+    try:
+        assert {{ cookiecutter.pkg_name }}._static_metadata() == {}
+        assert {{ cookiecutter.pkg_name }}.__version__ == {{ cookiecutter.pkg_name }}.get_project().pyproject_settings.version
+    finally:
+        {{ cookiecutter.pkg_name }}._static_metadata.cache_clear()
+
+
+def test_project_model_single_validation(monkeypatch):
+    """Sub-models are validated once, when built, IMAGE_* fields are computed from them."""
+    import timeit
+
+    from {{ cookiecutter.pkg_name }}.models import PyprojectModel, SubModels
+
+    project = PyprojectModel()
+    sub_models = {_s: getattr(project, _s) for _s in SubModels}
+
+    def _no_validation(*args, **kwargs):
+        raise AssertionError("sub-model validated twice")
+
+    for _sub_model in sub_models.values():
+        monkeypatch.setattr(type(_sub_model), "model_validate", _no_validation)
+
+    assembled = PyprojectModel(**sub_models)
+    assert assembled.IMAGE_NAME == project.pyproject_settings.name
+    assert assembled.IMAGE_GIT_HASH == project.env_vars.git_commit
+    assert "IMAGE_VERSION" in assembled.model_dump()
+
+    _runs = 200
+    _elapsed = min(timeit.repeat(lambda: PyprojectModel(**sub_models), number=_runs, repeat=3))
+    logger.info(f"PyprojectModel assembling: {_elapsed / _runs * 1e6:.1f} us")
+
+
+def test_env_vars_whitelist(monkeypatch):
+    """Only declared and allowed environment variables are read, the latter on attribute access."""
+    from {{ cookiecutter.pkg_name }}.models import EnvVars, ToolSettings
+
+    monkeypatch.setenv("GIT_COMMIT", "0123abc")
+    monkeypatch.setenv("BUILD_NUMBER", "42")
+    monkeypatch.setenv("GITHUB_SHA", "4567def")
+    monkeypatch.setenv("UNRELATED_SECRET", "nope")
+
+    tool_settings = ToolSettings.model_construct(env_vars_allow=["build_number"], env_vars_prefixes=["GITHUB_"])
+    env = EnvVars.whitelisted(tool_settings)
+    assert env.git_commit == "0123abc"
+    assert not env.model_extra
+    assert "UNRELATED_SECRET" not in str(env.model_dump())
+
+    assert env.build_number == "42"
+    assert env.GITHUB_SHA == "4567def"
+    assert env.allowed_vars() == {"BUILD_NUMBER": "42", "GITHUB_SHA": "4567def"}
+    with pytest.raises(AttributeError):
+        _ = env.unrelated_secret
+
+
+def test_model_cache(tmp_path, monkeypatch):
+    """Validated model is reloaded from the on-disk cache until its fingerprint changes."""
+    from {{ cookiecutter.pkg_name }} import model_cache
+    from {{ cookiecutter.pkg_name }}.models import PyProjectAuthors, PyprojectModel
+
+    monkeypatch.setenv(model_cache.CACHE_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.delenv("GIT_COMMIT", raising=False)
+    assert model_cache.load() is None
+
+    built = model_cache.cached_project()
+    assert model_cache.cache_file().exists()
+
+    cached = model_cache.load()
+    assert isinstance(cached, PyprojectModel)
+    assert isinstance(cached.pyproject_settings.authors[0], PyProjectAuthors)
+    assert cached.pyproject_settings.urls.bug_tracker == built.pyproject_settings.urls.bug_tracker
+    assert cached.model_dump(exclude={"IMAGE_TIMESTAMP"}) == built.model_dump(exclude={"IMAGE_TIMESTAMP"})
+
+    # environment is not cached
+    monkeypatch.setenv("GIT_COMMIT", "0123abc")
+    assert model_cache.load().IMAGE_GIT_HASH == "0123abc"
+
+    model_cache.invalidate()
+    assert not model_cache.cache_file().exists()
+
+    monkeypatch.setenv(model_cache.NO_CACHE_ENV_VAR, "1")
+    assert not model_cache.cache_enabled()
+
+
+def test_model_cache_secrets(tmp_path, monkeypatch):
+    """Secrets are not written into the cache file, the .env model is read again at load."""
+    from pydantic import SecretStr
+
+    from {{ cookiecutter.pkg_name }} import model_cache
+    from {{ cookiecutter.pkg_name }}.models import EnvFileModel, PyprojectModel
+
+    monkeypatch.setenv(model_cache.CACHE_DIR_ENV_VAR, str(tmp_path))
+    project = PyprojectModel()
+    project.env_file = EnvFileModel.model_construct(api_token=SecretStr("s3cret"))
+    model_cache.store(project)
+
+    assert "s3cret" not in model_cache.cache_file().read_text()
+    if os.name == "posix":
+        assert model_cache.cache_file().stat().st_mode & 0o077 == 0
+    assert not hasattr(model_cache.load().env_file, "api_token")
+
+
+def test_probe(caplog, monkeypatch):
+    """Probes return their arguments, the caller frame is inspected only when DEBUG is enabled."""
+    from {{ cookiecutter.pkg_name }} import instrumentation
+    from {{ cookiecutter.pkg_name }}.instrumentation import probe
+
+    with monkeypatch.context() as _m, caplog.at_level(logging.INFO, logger="{{ cookiecutter.pkg_name }}"):
+        # no frame access
+        _m.setattr(instrumentation, "sys", None)
+        assert probe() is None
+        assert probe(1) == 1
+        assert probe(1, "a") == (1, "a")
+    assert not caplog.records
+
+    with caplog.at_level(logging.DEBUG, logger="{{ cookiecutter.pkg_name }}"):
+        value = probe(40 + 2)
+    assert value == 42
+    assert "in test_probe() value = probe(40 + 2) -> 42" in caplog.text
+
+
+def test_tracing_spans(tmp_path, monkeypatch):
+    """Spans are written as JSON lines when the trace file is set, nested spans share the trace."""
+    from {{ cookiecutter.pkg_name }} import instrumentation
+    from {{ cookiecutter.pkg_name }}.model_cache import cached_project
+    from {{ cookiecutter.pkg_name }}.pipeline import gather_data
+
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(instrumentation.TRACE_FILE_ENV_VAR, str(trace_file))
+    monkeypatch.setattr(instrumentation, "_TRACING", instrumentation._Tracing())  # pylint: disable=W0212
+    monkeypatch.delenv("CI", raising=False)
+
+    @instrumentation.traced()
+    def _inner():
+        return cached_project(use_cache=False)
+
+    with instrumentation.span("outer", answer=42):
+        _inner()
+    with pytest.raises(ValueError), instrumentation.span("failing"):
+        raise ValueError("boom")
+    gather_data("pipeline_env_vars.sh")
+
+    spans = [json.loads(_line) for _line in trace_file.read_text().splitlines()]
+    model, inner, outer, failing = spans[:4]
+    assert [model["name"], outer["name"], failing["name"]] == ["PyprojectModel", "outer", "failing"]
+    assert inner["name"].endswith("_inner")
+    assert model["parentSpanId"] == inner["spanId"] and inner["parentSpanId"] == outer["spanId"]
+    assert model["traceId"] == outer["traceId"] != failing["traceId"]
+    assert outer["parentSpanId"] == "" and outer["attributes"] == {"answer": 42}
+    assert outer["startTimeUnixNano"] <= inner["startTimeUnixNano"] <= inner["endTimeUnixNano"]
+    assert failing["status"]["code"] == "STATUS_CODE_ERROR"
+    assert spans[-1]["name"] == "gather_data"
+
+    instrumentation.configure()
+    with instrumentation.span("ignored"):
+        pass
+    assert len(trace_file.read_text().splitlines()) == len(spans)
+
+
+@pytest.mark.parametrize("env_format", ["bash", "dotenv", "github", "json"])
+def test_write_env_file(tmp_path, monkeypatch, env_format):
+    """CI env file is properly quoted, and rewritten only when its content changes."""
+    import shutil
+    import tempfile
+
+    from {{ cookiecutter.pkg_name }}.ci_env import EnvFormat, write_env_file
+
+    variables = {"IMAGE_NAME": "name", "IMAGE_DESCRIPTION": "it's a \"quoted\" $value", "IMAGE_GIT_HASH": None}
+    env_file = tmp_path / "pipeline_env_vars"
+
+    assert write_env_file(variables, env_file, EnvFormat(env_format))
+    content = env_file.read_text()
+    assert not list(tmp_path.glob(".pipeline_env_vars.*"))
+
+    if env_format == EnvFormat.github:
+        # runner's file is appended to
+        assert write_env_file(variables, env_file, EnvFormat(env_format))
+        assert env_file.read_text() == content * 2
+        return
+
+    def _no_temporary_file(*args, **kwargs):
+        raise AssertionError("temporary file created for an up to date file")
+
+    mtime = env_file.stat().st_mtime_ns
+    with monkeypatch.context() as _m:
+        _m.setattr(tempfile, "mkstemp", _no_temporary_file)
+        assert not write_env_file(variables, env_file, EnvFormat(env_format))
+    assert env_file.stat().st_mtime_ns == mtime
+
+    if env_format == EnvFormat.json:
+        assert json.loads(content) == variables
+    elif env_format == EnvFormat.dotenv:
+        dotenv = pytest.importorskip("dotenv")
+        assert dotenv.dotenv_values(env_file)["IMAGE_DESCRIPTION"] == variables["IMAGE_DESCRIPTION"]
+    elif env_format == EnvFormat.bash and shutil.which("bash"):
+        out = subprocess.run(["bash", "-c", f"source {env_file} && echo \"$IMAGE_DESCRIPTION\""],
+                             capture_output=True, text=True, check=True).stdout
+        assert out.strip() == variables["IMAGE_DESCRIPTION"]
+
+
+def test_pure_python_fallback():
+    """Package modules are imported from their sources when PURE_PYTHON env var is set, compiled or not."""
+    from {{ cookiecutter.pkg_name }}.acceleration import IMPLEMENTATION_PYTHON, PURE_PYTHON_ENV_VAR
+
+    code = "\n".join([
+        "import json",
+        "from {{ cookiecutter.pkg_name }} import acceleration, pipeline",
+        "print(json.dumps([pipeline.__file__, acceleration.check()]))",
+    ])
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=_PROJECT_ROOT,
+        env=os.environ | {PURE_PYTHON_ENV_VAR: "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    source, report = json.loads(proc.stdout)
+
+    assert source.endswith("pipeline.py")
+    assert set(report.values()) <= {IMPLEMENTATION_PYTHON}
+
+
+def test_stale_extension_warning(tmp_path):
+    """Package import does not walk the package, a compiled module older than its source warns when imported."""
+    from importlib.machinery import EXTENSION_SUFFIXES
+
+    from {{ cookiecutter.pkg_name }}.acceleration import _CompiledModuleFinder
+
+    subprocess.run([sys.executable, "-c", "import os; os.walk = None; import {{ cookiecutter.pkg_name }}"],
+                   cwd=_PROJECT_ROOT, check=True)
+
+    extension = tmp_path / f"fast{EXTENSION_SUFFIXES[0]}"
+    extension.write_bytes(b"")
+    os.utime(extension, (1_000_000_000, 1_000_000_000))
+    (tmp_path / "fast.py").write_text("")
+    with pytest.warns(RuntimeWarning, match="is older than"):
+        spec = _CompiledModuleFinder().find_spec("{{ cookiecutter.pkg_name }}.fast", [str(tmp_path)])
+    assert spec.origin == str(extension)
+
+
+def test_benchmark_regression(tmp_path):
+    """Benchmarks slower than the baseline by more than the threshold fail the comparison."""
+
+    def _results(name, **medians):
+        _file = tmp_path / name
+        _benchmarks = [{"name": _k, "stats": {"median": _v}} for _k, _v in medians.items()]
+        _file.write_text(json.dumps({"benchmarks": _benchmarks}))
+        return str(_file)
+
+    baseline = _results("baseline.json", test_import=1.0, test_model=1.0)
+
+    def _compare(current):
+        return subprocess.run([sys.executable, "-m", "benchmarks.compare", baseline, current, "--threshold=10"],
+                              cwd=_PROJECT_ROOT, capture_output=True, text=True)
+
+    assert _compare(_results("ok.json", test_import=1.05, test_model=0.5, test_new=3.0)).returncode == 0
+    slower = _compare(_results("slow.json", test_import=1.2, test_model=1.0))
+    assert slower.returncode == 1
+    assert "REGRESSION" in slower.stdout
+
+
+def test_nox_session_discovery(tmp_path):
+    """Nox sessions are listed offline, falling back to the interpreters installed into PATH."""
+    import os
+    import time
+
+    pytest.importorskip("nox")
+    _unreachable = "http://127.0.0.1:9"
+    # malformed cache, without timestamp: a miss
+    cache = tmp_path / "python_versions.json"
+    cache.write_text(json.dumps({"versions": ["3.12"]}))
+    env = os.environ | {
+        "NOX_PYTHON_VERSIONS_CACHE": str(cache),
+        "HTTP_PROXY": _unreachable,
+        "HTTPS_PROXY": _unreachable,
+        "PYTHONPATH": str(_PROJECT_ROOT),
+    }
+    env.pop("NOX_PYTHON_VERSIONS", None)
+
+    for args in (["-l"], ["-l", "-s", "lint"]):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-m", "nox", *args], cwd=_PROJECT_ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        elapsed = time.perf_counter() - start
+        logger.info(f"nox {' '.join(args)}: {elapsed:.2f} s")
+        assert f"test-{sys.version_info.major}.{sys.version_info.minor}" in out
+        assert elapsed < 10
+
+
+@pytest.fixture(scope="module")
+def noxfile():
+    """noxfile module, loaded once: nox sessions are registered at import.
+
+    Returns:
+        noxfile module
+    """
+    import importlib.util
+
+    pytest.importorskip("nox")
+    with pytest.MonkeyPatch.context() as _patch:
+        # no python versions lookup at import
+        _patch.setenv("NOX_PYTHON_VERSIONS", "3.12")
+        _patch.chdir(_PROJECT_ROOT)
+        _spec = importlib.util.spec_from_file_location("noxfile", _PROJECT_ROOT / "noxfile.py")
+        _module = importlib.util.module_from_spec(_spec)
+        _spec.loader.exec_module(_module)
+    return _module
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["-l"], True),
+    (["-s", "lint"], False),
+    (["-s", "lint", "test"], True),
+    (["-s", "lint,test"], True),
+    (["--sessions=lint,gate"], True),
+    (["-s", "lint", "--", "test"], False),
+])
+def test_nox_session_selection(noxfile, argv, expected):
+    """Python versions are looked up only when the selected sessions include test ones."""
+    assert noxfile._test_session_selected(argv) is expected
+
+
+def test_nox_python_versions_listing(noxfile, tmp_path, monkeypatch):
+    """Listing sessions does not look up python.org, a malformed cache is a miss."""
+    def _no_fetch():
+        raise AssertionError("python.org looked up")
+
+    monkeypatch.delenv("NOX_PYTHON_VERSIONS", raising=False)
+    monkeypatch.setattr(noxfile, "_fetch_active_python_versions", _no_fetch)
+    monkeypatch.setattr(noxfile, "_VERSIONS_CACHE", tmp_path / "python_versions.json")
+    assert noxfile._listing(["-l", "-s", "test"]) and noxfile._listing(["--list"])
+    assert not noxfile._listing(["-s", "test", "--", "-l"])
+    for content in ("[]", '{"versions": ["3.12"]}', '{"timestamp": "now", "versions": "3.12"}'):
+        noxfile._VERSIONS_CACHE.write_text(content)
+        assert noxfile._python_version_matrix(fetch=False) == noxfile._installed_python_versions()
+
+
+@pytest.fixture
+def project_copy(tmp_path):
+    """Copy of the project sources, where nox container sessions write their archives, SBOMs and reports.
+
+    Arguments:
+        tmp_path: pytest temporary folder
+
+    Returns:
+        project copy folder
+    """
+    import shutil
+
+    _copy = tmp_path / "project"
+    shutil.copytree(_PROJECT_ROOT, _copy, ignore=shutil.ignore_patterns(
+        ".git", ".nox", ".venv", "*_cache", "__pycache__", "sbom.*.json", "grype.json", "build", "dist"))
+    # the container session locks a project without lock file, the stub runner does not read it
+    (_copy / "poetry.lock").touch()
+    return _copy
+
+
+def test_container_build_cache(tmp_path, project_copy):
+    """Container image is built once per sources digest, with layer cache and reproducible timestamps."""
+    import shlex
+
+    pytest.importorskip("nox")
+    state = tmp_path / "container_stub.json"
+    env = os.environ | {
+        "NOX_CONTAINER_RUNNER": shlex.join([sys.executable, str(project_copy / "tests" / "container_stub.py")]),
+        "CONTAINER_STUB_STATE": str(state),
+        "SOURCE_DATE_EPOCH": "1700000000",
+        "{{ cookiecutter.pkg_name|upper }}_CACHE_DIR": str(tmp_path),
+        "PYTHONPATH": str(project_copy),
+    }
+    env.pop("CI", None)
+
+    outputs = [
+        subprocess.run([sys.executable, "-m", "nox", "-s", "container"], cwd=project_copy, env=env,
+                       capture_output=True, text=True, check=True).stderr
+        for _ in range(2)
+    ]
+    assert "build skipped" not in outputs[0]
+    assert "build skipped" in outputs[1]
+
+    (build_args,) = json.loads(state.read_text())["builds"]
+    assert "--no-cache" not in build_args
+    assert "--timestamp=1700000000" in build_args
+    assert "--build-arg=IMAGE_TIMESTAMP=2023-11-14T22:13:20+00:00" in build_args
+
+
+def test_container_scan(tmp_path, project_copy):
+    """Image is exported once, scanners run against the archive, offline mode skips database updates."""
+    import shlex
+
+    pytest.importorskip("nox")
+    state = tmp_path / "container_stub.json"
+    env = os.environ | {
+        "NOX_CONTAINER_RUNNER": shlex.join([sys.executable, str(project_copy / "tests" / "container_stub.py")]),
+        "CONTAINER_STUB_STATE": str(state),
+        "NOX_SCAN_OFFLINE": "1",
+        "{{ cookiecutter.pkg_name|upper }}_CACHE_DIR": str(tmp_path),
+        "PYTHONPATH": str(project_copy),
+    }
+    env.pop("CI", None)
+
+    for _ in range(2):
+        subprocess.run([sys.executable, "-m", "nox", "-s", "scan"], cwd=project_copy, env=env,
+                       capture_output=True, text=True, check=True)
+
+    assert len(json.loads(state.read_text())["saves"]) == 1
+    runs = [json.loads(_f.read_text()) for _f in tmp_path.glob("container_stub.run.*.json")]
+    tools = {_a for _r in runs for _a in _r if _a.startswith(("ghcr.io/", "aquasec/", "anchore/", "wagoodman/"))}
+    assert len(tools) == 5
+    assert all("--network=none" in _r for _r in runs)
+    assert not any("update" in _r or "--download-db-only" in _r for _r in runs)
+    # trivy, syft and dive read the archive, grype the syft SBOM
+    assert sum(any("/scan/" in _a for _a in _r) for _r in runs) == 3
+    assert sum(any(_a.startswith("sbom:") for _a in _r) for _r in runs) == 1
+
+
+def test_incremental_grype(tmp_path, project_copy):
+    """grype scans only the packages changed since the previous SBOM, findings are merged into the index."""
+    import shlex
+
+    pytest.importorskip("nox")
+    env = os.environ | {
+        "NOX_CONTAINER_RUNNER": shlex.join([sys.executable, str(project_copy / "tests" / "container_stub.py")]),
+        "CONTAINER_STUB_STATE": str(tmp_path / "container_stub.json"),
+        "NOX_SCAN_OFFLINE": "1",
+        "{{ cookiecutter.pkg_name|upper }}_CACHE_DIR": str(tmp_path),
+        "PYTHONPATH": str(project_copy),
+    }
+    env.pop("CI", None)
+
+    def _grype(packages, *args):
+        _env = env | {"CONTAINER_STUB_PACKAGES": json.dumps(packages)}
+        _out = subprocess.run([sys.executable, "-m", "nox", "-s", "grype", "--", *args], cwd=project_copy, env=_env,
+                              capture_output=True, text=True, check=True).stderr
+        return next(_l for _l in _out.splitlines() if "findings in" in _l)
+
+    packages = [["requests", "2.32.3"], ["idna", "3.10"], ["urllib3", "2.2.3"]]
+    assert "3 findings in 3 packages, 3 scanned" in _grype(packages)
+    assert "3 findings in 3 packages, 0 scanned" in _grype(packages)
+    assert "2 findings in 2 packages, 1 scanned" in _grype([["requests", "2.32.4"], ["idna", "3.10"]])
+    assert "2 findings in 2 packages, 2 scanned" in _grype([["requests", "2.32.4"], ["idna", "3.10"]], "--full")
+
+    findings = json.loads((project_copy / "grype.json").read_text())["matches"]
+    assert sorted(_m["vulnerability"]["id"] for _m in findings) == ["STUB-idna-3.10", "STUB-requests-2.32.4"]
+
+
 def test_py_version():
     """Dummy test to print python version used by pytest."""
     import sys
@@ -1,25 +1,114 @@
 """Top-level package for {{ cookiecutter.project_name }}."""
 
-import logging
-import tomllib
-from {{cookiecutter.pkg_name}}.models import PyprojectModel
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, Dict
 
+from {{cookiecutter.pkg_name}}.acceleration import install as _install_import_hook
+from {{cookiecutter.pkg_name}}.instrumentation import probe, span, traced
 
-try:
-    from icecream import ic, install
+if TYPE_CHECKING:  # pragma: no cover
+    from {{cookiecutter.pkg_name}}.models import PyprojectModel
 
-    # installing icecream
-    install()
-    ic.configureOutput(outputFunction=logging.debug, includeContext=True)
-except ImportError:  # Graceful fallback if IceCream isn't installed.
-    ic = lambda *a: None if not a else (a[0] if len(a) == 1 else a)  # noqa
+# former icecream entry point, logging through the package logger only when DEBUG is enabled
+ic = probe  # pylint: disable=C0103
 
+# compiled modules, if any, and pure-Python fallback; no filesystem access until a submodule is imported
+_install_import_hook()
 
-_project = PyprojectModel()
 
-__author__ = _project.pyproject_settings.authors[0].name
-__email__ = _project.pyproject_settings.authors[0].email
-__version__ = _project.pyproject_settings.version
+@cache
+def get_project() -> "PyprojectModel":
+    """Return the project model, building it on first use.
 
-__description__ = _project.pyproject_settings.description
-__project_name__ = _project.pyproject_settings.name
+    Importing the package does not parse pyproject.toml nor validate the environment,
+    that happens only once the first time project metadata is requested.
+    The validated model is persisted on disk, see ``model_cache`` module.
+
+    Returns:
+        the memoized PyprojectModel instance.
+    """
+    from {{cookiecutter.pkg_name}}.model_cache import cache_enabled, cached_project  # pylint: disable=C0415
+
+    return cached_project(use_cache=cache_enabled())
+
+
+# metadata attributes, from the static _metadata module when available
+_METADATA_ATTRIBUTES = ("__project_name__", "__version__", "__description__", "__author__", "__email__")
+
+
+@cache
+def _static_metadata() -> Dict[str, str]:
+    """Project metadata without building the project model.
+
+    Read from the ``_metadata`` module generated at build time, else from the installed distribution.
+
+    Returns:
+        {attribute: value} map, empty when neither is available.
+    """
+    try:
+        from {{cookiecutter.pkg_name}} import _metadata  # pylint: disable=C0415
+
+        return {_a: getattr(_metadata, _a) for _a in _METADATA_ATTRIBUTES}
+    except (ImportError, AttributeError):
+        pass
+
+    import importlib.metadata  # pylint: disable=C0415
+    from email.utils import parseaddr  # pylint: disable=C0415
+
+    try:
+        _dist = importlib.metadata.metadata("{{ cookiecutter.project_slug }}")
+    except importlib.metadata.PackageNotFoundError:
+        return {}
+
+    def _field(name: str) -> str:
+        # PackageMetadata has no get(), get_all returns None for a missing field
+        return (_dist.get_all(name) or [""])[0]
+
+    # PEP 621 authors with an email are written into Author-email only, as "name <email>"
+    _author, _email = parseaddr(_field("Author-email"))
+    return {
+        "__project_name__": _dist["Name"],
+        "__version__": _dist["Version"],
+        "__description__": _field("Summary"),
+        "__author__": _field("Author") or _author,
+        "__email__": _email,
+    }
+
+
+# lazily resolved module attributes, see __getattr__
+_LAZY_ATTRIBUTES: Dict[str, Callable[["PyprojectModel"], Any]] = {
+    "_project": lambda _p: _p,
+    "__author__": lambda _p: _p.pyproject_settings.authors[0].name,
+    "__email__": lambda _p: _p.pyproject_settings.authors[0].email,
+    "__version__": lambda _p: _p.pyproject_settings.version,
+    "__description__": lambda _p: _p.pyproject_settings.description,
+    "__project_name__": lambda _p: _p.pyproject_settings.name,
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve project metadata on first access (PEP 562).
+
+    Metadata attributes come from ``_static_metadata``, the project model is built only when that is not available.
+
+    Args:
+        name: attribute name.
+
+    Returns:
+        the attribute value.
+
+    Raises:
+        AttributeError: if the attribute is not a lazy metadata attribute.
+    """
+    try:
+        _getter = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    _static = _static_metadata()
+    if name in _static:
+        return _static[name]
+    return _getter(get_project())
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
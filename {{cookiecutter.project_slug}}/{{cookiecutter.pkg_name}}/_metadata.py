@@ -0,0 +1,6 @@
+"""Generated from pyproject.toml by ``python -m {{ cookiecutter.pkg_name }}.metadata``, do not edit."""
+__project_name__ = {{ cookiecutter.project_slug|tojson }}
+__version__ = {{ cookiecutter.version|tojson }}
+__description__ = {{ (cookiecutter.project_short_description ~ '.')|tojson }}
+__author__ = {{ cookiecutter.full_name|tojson }}
+__email__ = {{ cookiecutter.email|tojson }}
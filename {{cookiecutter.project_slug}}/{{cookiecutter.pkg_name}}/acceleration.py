@@ -0,0 +1,131 @@
+"""Implementation, compiled or pure-Python, of the package modules.
+
+Modules listed into ``accelerate`` key of ``[tool.{{ cookiecutter.pkg_name }}]`` pyproject.toml table are compiled
+with mypyc or Cython at build time, see ``_build_extension.py``: the extension module is installed next to its
+source and takes precedence on import. Sources stay into the package as fallback, used when the extension was not
+built or when ``{{ cookiecutter.pkg_name|upper }}_PURE_PYTHON`` env var is set.
+
+Package import only installs an import hook, the package folder is not read: a compiled module is compared with its
+source when it's imported.
+
+``python -m benchmarks.acceleration [module ...]`` times compiled against pure-Python implementations.
+"""
+import importlib.abc
+import importlib.util
+import logging
+import os
+import sys
+import warnings
+from importlib.machinery import EXTENSION_SUFFIXES, PathFinder
+from typing import Dict, Tuple
+
+PURE_PYTHON_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_PURE_PYTHON"
+IMPLEMENTATION_COMPILED = "compiled"
+IMPLEMENTATION_PYTHON = "python"
+
+_PACKAGE_DIR = os.path.dirname(__file__)
+# installers extract wheel files in any order: a source slightly newer than its extension is not stale
+_STALE_TOLERANCE_S = 2.0
+
+
+def compiled_modules() -> Dict[str, Tuple[str, str]]:
+    """Extension modules of the package built from one of its sources.
+
+    Returns:
+        {module name: (extension path, source path)} map.
+    """
+    _modules = {}
+    for _root, _dirs, _files in os.walk(_PACKAGE_DIR):
+        _dirs[:] = [_d for _d in _dirs if _d != '__pycache__']
+        _package = os.path.relpath(_root, _PACKAGE_DIR).split(os.sep)
+        for _file in _files:
+            _stem = next((_file[:-len(_s)] for _s in EXTENSION_SUFFIXES if _file.endswith(_s)), None)
+            _source = os.path.join(_root, f"{_stem}.py")
+            if _stem and os.path.isfile(_source):
+                _name = ".".join([__package__, *(_p for _p in _package if _p != '.'), _stem])
+                _modules[_name] = (os.path.join(_root, _file), _source)
+    return _modules
+
+
+def implementation(name: str) -> str:
+    """Tell which implementation of a module is, or will be, imported.
+
+    Args:
+        name: full module name.
+
+    Returns:
+        IMPLEMENTATION_COMPILED or IMPLEMENTATION_PYTHON.
+    """
+    _module = sys.modules.get(name)
+    if _module is not None:
+        _origin = getattr(_module, '__file__', None)
+    else:
+        _spec = importlib.util.find_spec(name)
+        _origin = _spec.origin if _spec else None
+    return IMPLEMENTATION_COMPILED if _origin and _origin.endswith(tuple(EXTENSION_SUFFIXES)) else IMPLEMENTATION_PYTHON
+
+
+def _warn_if_stale(extension: str, source: str) -> None:
+    if os.path.getmtime(source) - os.path.getmtime(extension) > _STALE_TOLERANCE_S:
+        warnings.warn(f"{extension} is older than {source}: rebuild it or set {PURE_PYTHON_ENV_VAR}",
+                      RuntimeWarning, stacklevel=2)
+
+
+class _CompiledModuleFinder(importlib.abc.MetaPathFinder):
+    """Find the package modules as the default path finder does, checking compiled ones against their source."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.partition('.')[0] != __package__ or not path:
+            return None
+        _spec = PathFinder.find_spec(fullname, path, target)
+        if _spec is not None and _spec.origin and _spec.origin.endswith(tuple(EXTENSION_SUFFIXES)):
+            _source = os.path.join(os.path.dirname(_spec.origin), f"{fullname.rpartition('.')[2]}.py")
+            if os.path.isfile(_source):
+                _warn_if_stale(_spec.origin, _source)
+        return _spec
+
+
+class _PurePythonFinder(importlib.abc.MetaPathFinder):
+    """Import the package modules from their sources, ignoring compiled extensions."""
+
+    def find_spec(self, fullname, path, target=None):  # pylint: disable=W0613
+        if fullname.partition('.')[0] != __package__ or not path:
+            return None
+        _name = fullname.rpartition('.')[2]
+        for _entry in path:
+            _source = os.path.join(_entry, f"{_name}.py")
+            if os.path.isfile(_source):
+                return importlib.util.spec_from_file_location(fullname, _source)
+        # subpackages and non-python files: default finders
+        return None
+
+
+def install() -> None:
+    """Install the import hook of the package modules, run on package import.
+
+    Sources take precedence when PURE_PYTHON_ENV_VAR is set, otherwise a compiled module older than its source
+    (e.g. edited after ``poetry install``) raises a warning when imported.
+    """
+    if any(isinstance(_f, (_CompiledModuleFinder, _PurePythonFinder)) for _f in sys.meta_path):
+        return
+    sys.meta_path.insert(0, _PurePythonFinder() if os.environ.get(PURE_PYTHON_ENV_VAR) else _CompiledModuleFinder())
+
+
+def check() -> Dict[str, str]:
+    """Check the implementation of every compiled module, e.g. from a nox session or a diagnostic command.
+
+    Warns about extensions older than their source, unless PURE_PYTHON_ENV_VAR is set.
+
+    Returns:
+        {module name: implementation} map of the compiled modules.
+    """
+    install()
+    _pure = any(isinstance(_f, _PurePythonFinder) for _f in sys.meta_path)
+
+    _report = {}
+    for _name, (_extension, _source) in compiled_modules().items():
+        if not _pure:
+            _warn_if_stale(_extension, _source)
+        _report[_name] = IMPLEMENTATION_PYTHON if _pure else IMPLEMENTATION_COMPILED
+        logging.debug("%s: %s implementation", _name, _report[_name])
+    return _report
@@ -0,0 +1,149 @@
+"""CI env-var file writers.
+
+Entries are rendered one by one through generators and streamed into a temporary file, that atomically replaces
+the destination once flushed to disk: a concurrent reader sees either the old or the new file, never half of it.
+The rendered content is hashed first, without writing: when it's equal to the existing file, this is left untouched
+and no temporary file is created.
+
+GitHub ``$GITHUB_ENV`` file is owned by the runner and shared by the whole step, so it's appended to instead.
+"""
+import hashlib
+import json
+import os
+import shlex
+import stat
+import tempfile
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Tuple
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class EnvFormat(StrEnum):
+    """Supported output formats."""
+
+    bash = "bash"
+    dotenv = "dotenv"
+    github = "github"
+    json = "json"
+
+
+def _as_str(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _bash(items: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    yield '#!/bin/bash\n\n'
+    for _k, _v in items:
+        yield f"export {_k}={shlex.quote(_as_str(_v))}\n"
+
+
+def _dotenv(items: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    # python-dotenv and docker compose unescape only backslash, double quote and control characters: "$" stays as is,
+    #   "${NAME}" references are expanded by the reader
+    for _k, _v in items:
+        _escaped = _as_str(_v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        yield f'{_k}="{_escaped}"\n'
+
+
+def _github(items: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    for _k, _v in items:
+        _value = _as_str(_v)
+        if '\n' not in _value:
+            yield f"{_k}={_value}\n"
+            continue
+        # multiline values use heredoc syntax, delimiter must not appear into the value
+        _delimiter = f"EOF_{hashlib.sha256(_value.encode()).hexdigest()[:16]}"
+        yield f"{_k}<<{_delimiter}\n{_value}\n{_delimiter}\n"
+
+
+def _json(items: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    yield "{"
+    _separator = "\n"
+    for _k, _v in items:
+        yield f"{_separator}  {json.dumps(_k)}: {json.dumps(_v, default=str)}"
+        _separator = ",\n"
+    yield "\n}\n"
+
+
+_RENDERERS = {
+    EnvFormat.bash: _bash,
+    EnvFormat.dotenv: _dotenv,
+    EnvFormat.github: _github,
+    EnvFormat.json: _json,
+}
+
+
+def render(variables: Mapping[str, Any], env_format: EnvFormat = EnvFormat.bash) -> Iterator[str]:
+    """Render variables one entry at a time.
+
+    Args:
+        variables: variables to export
+        env_format: output format
+
+    Returns:
+        generator of file chunks.
+    """
+    return _RENDERERS[EnvFormat(env_format)](variables.items())
+
+
+def _file_digest(path: Path) -> str:
+    _hash = hashlib.sha256()
+    try:
+        with open(path, mode='rb') as _fp:
+            while _chunk := _fp.read(_CHUNK_SIZE):
+                _hash.update(_chunk)
+    except FileNotFoundError:
+        return ""
+    return _hash.hexdigest()
+
+
+def _append(chunks: Iterable[str], path: Path) -> bool:
+    with open(path, mode='a', encoding='utf-8') as _fp:
+        _fp.writelines(chunks)
+        _fp.flush()
+        os.fsync(_fp.fileno())
+    return True
+
+
+def write_env_file(variables: Mapping[str, Any], path: Path, env_format: EnvFormat = EnvFormat.bash) -> bool:
+    """Stream variables into path, atomically.
+
+    Args:
+        variables: variables to export
+        path: destination file
+        env_format: output format, ``github`` appends to path
+
+    Returns:
+        True if path has been written, False if its content was already up to date.
+    """
+    path = Path(path)
+    if env_format == EnvFormat.github:
+        return _append(render(variables, env_format), path)
+
+    # first pass, hash only: an up to date file costs no write nor fsync
+    _hash = hashlib.sha256()
+    for _chunk in render(variables, env_format):
+        _hash.update(_chunk.encode('utf-8'))
+    if _hash.hexdigest() == _file_digest(path):
+        return False
+
+    _fd, _tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(_fd, mode='w', encoding='utf-8', newline='\n') as _fp:
+            _fp.writelines(render(variables, env_format))
+            _fp.flush()
+            os.fsync(_fp.fileno())
+
+        # mkstemp file is private, keep the permissions of the replaced file
+        try:
+            _mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            _mode = 0o644
+        os.chmod(_tmp, _mode)
+        os.replace(_tmp, path)
+    except BaseException:
+        Path(_tmp).unlink(missing_ok=True)
+        raise
+    return True
@@ -1,17 +1,79 @@
 """Console script for {{cookiecutter.pkg_name}}."""
 
 {% if cookiecutter.command_line_interface|lower == 'click' -%}
+# start-up time: module level imports are limited to click, the package and the instrumentation,
+#   heavy modules (pydantic models, pipeline) are imported by the subcommands using them;
+#   package metadata come from the static _metadata module, the project model is built only when it's missing
+import os
+
 import click
-from {{ cookiecutter.pkg_name }} import __description__, __version__, __project_name__
+from {{ cookiecutter.pkg_name }} import __description__, __project_name__, __version__
+from {{ cookiecutter.pkg_name }}.instrumentation import span
+
+# ci_env.EnvFormat and profiling.PROFILERS values, not imported to keep --help fast
+ENV_FORMATS = ("bash", "dotenv", "github", "json")
+PROFILERS = ("cprofile", "sampling")
+PROFILE_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_PROFILE"
 
 
-@click.command()
-def main():
+@click.group(invoke_without_command=True)
+@click.version_option(__version__, prog_name=__project_name__)
+@click.option("--profile", is_flag=True, envvar=PROFILE_ENV_VAR,
+              help=f"Profile the subcommand, also enabled by {PROFILE_ENV_VAR} env var.")
+@click.option("--profiler", type=click.Choice(PROFILERS), default="cprofile", show_default=True,
+              help="cProfile traces every call, sampling records the stack every millisecond.")
+@click.option("--profile-output", type=click.Path(dir_okay=False), default="profile", show_default=True,
+              help="Profile files prefix: <prefix>.pstats and <prefix>.collapsed.")
+@click.option("--profile-top", type=int, default=20, show_default=True, help="Number of functions to print.")
+@click.option("--import-profile", is_flag=True, help="Print the import time of the package modules and exit.")
+@click.pass_context
+def main(ctx, profile, profiler, profile_output, profile_top, import_profile):  # pylint: disable=R0913
     """Main entrypoint."""
+    if import_profile:
+        from {{ cookiecutter.pkg_name }}.cli_tools.profiling import import_profile as _report  # pylint: disable=C0415
+
+        try:
+            click.echo(_report(top=profile_top))
+        except RuntimeError as _e:
+            raise click.ClickException(str(_e)) from _e
+        ctx.exit()
+    if ctx.invoked_subcommand is not None:
+        # the span and the profile end when the subcommand returns
+        ctx.with_resource(span(f"cli {ctx.invoked_subcommand}"))
+        if profile:
+            from {{ cookiecutter.pkg_name }}.cli_tools.profiling import profile as _profile  # pylint: disable=C0415
+
+            ctx.with_resource(_profile(profile_output, profiler, profile_top))
+        return
     _str = f"{{ cookiecutter.project_slug }} v{__version__}"
     click.echo(_str)
     click.echo("=" * len(_str))
-    click.echo("{{ cookiecutter.project_short_description }}")
+    click.echo(__description__)
+
+
+@main.command(name="ci-env")
+@click.argument("filename", required=False)
+@click.option("--format", "env_format", type=click.Choice(ENV_FORMATS), default="bash", show_default=True,
+              help="CI env-var file format.")
+@click.option("--no-cache", is_flag=True, help="Do not use the on-disk project model cache.")
+def ci_env(filename, env_format, no_cache):
+    """Dump project variables for the CI pipeline.
+
+    FILENAME is the CI env-var file to write, default pipeline_env_vars.sh or $GITHUB_ENV for github format.
+    """
+    from {{ cookiecutter.pkg_name }}.ci_env import EnvFormat  # pylint: disable=C0415
+    from {{ cookiecutter.pkg_name }}.model_cache import NO_CACHE_ENV_VAR  # pylint: disable=C0415
+    from {{ cookiecutter.pkg_name }}.pipeline import gather_data  # pylint: disable=C0415
+
+    if no_cache:
+        os.environ[NO_CACHE_ENV_VAR] = "1"
+    _format = EnvFormat(env_format)
+    if filename is None:
+        if _format == EnvFormat.github and not os.environ.get("GITHUB_ENV"):
+            raise click.UsageError("--format github writes to $GITHUB_ENV, not set outside GitHub Actions: "
+                                   "pass a FILENAME")
+        filename = os.environ["GITHUB_ENV"] if _format == EnvFormat.github else "pipeline_env_vars.sh"
+    click.echo(gather_data(filename, _format))
 
 
 if __name__ == "__main__":
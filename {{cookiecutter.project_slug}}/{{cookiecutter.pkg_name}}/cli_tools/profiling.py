@@ -0,0 +1,240 @@
+"""Profiling of the command-line interface.
+
+``--profile`` runs the invoked subcommand under a profiler, then writes, after the ``--profile-output`` prefix:
+
+- ``<prefix>.pstats``: cProfile statistics, for ``python -m pstats`` or snakeviz (cprofile profiler only);
+- ``<prefix>.collapsed``: collapsed stacks, one ``frame;frame;... value`` line per stack, input of flamegraph.pl,
+  inferno or speedscope; values are microseconds (cprofile) or samples (sampling);
+
+and prints the top functions, by own time, to stderr.
+
+cProfile traces every call and slows down call-intensive code. The sampling profiler records the stack at a fixed
+interval of CPU time, from a SIGPROF handler: its overhead does not depend on the code, it fits production
+containers. Where SIGPROF is not available (Windows) or off the main thread, a thread samples the stack instead,
+biased towards the calls releasing the GIL.
+
+``--import-profile`` reports ``-X importtime`` data of the package modules, imported by a fresh interpreter.
+"""
+import cProfile
+import os
+import pstats
+import signal
+import subprocess
+import sys
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+
+PROFILERS = ("cprofile", "sampling")
+# modules imported by the command-line interface and its subcommands
+IMPORT_PROFILE_MODULES = ("{{ cookiecutter.pkg_name }}.cli_tools.cli", "{{ cookiecutter.pkg_name }}.pipeline")
+
+# pstats function key: file, line, name
+_Function = Tuple[str, int, str]
+# deepest stack of the collapsed cProfile call graph
+_MAX_DEPTH = 64
+# stacks taking less than this share of the total time are not expanded, a call graph has countless paths
+_MIN_SHARE = 1e-4
+
+
+def _label(filename: str, line: int, name: str) -> str:
+    """Frame label, without the collapsed format separators."""
+    if filename == "~":
+        # built-in function
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def collapse_stats(stats: Dict[_Function, tuple]) -> Dict[str, float]:
+    """Collapsed stacks of a cProfile call graph.
+
+    cProfile records caller-callee pairs, not stacks: the time of a function called from many places is split among
+    its stacks by the share of each call pair, recursive calls are folded into their first occurrence. Callees
+    taking less than ``_MIN_SHARE`` of the total time are accounted to their caller.
+
+    Args:
+        stats: ``pstats.Stats.stats`` map.
+
+    Returns:
+        {"frame;frame;...": own seconds} map.
+    """
+    _callees: Dict[_Function, Dict[_Function, float]] = defaultdict(dict)
+    for _function, (*_, _callers) in stats.items():
+        for _caller, _edge in _callers.items():
+            _callees[_caller][_function] = _edge[3]
+
+    _roots = [_f for _f, (*_, _callers) in stats.items() if not _callers]
+    _min_seconds = _MIN_SHARE * sum(stats[_r][3] for _r in _roots)
+    _stacks: Dict[str, float] = defaultdict(float)
+
+    def _walk(function: _Function, path: List[_Function], seconds: float) -> None:
+        _, _, _own, _cumulative, _ = stats[function]
+        _share = seconds / _cumulative if _cumulative else 0.0
+        _path = path + [function]
+        _stack = ";".join(_label(*_f) for _f in _path)
+        _stacks[_stack] += _own * _share
+        for _callee, _edge_cumulative in _callees.get(function, {}).items():
+            if _callee in _path:
+                continue
+            if _edge_cumulative * _share < _min_seconds or len(_path) >= _MAX_DEPTH:
+                _stacks[_stack] += _edge_cumulative * _share
+            else:
+                _walk(_callee, _path, _edge_cumulative * _share)
+
+    for _root in _roots:
+        _walk(_root, [], stats[_root][3])
+    return _stacks
+
+
+def _collapsed_stack(frame) -> str:
+    _stack = []
+    while frame is not None:
+        _code = frame.f_code
+        _stack.append(_label(_code.co_filename, _code.co_firstlineno, _code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(_stack))
+
+
+class _Sampler(threading.Thread):
+    """Record the stack of a thread at a fixed interval, from another thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.stacks: Counter[str] = Counter()
+        self._thread_id = thread_id
+        self._interval = interval
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self._interval):
+            _frame = sys._current_frames().get(self._thread_id)  # pylint: disable=W0212
+            if _frame is not None:
+                self.stacks[_collapsed_stack(_frame)] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+class _SignalSampler:
+    """Record the stack of the main thread every interval of process CPU time, from a SIGPROF handler."""
+
+    def __init__(self, interval: float):
+        self.stacks: Counter[str] = Counter()
+        self._interval = interval
+        self._previous: Union[Callable[[int, Optional[FrameType]], Any], int, None] = None
+
+    def _sample(self, _signum, frame) -> None:
+        if frame is not None:
+            self.stacks[_collapsed_stack(frame)] += 1
+
+    def start(self) -> None:
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        # None: the previous handler was not installed from Python, the default one is the closest
+        signal.signal(signal.SIGPROF, signal.SIG_DFL if self._previous is None else self._previous)
+
+
+def _write_collapsed(path: Path, stacks: Mapping[str, float], scale: float = 1.0) -> None:
+    with open(path, mode="w", encoding="utf-8") as _fp:
+        for _stack, _value in sorted(stacks.items()):
+            if round(_value * scale) > 0:
+                _fp.write(f"{_stack} {round(_value * scale)}\n")
+
+
+@contextmanager
+def profile(output: Path, profiler: str = "cprofile", top: int = 20, interval: float = 0.001,
+            stream: Optional[TextIO] = None) -> Iterator[None]:
+    """Profile a block of code.
+
+    Args:
+        output: output files prefix.
+        profiler: one of PROFILERS.
+        top: number of functions to print.
+        interval: seconds between two samples of the sampling profiler.
+        stream: report stream, default stderr.
+
+    Yields:
+        nothing, the block runs under the profiler.
+    """
+    _stream = stream or sys.stderr
+    _collapsed = Path(f"{output}.collapsed")
+    if profiler == "sampling":
+        _sampler: Union[_SignalSampler, _Sampler]
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            _sampler = _SignalSampler(interval)
+        else:
+            _sampler = _Sampler(threading.get_ident(), interval)
+        _sampler.start()
+        try:
+            yield
+        finally:
+            _sampler.stop()
+            _write_collapsed(_collapsed, _sampler.stacks)
+            _own: Counter[str] = Counter()
+            for _stack, _count in _sampler.stacks.items():
+                _own[_stack.rsplit(";", 1)[-1]] += _count
+            _total = sum(_own.values()) or 1
+            print(f"{_total} samples, {interval * 1000:g} ms interval", file=_stream)
+            for _function, _count in _own.most_common(top):
+                print(f"{_count:8} {100 * _count / _total:5.1f}%  {_function}", file=_stream)
+            print(f"collapsed stacks written to {_collapsed}", file=_stream)
+        return
+
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    try:
+        yield
+    finally:
+        _profiler.disable()
+        _pstats = Path(f"{output}.pstats")
+        _profiler.dump_stats(_pstats)
+        _stats = pstats.Stats(_profiler, stream=_stream)
+        _write_collapsed(_collapsed, collapse_stats(_stats.stats), scale=1e6)  # type: ignore[attr-defined]
+        _stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        print(f"profile written to {_pstats} and {_collapsed}", file=_stream)
+
+
+def import_profile(modules: Tuple[str, ...] = IMPORT_PROFILE_MODULES, top: int = 20) -> str:
+    """Import time of modules, from a fresh interpreter.
+
+    Args:
+        modules: modules to import.
+        top: number of modules to report, by own import time.
+
+    Returns:
+        report.
+
+    Raises:
+        RuntimeError: into a frozen bundle, no interpreter is available, or the import fails.
+    """
+    if getattr(sys, "frozen", False):
+        raise RuntimeError("import profile is not available into a frozen bundle")
+    _proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "; ".join(f"import {_m}" for _m in modules)],
+                           capture_output=True, text=True, check=False)
+    if _proc.returncode != 0:
+        # last error line, if any: a child killed by a signal writes nothing besides the import times
+        _errors = [_l for _l in _proc.stderr.strip().splitlines() if not _l.startswith("import time:")]
+        raise RuntimeError(_errors[-1] if _errors else f"import profile failed with exit code {_proc.returncode}")
+
+    _timings = {}
+    for _line in _proc.stderr.splitlines():
+        if not _line.startswith("import time:") or "self [us]" in _line:
+            continue
+        _self, _cumulative, _name = _line.removeprefix("import time:").split("|")
+        _timings[_name.strip()] = (int(_self), int(_cumulative))
+
+    _lines = [f"{'self [us]':>10} {'cumul [us]':>10}  module"]
+    _ranked = sorted(_timings.items(), key=lambda _t: _t[1][0], reverse=True)[:top]
+    for _module_name, (_self_us, _cumulative_us) in _ranked:
+        _lines.append(f"{_self_us:10} {_cumulative_us:10}  {_module_name}")
+    _lines.append(f"{len(_timings)} modules, {sum(_s for _s, _ in _timings.values())} us")
+    for _module in modules:
+        _lines.append(f"{_module}: {_timings.get(_module, (0, 0))[1]} us cumulative")
+    return "\n".join(_lines)
@@ -0,0 +1,192 @@
+"""Debug probes and tracing spans, nearly free when disabled.
+
+``probe`` replaces icecream ``ic``: it logs its arguments at DEBUG level through the package logger, together with
+the caller file, line and source. The caller frame is inspected only when DEBUG is enabled for the logger, otherwise
+a probe costs one ``isEnabledFor`` call.
+
+``span`` and ``traced`` time a block or a function call. Spans are recorded only when tracing is enabled:
+
+- ``{{ cookiecutter.pkg_name|upper }}_TRACE_FILE`` env var: spans are appended to that file as JSON lines, with
+  OpenTelemetry (OTLP JSON) field names;
+- ``{{ cookiecutter.pkg_name|upper }}_TRACE_OTEL`` env var: spans are started through the OpenTelemetry API, the
+  application configures its tracer provider and exporters.
+
+Both are read on first use, ``configure`` changes them at runtime.
+"""
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional, TypeVar
+
+TRACE_FILE_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_TRACE_FILE"
+TRACE_OTEL_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_TRACE_OTEL"
+
+_LOGGER = logging.getLogger("{{ cookiecutter.pkg_name }}")
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# current span of the local exporter, parent of the spans opened into it
+_CURRENT: contextvars.ContextVar[Optional["_Span"]] = contextvars.ContextVar("_CURRENT", default=None)
+
+
+def probe(*args: Any) -> Any:
+    """Log values at DEBUG level, with the caller context.
+
+    Args:
+        args: values to inspect.
+
+    Returns:
+        args, as icecream ``ic`` does: None, the single value or the tuple of values.
+    """
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        import linecache  # pylint: disable=C0415
+
+        _frame = sys._getframe(1)  # pylint: disable=W0212
+        _code = _frame.f_code
+        _source = linecache.getline(_code.co_filename, _frame.f_lineno).strip()
+        _values = ", ".join(repr(_a) for _a in args)
+        _LOGGER.debug("%s:%d in %s() %s -> %s", _code.co_filename, _frame.f_lineno, _code.co_name, _source, _values)
+    return None if not args else (args[0] if len(args) == 1 else args)
+
+
+class _JsonLinesExporter:
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]) -> None:
+        import json  # pylint: disable=C0415
+
+        _line = json.dumps(record, default=str) + "\n"
+        with self._lock, open(self.path, mode="a", encoding="utf-8") as _fp:
+            _fp.write(_line)
+
+
+class _Span:
+    """Span of the local exporter."""
+
+    __slots__ = ("name", "attributes", "trace_id", "span_id", "parent_id", "start_ns")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["_Span"]):
+        self.name = name
+        self.attributes = attributes
+        self.trace_id: str = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id: str = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else ""
+        self.start_ns = time.time_ns()
+
+    def record(self, error: Optional[BaseException]) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": time.time_ns(),
+            "attributes": self.attributes,
+            "status": {"code": "STATUS_CODE_ERROR", "message": repr(error)} if error else {"code": "STATUS_CODE_OK"},
+            "resource": {"service.name": "{{ cookiecutter.project_slug }}"},
+        }
+
+
+class _Tracing:
+    """Tracing configuration, read from the environment on first use."""
+
+    def __init__(self) -> None:
+        self.configured = False
+        self.exporter: Optional[_JsonLinesExporter] = None
+        self.tracer: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        if not self.configured:
+            configure(os.environ.get(TRACE_FILE_ENV_VAR) or None, bool(os.environ.get(TRACE_OTEL_ENV_VAR)))
+        return self.exporter is not None or self.tracer is not None
+
+
+_TRACING = _Tracing()
+
+
+def configure(trace_file: Optional[str] = None, otel: bool = False) -> None:
+    """Enable or disable tracing, overriding the environment variables.
+
+    Args:
+        trace_file: JSON lines file of the local exporter, None to disable it.
+        otel: start the spans through the OpenTelemetry API too; ignored when opentelemetry-api is not installed.
+    """
+    _TRACING.configured = True
+    _TRACING.exporter = _JsonLinesExporter(trace_file) if trace_file else None
+    _TRACING.tracer = None
+    if otel:
+        try:
+            from opentelemetry import trace  # pylint: disable=C0415
+        except ImportError:
+            _LOGGER.warning("%s is set but opentelemetry-api is not installed", TRACE_OTEL_ENV_VAR)
+        else:
+            _TRACING.tracer = trace.get_tracer("{{ cookiecutter.pkg_name }}")
+
+
+@contextmanager
+def _record(name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+    with ExitStack() as _stack:
+        if _TRACING.tracer is not None:
+            _stack.enter_context(_TRACING.tracer.start_as_current_span(name, attributes=attributes))
+        _exporter = _TRACING.exporter
+        if _exporter is None:
+            yield
+            return
+        _span = _Span(name, attributes, _CURRENT.get())
+        _token = _CURRENT.set(_span)
+        try:
+            yield
+        except BaseException as _e:
+            _exporter.export(_span.record(_e))
+            raise
+        finally:
+            _CURRENT.reset(_token)
+        _exporter.export(_span.record(None))
+
+
+def span(name: str, **attributes: Any) -> ContextManager[None]:
+    """Time a block as a tracing span.
+
+    Args:
+        name: span name.
+        attributes: span attributes, JSON serializable.
+
+    Returns:
+        context manager, doing nothing when tracing is disabled.
+    """
+    if not _TRACING.enabled:
+        return nullcontext()
+    return _record(name, attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable[[_F], _F]:
+    """Decorate a function to time its calls as tracing spans.
+
+    Args:
+        name: span name, default the function qualified name.
+
+    Returns:
+        decorator.
+    """
+    def _decorator(func: _F) -> _F:
+        _name = name or func.__qualname__
+
+        @wraps(func)
+        def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _TRACING.enabled:
+                return func(*args, **kwargs)
+            with _record(_name, {"code.function": func.__qualname__, "code.namespace": func.__module__}):
+                return func(*args, **kwargs)
+
+        return _wrapper  # type: ignore[return-value]
+
+    return _decorator
@@ -0,0 +1,88 @@
+"""Static project metadata, generated at build time.
+
+``_metadata.py`` holds name, version, description and author of the project as literal constants, read from
+pyproject.toml: importing it costs nothing, and it works from a wheel or any working directory, while the pydantic
+``PyprojectModel`` parses pyproject.toml from the current one. The package metadata attributes and the
+command-line interface read it, falling back to ``importlib.metadata`` and then to the model when it's missing.
+
+The C extension build script (``poetry build``, ``poetry install``) and ``nox -s build`` regenerate it,
+``cz bump`` updates its version; run ``python -m {{ cookiecutter.pkg_name }}.metadata`` after editing
+pyproject.toml by hand.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from tomllib import load
+from typing import Dict
+
+METADATA_MODULE = Path(__file__).with_name('_metadata.py')
+
+_HEADER = '"""Generated from pyproject.toml by ``python -m {{ cookiecutter.pkg_name }}.metadata``, do not edit."""\n'
+
+
+def read(pyproject: Path = Path('pyproject.toml')) -> Dict[str, str]:
+    """Read project metadata from pyproject.toml.
+
+    Args:
+        pyproject: pyproject.toml file.
+
+    Returns:
+        {module attribute: value} map.
+    """
+    with open(pyproject, mode='rb') as _fp:
+        _project = load(_fp)['project']
+    _author = (_project.get('authors') or [{}])[0]
+    return {
+        "__project_name__": _project['name'],
+        "__version__": _project['version'],
+        "__description__": _project.get('description', ""),
+        "__author__": _author.get('name', ""),
+        "__email__": _author.get('email', ""),
+    }
+
+
+def render(metadata: Dict[str, str]) -> str:
+    """Render metadata as python module source.
+
+    Args:
+        metadata: {module attribute: value} map.
+
+    Returns:
+        module source, one literal constant per attribute.
+    """
+    # JSON strings are valid python string literals
+    return _HEADER + "".join(f"{_k} = {json.dumps(_v)}\n" for _k, _v in metadata.items())
+
+
+def write(pyproject: Path = Path('pyproject.toml'), target: Path = METADATA_MODULE) -> bool:
+    """Write the metadata module, atomically.
+
+    Args:
+        pyproject: pyproject.toml file.
+        target: module to write.
+
+    Returns:
+        True if target has been written, False if its content was already up to date.
+    """
+    _source = render(read(pyproject))
+    try:
+        if target.read_text(encoding='utf-8') == _source:
+            return False
+    except FileNotFoundError:
+        pass
+
+    _fd, _tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(_fd, mode='w', encoding='utf-8', newline='\n') as _fp:
+            _fp.write(_source)
+        os.chmod(_tmp, 0o644)
+        os.replace(_tmp, target)
+    except BaseException:
+        Path(_tmp).unlink(missing_ok=True)
+        raise
+    return True
+
+
+if __name__ == "__main__":
+    print(f"{METADATA_MODULE} {'written' if write() else 'up to date'}")
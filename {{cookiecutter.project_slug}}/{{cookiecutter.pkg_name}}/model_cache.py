@@ -0,0 +1,223 @@
+"""Persistent on-disk cache of the validated PyprojectModel.
+
+Building ``PyprojectModel`` parses pyproject.toml, reads the .env file and validates every sub-model.
+The validated model is dumped as JSON into the user cache folder (``$XDG_CACHE_HOME``, ``~/.cache`` or
+``%LOCALAPPDATA%``), under ``{{ cookiecutter.pkg_name }}/<project folder digest>/``, or into
+``{{ cookiecutter.pkg_name|upper }}_CACHE_DIR`` if set, and reloaded without TOML parsing nor pydantic validation as
+long as its fingerprint does not change.
+
+The fingerprint is made of mtime, size and content hash of pyproject.toml, .env and models.py, plus a digest of
+the environment variables named after the keys loaded from .env. The content hash is computed only when mtime or size
+differ from the recorded ones.
+
+Secrets, ``SecretStr`` values of the .env model, are not written: when the model holds any, the .env model is read
+again at load. The cache file is readable by its owner only, still it holds the other .env values in clear text.
+
+Invalidation:
+    * ``invalidate()`` removes the cache file, the next ``get_project()`` call rebuilds it;
+    * ``get_project.cache_clear()`` drops the in-process memoized model;
+    * setting ``{{ cookiecutter.pkg_name|upper }}_NO_CACHE`` (or passing ``--no-cache`` to ``pipeline.py``)
+      bypasses the cache entirely.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from types import NoneType, UnionType
+from typing import Any, Dict, List, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, SecretStr
+
+from {{cookiecutter.pkg_name}} import models
+from {{cookiecutter.pkg_name}}.instrumentation import span
+from {{cookiecutter.pkg_name}}.models import EnvFileModel, EnvVars, PyprojectModel, SubModels, ToolSettings
+
+NO_CACHE_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_NO_CACHE"
+CACHE_DIR_ENV_VAR = "{{ cookiecutter.pkg_name|upper }}_CACHE_DIR"
+
+# bump when the cache file layout changes
+_CACHE_VERSION = 3
+_CACHE_FILENAME = "pyproject_model.json"
+# rebuilt at every load: they depend on time and on the process environment
+_NOT_CACHED = {SubModels.env_vars, "IMAGE_TIMESTAMP"} | set(PyprojectModel.model_computed_fields)
+
+
+def cache_file() -> Path:
+    """Return the cache file path.
+
+    Returns:
+        cache file, into CACHE_DIR_ENV_VAR folder if set, else into a per-project folder of the user cache.
+    """
+    _dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if _dir:
+        return Path(_dir) / _CACHE_FILENAME
+    _user_cache = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') or Path.home() / '.cache'
+    _project = hashlib.sha256(str(Path.cwd()).encode()).hexdigest()[:16]
+    return Path(_user_cache) / '{{ cookiecutter.pkg_name }}' / _project / _CACHE_FILENAME
+
+
+def cache_enabled() -> bool:
+    """Tell if the cache can be used.
+
+    Returns:
+        False when NO_CACHE_ENV_VAR is set to a non-empty value.
+    """
+    return not os.environ.get(NO_CACHE_ENV_VAR)
+
+
+def _fingerprinted_files() -> List[Path]:
+    return [Path.cwd() / 'pyproject.toml', Path(str(EnvFileModel.model_config['env_file'])), Path(models.__file__)]
+
+
+def _file_fingerprint(path: Path, recorded: Optional[List[Any]] = None) -> Optional[List[Any]]:
+    """Return [mtime_ns, size, sha256] of path, None if missing.
+
+    Hash is reused from the recorded fingerprint when mtime and size did not change.
+    """
+    try:
+        _stat = path.stat()
+    except FileNotFoundError:
+        return None
+    if recorded and recorded[:2] == [_stat.st_mtime_ns, _stat.st_size]:
+        return recorded
+    return [_stat.st_mtime_ns, _stat.st_size, hashlib.sha256(path.read_bytes()).hexdigest()]
+
+
+def _env_digest(keys: List[str]) -> str:
+    """Digest of environment variables named after the keys loaded from .env, the ones able to override them."""
+    _relevant = {_k.lower() for _k in keys}
+    _items = sorted((_k, _v) for _k, _v in os.environ.items() if _k.lower() in _relevant)
+    return hashlib.sha256(json.dumps(_items).encode()).hexdigest()
+
+
+def _fingerprint(env_keys: List[str]) -> Dict[str, Any]:
+    return {
+        "version": _CACHE_VERSION,
+        "files": {str(_f): _file_fingerprint(_f) for _f in _fingerprinted_files()},
+        "env_keys": env_keys,
+        "env": _env_digest(env_keys),
+    }
+
+
+def _is_fresh(cached: Dict[str, Any]) -> bool:
+    """Compare recorded fingerprint against current files and environment, by content hash."""
+    if cached.get("version") != _CACHE_VERSION or cached.get("env") != _env_digest(cached.get("env_keys") or []):
+        return False
+    _recorded = cached.get("files") or {}
+    _files = _fingerprinted_files()
+    if set(_recorded) != {str(_f) for _f in _files}:
+        return False
+    for _f in _files:
+        _old = _recorded[str(_f)]
+        _new = _file_fingerprint(_f, _old)
+        if (_old is None) != (_new is None) or (_new is not None and _new[2] != _old[2]):
+            return False
+    return True
+
+
+def _revive(annotation: Any, value: Any) -> Any:
+    """Rebuild a dumped value according to its field annotation, without validation."""
+    if value is None or isinstance(value, BaseModel):
+        return value
+    _origin = get_origin(annotation)
+    if _origin in (Union, UnionType):
+        _args = [_a for _a in get_args(annotation) if _a is not NoneType]
+        return _revive(_args[0], value) if len(_args) == 1 else value
+    if _origin in (list, List):
+        (_item,) = get_args(annotation) or (Any,)
+        return [_revive(_item, _v) for _v in value]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _construct(annotation, value)
+    return value
+
+
+def _construct(model_cls: Type[BaseModel], data: Dict[str, Any]) -> Any:
+    """Recursively model_construct a dumped model, skipping validation."""
+    _values = dict(data)
+    for _name, _field in model_cls.model_fields.items():
+        _key = _field.alias if _field.alias in _values else _name
+        if _key in _values:
+            _values[_key] = _revive(_field.annotation, _values[_key])
+    return model_cls.model_construct(**_values)
+
+
+def load() -> Optional[PyprojectModel]:
+    """Load the model from cache.
+
+    Returns:
+        the cached model, None if cache is missing, stale or unreadable.
+    """
+    try:
+        _cached = json.loads(cache_file().read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+    if not _is_fresh(_cached):
+        return None
+
+    _data = _cached["model"]
+    if _cached.get("secrets"):
+        # secrets are not cached, they're read again from .env and the environment
+        _data[SubModels.env_file] = EnvFileModel()
+    _tool_settings = _construct(ToolSettings, _data[SubModels.tool_settings])
+    _data[SubModels.tool_settings] = _tool_settings
+    _data[SubModels.env_vars] = EnvVars.whitelisted(_tool_settings)
+    return _construct(PyprojectModel, _data)
+
+
+def store(project: PyprojectModel) -> None:
+    """Atomically write the model into the cache file.
+
+    Args:
+        project: validated model to cache.
+    """
+    _file = cache_file()
+    _model = project.model_dump(by_alias=True, exclude=_NOT_CACHED)
+    _env_file = _model.get(SubModels.env_file) or {}
+    _env_keys = sorted(_env_file)
+    _secrets = [_k for _k, _v in _env_file.items() if isinstance(_v, SecretStr)]
+    for _k in _secrets:
+        del _env_file[_k]
+    _payload = _fingerprint(_env_keys) | {"secrets": bool(_secrets), "model": _model}
+    try:
+        _file.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp creates the file readable only by the owner: it holds .env values
+        _fd, _tmp = tempfile.mkstemp(dir=_file.parent, prefix=f".{_file.name}.")
+    except OSError:
+        # read-only folder: the cache is just an optimization
+        return
+
+    try:
+        with os.fdopen(_fd, mode='w', encoding='utf-8') as _fp:
+            # a secret anywhere else is not serializable: nothing is cached rather than leaking it
+            json.dump(_payload, _fp)
+        os.replace(_tmp, _file)
+    except (OSError, TypeError):
+        Path(_tmp).unlink(missing_ok=True)
+
+
+def invalidate() -> None:
+    """Remove the cache file."""
+    cache_file().unlink(missing_ok=True)
+
+
+def cached_project(use_cache: bool = True) -> PyprojectModel:
+    """Return the project model, from cache when still valid.
+
+    Args:
+        use_cache: False to always build and validate the model, leaving the cache untouched.
+
+    Returns:
+        PyprojectModel instance.
+    """
+    if not use_cache:
+        with span("PyprojectModel", cache="disabled"):
+            return PyprojectModel()
+
+    _project = load()
+    if _project is None:
+        with span("PyprojectModel", cache="miss"):
+            _project = PyprojectModel()
+        store(_project)
+    return _project
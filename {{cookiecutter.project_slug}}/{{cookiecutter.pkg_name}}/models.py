@@ -6,8 +6,8 @@ from enum import StrEnum
 
 from datetime import timezone, datetime
 
-from pydantic import SecretStr, computed_field, Field, BaseModel, model_validator
-from typing import Tuple, Type
+from pydantic import SecretStr, computed_field, Field, BaseModel, PrivateAttr
+from typing import FrozenSet, Tuple, Type
 
 from pydantic_settings import (
     BaseSettings,
@@ -17,6 +17,17 @@ from pydantic_settings import (
 )
 
 
+def image_timestamp() -> str:
+    """Image creation time: SOURCE_DATE_EPOCH env var, for reproducible builds, else now.
+
+    Returns:
+        ISO 8601 UTC timestamp.
+    """
+    _epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    _time = datetime.fromtimestamp(int(_epoch), timezone.utc) if _epoch else datetime.now(timezone.utc)
+    return _time.isoformat()
+
+
 class EnvFileModel(BaseSettings):
     """Environmental Variable model read from .env file."""
 
@@ -26,13 +37,66 @@ class EnvFileModel(BaseSettings):
 
 
 class EnvVars(BaseSettings):
-    """Environmental Variable model."""
+    """Environmental Variable model.
+
+    Only declared fields are read from the environment. Other variables are looked up lazily on attribute access,
+    when their name is into the allow-list or starts with an allowed prefix, see ToolSettings.
+    """
 
-    model_config = SettingsConfigDict(extra='allow')
+    model_config = SettingsConfigDict(extra='ignore')
     # env var coming from environment
     ci: Optional[str] = None
     git_commit: Optional[str] = None
 
+    _allow: FrozenSet[str] = PrivateAttr(default=frozenset())
+    _prefixes: Tuple[str, ...] = PrivateAttr(default=())
+
+    @classmethod
+    def whitelisted(cls, tool_settings: "ToolSettings") -> "EnvVars":
+        """Build the model allowing lazy lookup of the variables configured into pyproject.toml .
+
+        Args:
+            tool_settings: package table from pyproject.toml
+
+        Returns:
+            EnvVars instance.
+        """
+        _env = cls()
+        _env._allow = frozenset(_a.upper() for _a in tool_settings.env_vars_allow)
+        _env._prefixes = tuple(_p.upper() for _p in tool_settings.env_vars_prefixes)
+        return _env
+
+    def is_allowed(self, name: str) -> bool:
+        """Tell if an undeclared environment variable can be read.
+
+        Args:
+            name: variable name, case insensitive
+
+        Returns:
+            True if into the allow-list or starting with an allowed prefix.
+        """
+        _name = name.upper()
+        return _name in self._allow or _name.startswith(self._prefixes)
+
+    def allowed_vars(self) -> Dict[str, str]:
+        """Return the undeclared environment variables that can be read.
+
+        Returns:
+            {name: value} of allowed environment variables.
+        """
+        return {_k: _v for _k, _v in os.environ.items() if self.is_allowed(_k)}
+
+    def __getattr__(self, item: str) -> Any:
+        try:
+            return super().__getattr__(item)  # type: ignore[misc]
+        except AttributeError:
+            if item.startswith('_') or not self.is_allowed(item):
+                raise
+            for _name in (item, item.upper()):
+                if _name in os.environ:
+                    return os.environ[_name]
+            raise
+
 
 class TomlSettings(BaseSettings):
     """Base class to read toml files as pyproject.toml ."""
@@ -49,6 +113,19 @@ class TomlSettings(BaseSettings):
         return (PyprojectTomlConfigSettingsSource(settings_cls),)
 
 
+class ToolSettings(TomlSettings):
+    """Subclass to manage this package table from pyproject.toml ."""
+
+    model_config = SettingsConfigDict(
+        pyproject_toml_table_header=('tool', '{{ cookiecutter.pkg_name }}'),
+        extra='allow'
+    )
+
+    # environment variables readable through EnvVars besides the declared ones
+    env_vars_allow: List[str] = []
+    env_vars_prefixes: List[str] = []
+
+
 class PoetrySettings(TomlSettings):
     """Subclass to manage poetry table from pyproject.toml ."""
 
@@ -108,6 +185,7 @@ class SubModels(StrEnum):
     env_vars = "env_vars"
     pyproject_settings = "pyproject_settings"
     poetry_settings = "poetry_settings"
+    tool_settings = "tool_settings"
 
 
 class PyprojectModel(BaseModel):
@@ -115,25 +193,20 @@ class PyprojectModel(BaseModel):
 
     pyproject_settings: PyprojectSettings
     poetry_settings: PoetrySettings
+    tool_settings: ToolSettings
     env_file: EnvFileModel
     env_vars: EnvVars
 
-    IMAGE_TIMESTAMP: str
-    IMAGE_NAME: str
-    IMAGE_VERSION: str
-    IMAGE_SRC: str
-    IMAGE_DOC: str
-    IMAGE_DESCRIPTION: str
-    IMAGE_AUTHORS: str
-    IMAGE_LICENSE: str
-    IMAGE_URL: str
-    IMAGE_GIT_HASH: Optional[str] = None
+    IMAGE_TIMESTAMP: str = Field(default_factory=image_timestamp)
 
     def __init__(self, **data):
+        # sub-models are built, and validated, only once here: pydantic does not revalidate model instances
         if SubModels.env_file not in data:
             data[SubModels.env_file] = EnvFileModel()
+        if SubModels.tool_settings not in data:
+            data[SubModels.tool_settings] = ToolSettings()
         if SubModels.env_vars not in data:
-            data[SubModels.env_vars] = EnvVars(**os.environ)
+            data[SubModels.env_vars] = EnvVars.whitelisted(data[SubModels.tool_settings])
         if SubModels.pyproject_settings not in data:
             data[SubModels.pyproject_settings] = PyprojectSettings()
         if SubModels.poetry_settings not in data:
@@ -141,44 +214,61 @@ class PyprojectModel(BaseModel):
 
         super().__init__(**data)
 
-    @model_validator(mode='before')
-    @classmethod
-    def flatten_args(cls, data: Any) -> Any:
-        """Validate parameters making the submodels and the explicit variables."""
-
-        if isinstance(data, dict):
-            _env_f = data.get(SubModels.env_file)
-            if _env_f is None:
-                return data
-            _env_file = EnvFileModel.model_validate(_env_f)
-
-            _env_v = data.get(SubModels.env_vars)
-            if _env_v is None:
-                return data
-            _env_vars = EnvVars.model_validate(_env_v)
-
-            _pyproj = data.get(SubModels.pyproject_settings)
-            if _pyproj is None:
-                return data
-            _pypr = PyprojectSettings.model_validate(_pyproj)
-
-            _poetry = data.get(SubModels.poetry_settings)
-            if _poetry is None:
-                return data
-            _poetry_sett = PoetrySettings.model_validate(_poetry)
-
-            return {
-                "IMAGE_TIMESTAMP": datetime.now(timezone.utc).isoformat(),
-                "IMAGE_NAME": _pypr.name,
-                "IMAGE_VERSION": _pypr.version,
-                "IMAGE_SRC": _pypr.urls.repository,
-                "IMAGE_DOC": _pypr.urls.documentation,
-                "IMAGE_DESCRIPTION": _pypr.description,
-                "IMAGE_AUTHORS": ', '.join([str(_a) for _a in _pypr.authors]),
-                "IMAGE_LICENSE": _pypr.license.text,
-                "IMAGE_URL": _pypr.urls.docker,
-                "IMAGE_GIT_HASH": _env_vars.git_commit,
-            } | dict(data)
+    # explicit variables derived from the sub-models
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_NAME(self) -> str:  # noqa: N802
+        """Image name, the project name."""
+        return self.pyproject_settings.name
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_VERSION(self) -> str:  # noqa: N802
+        """Image version, the project version."""
+        return self.pyproject_settings.version
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_SRC(self) -> str:  # noqa: N802
+        """Source code repository URL."""
+        return self.pyproject_settings.urls.repository
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_DOC(self) -> str:  # noqa: N802
+        """Documentation URL."""
+        return self.pyproject_settings.urls.documentation
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_DESCRIPTION(self) -> str:  # noqa: N802
+        """Image description, the project description."""
+        return self.pyproject_settings.description
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_AUTHORS(self) -> str:  # noqa: N802
+        """Comma separated list of authors."""
+        return ', '.join([str(_a) for _a in self.pyproject_settings.authors])
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_LICENSE(self) -> str:  # noqa: N802
+        """Project license."""
+        return self.pyproject_settings.license.text
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_URL(self) -> str:  # noqa: N802
+        """Image registry URL."""
+        return self.pyproject_settings.urls.docker
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def IMAGE_GIT_HASH(self) -> Optional[str]:  # noqa: N802
+        """Git commit the image is built from, if known."""
+        return self.env_vars.git_commit
 
 
 
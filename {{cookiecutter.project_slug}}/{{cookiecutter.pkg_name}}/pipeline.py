@@ -1,5 +1,6 @@
 import os
 import sys
+from argparse import ArgumentParser
 from datetime import datetime, timezone
 from pathlib import Path
 from tomllib import load
@@ -7,7 +8,10 @@ from typing import Dict
 
 sys.path.insert(0, '.')
 
-from {{cookiecutter.pkg_name}} import _project
+from {{cookiecutter.pkg_name}} import get_project
+from {{cookiecutter.pkg_name}}.ci_env import EnvFormat, write_env_file
+from {{cookiecutter.pkg_name}}.instrumentation import traced
+from {{cookiecutter.pkg_name}}.model_cache import NO_CACHE_ENV_VAR
 from {{cookiecutter.pkg_name}}.models  import SubModels
 
 
@@ -30,27 +34,37 @@ def get_bundle_dir() -> Path:
     return bundle_dir
 
 
-def gather_data(ci_env_var_filename: str) -> Dict[str, str]:
-    _project_vars = _project.model_dump(exclude={SubModels.dl_settings, SubModels.poetry_settings,
-                                                 SubModels.pyproject_settings, SubModels.env_vars, SubModels.env_file})
+@traced("gather_data")
+def gather_data(ci_env_var_filename: str, env_format: EnvFormat = EnvFormat.bash) -> Dict[str, str]:
+    _project = get_project()
+    _project_vars = _project.model_dump(exclude={_m.value for _m in SubModels})
 
     if _project.env_vars.ci and not _project.env_vars.git_commit:
         raise KeyError('GIT_COMMIT not present in pipeline, be sure to remove "skipDefaultCheckout true"')
 
-    _ci_export = [f"export {k}='{v}'\n" for k, v in _project_vars.items()]
-
     if _project.env_vars.ci:
-        with open(Path.cwd() / ci_env_var_filename, mode='w') as out_env:
-            out_env.write('#!/bin/bash\n\n')
-            out_env.writelines(_ci_export)
+        write_env_file(_project_vars, Path.cwd() / ci_env_var_filename, env_format)
 
     return _project_vars
 
 
 if __name__ == "__main__":
-    _filename = "pipeline_env_vars.sh"
-    if len(sys.argv) > 1:
-        _filename = sys.argv[1]
+    _parser = ArgumentParser(description="Dump project variables for the CI pipeline.")
+    _parser.add_argument("filename", nargs="?", default=None,
+                         help="CI env-var file to write, default pipeline_env_vars.sh or $GITHUB_ENV for github format")
+    _parser.add_argument("--format", dest="env_format", type=EnvFormat, choices=list(EnvFormat),
+                         default=EnvFormat.bash, help="CI env-var file format")
+    _parser.add_argument("--no-cache", action="store_true", help="do not use the on-disk project model cache")
+    _args = _parser.parse_args()
+
+    if _args.no_cache:
+        os.environ[NO_CACHE_ENV_VAR] = "1"
+
+    _filename = _args.filename
+    if _filename is None:
+        if _args.env_format == EnvFormat.github and not os.environ.get("GITHUB_ENV"):
+            _parser.error("--format github writes to $GITHUB_ENV, not set outside GitHub Actions: pass a filename")
+        _filename = os.environ["GITHUB_ENV"] if _args.env_format == EnvFormat.github else "pipeline_env_vars.sh"
 
     # create file for pipeline and just dump it
-    print(gather_data(_filename))
+    print(gather_data(_filename, _args.env_format))